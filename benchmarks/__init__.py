@@ -0,0 +1 @@
+"""Performance benchmarks for ColorMaestro (run with ``python -m benchmarks``)"""
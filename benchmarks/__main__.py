@@ -0,0 +1,82 @@
+import argparse
+import os
+import sys
+import tempfile
+from . import cases, runner
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def _override(value):
+    """Parse a PATTERN=THRESHOLD command line value"""
+    pattern, sep, threshold = value.rpartition("=")
+    if not sep or not pattern:
+        raise argparse.ArgumentTypeError(f"expected PATTERN=THRESHOLD, got {value!r}")
+    return pattern, float(threshold)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Run the ColorMaestro benchmark suite")
+    parser.add_argument("patterns", nargs="*", metavar="PATTERN",
+                        help="Glob patterns selecting benchmarks by name, e.g. 'generate.*'")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="Baseline JSON file to compare against (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store the results as the new baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=runner.DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before failing, as a fraction (default: 0.3)")
+    parser.add_argument("--threshold-for", type=_override, action="append", default=[], metavar="PATTERN=THRESHOLD",
+                        help="Threshold for benchmarks matching a glob pattern (repeatable)")
+    parser.add_argument("--absolute", action="store_true",
+                        help="Compare absolute times, without scaling the baseline by the calibration case")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per benchmark (default: 5)")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Minimum duration of a timing round in seconds (default: 0.2)")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        all_cases = cases.all_cases(workdir)
+
+        if args.list:
+            for name, _ in all_cases:
+                print(name)
+            return 0
+
+        def progress(name, result):
+            print(f"{name:<45} {runner.format_time(result['min']):>10}", file=sys.stderr)
+
+        results = runner.run(all_cases, args.patterns, args.repeat, args.min_time, progress, calibrate=True)
+
+    if args.output:
+        runner.save(args.output, results)
+
+    if args.save_baseline:
+        runner.save(args.baseline, results)
+        print(f"Baseline saved to: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    baseline = runner.load(args.baseline)
+    comparison = runner.compare(results, baseline, args.threshold, args.threshold_for, not args.absolute)
+    if not args.absolute:
+        print(f"Baseline times scaled by {runner.speed_factor(results, baseline):.2f} "
+              f"(calibration time on this machine / on the baseline machine)")
+    runner.print_comparison(comparison)
+
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print(f"\n{len(missing)} benchmark(s) missing from the baseline, not compared: {', '.join(missing)}\n"
+              "Refresh it with --save-baseline", file=sys.stderr)
+
+    regressions = [row["name"] for row in comparison if row["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed beyond their threshold", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
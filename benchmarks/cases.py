@@ -0,0 +1,226 @@
+import os
+import random
+from colormaestro import dedupe, similarity, store
+from colormaestro.utils import color_conversion, color_spaces, color_difference, accessibility, cvd
+from colormaestro.generators import harmony, ui_palette, monochromatic, accessible, cvd_safe, mood
+from colormaestro.formatters import terminal, css, scss, tailwind, json_formatter
+
+# Palette sizes the generators are benchmarked with
+PALETTE_SIZES = [3, 5, 10, 20]
+
+# Palette sizes the formatters are benchmarked with
+FORMAT_PALETTE_SIZES = [5, 20]
+
+# Number of colors converted by the batch conversion benchmarks
+BATCH_SIZE = 4096
+
+# Number of colors compared pairwise by the color difference benchmarks
+PAIRWISE_SIZE = 256
+
+# Number of palettes in the deduplicated collection
+DEDUPE_SIZE = 4096
+
+# Number of palettes in the similarity index
+INDEX_SIZE = 4096
+
+# Number of palettes in the palette library
+STORE_SIZE = 4096
+
+# Edge lengths of the synthetic images used for dominant color extraction
+IMAGE_SIZES = [64, 256, 1024, 2048]
+
+BASE_COLOR = (58, 134, 255)
+
+def _colors(count, seed=0):
+    """Get a reproducible list of random RGB colors"""
+    rng = random.Random(seed)
+    return [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(count)]
+
+def conversion_cases():
+    """Scalar and batch color conversions"""
+    rgb = BASE_COLOR
+    hsv = color_conversion.rgb_to_hsv(rgb)
+    hsl = color_conversion.rgb_to_hsl(rgb)
+    hex_color = color_conversion.rgb_to_hex(rgb)
+
+    yield "conversion.scalar.hex_to_rgb", lambda: color_conversion.hex_to_rgb(hex_color)
+    yield "conversion.scalar.rgb_to_hex", lambda: color_conversion.rgb_to_hex(rgb)
+    yield "conversion.scalar.rgb_to_hsv", lambda: color_conversion.rgb_to_hsv(rgb)
+    yield "conversion.scalar.hsv_to_rgb", lambda: color_conversion.hsv_to_rgb(hsv)
+    yield "conversion.scalar.rgb_to_hsl", lambda: color_conversion.rgb_to_hsl(rgb)
+    yield "conversion.scalar.hsl_to_rgb", lambda: color_conversion.hsl_to_rgb(hsl)
+
+    colors = _colors(BATCH_SIZE)
+    hex_colors = [color_conversion.rgb_to_hex(c) for c in colors]
+    hsv_colors = [color_conversion.rgb_to_hsv(c) for c in colors]
+
+    yield f"conversion.batch.hex_to_rgb.{BATCH_SIZE}", lambda: [color_conversion.hex_to_rgb(h) for h in hex_colors]
+    yield f"conversion.batch.rgb_to_hex.{BATCH_SIZE}", lambda: [color_conversion.rgb_to_hex(c) for c in colors]
+    yield f"conversion.batch.rgb_to_hsv.{BATCH_SIZE}", lambda: [color_conversion.rgb_to_hsv(c) for c in colors]
+    yield f"conversion.batch.hsv_to_rgb.{BATCH_SIZE}", lambda: [color_conversion.hsv_to_rgb(c) for c in hsv_colors]
+
+    oklab_colors = color_spaces.rgb_to_oklab(colors)
+    lab_colors = color_spaces.rgb_to_lab(colors)
+    oklch_colors = color_spaces.lab_to_lch(oklab_colors)
+
+    yield f"conversion.batch.rgb_to_oklab.{BATCH_SIZE}", lambda: color_spaces.rgb_to_oklab(colors)
+    yield f"conversion.batch.oklab_to_rgb.{BATCH_SIZE}", lambda: color_spaces.oklab_to_rgb(oklab_colors)
+    yield f"conversion.batch.oklch_to_rgb.{BATCH_SIZE}", lambda: color_spaces.oklch_to_rgb(oklch_colors)
+    yield f"conversion.batch.rgb_to_lab.{BATCH_SIZE}", lambda: color_spaces.rgb_to_lab(colors)
+    yield f"conversion.batch.lab_to_rgb.{BATCH_SIZE}", lambda: color_spaces.lab_to_rgb(lab_colors)
+
+def difference_cases():
+    """Perceptual color differences"""
+    colors = _colors(BATCH_SIZE)
+    palette = colors[:PAIRWISE_SIZE]
+
+    for metric in color_difference.METRICS:
+        yield f"difference.one_to_many.{metric}.{BATCH_SIZE}", \
+            lambda metric=metric: color_difference.one_to_many(BASE_COLOR, colors, metric)
+        yield f"difference.pdist.{metric}.{PAIRWISE_SIZE}", \
+            lambda metric=metric: color_difference.pdist(palette, metric)
+
+def cvd_cases():
+    """Color vision deficiency simulation and palette audits"""
+    colors = _colors(BATCH_SIZE)
+    palettes = [_colors(5, seed=i) for i in range(PAIRWISE_SIZE)]
+
+    for deficiency in cvd.DEFICIENCIES:
+        yield f"cvd.simulate.{deficiency}.{BATCH_SIZE}", \
+            lambda deficiency=deficiency: cvd.simulate(colors, deficiency)
+    yield f"cvd.audit.{PAIRWISE_SIZE}", lambda: list(cvd.audit(palettes))
+
+def dedupe_cases():
+    """Near-duplicate detection over a palette collection"""
+    rng = random.Random(DEDUPE_SIZE)
+    palettes = [_colors(5, seed=rng.randrange(DEDUPE_SIZE // 2)) for _ in range(DEDUPE_SIZE)]
+
+    yield f"dedupe.unique.{DEDUPE_SIZE}", lambda: list(dedupe.unique(palettes))
+
+def similarity_cases():
+    """Similarity index build and nearest-neighbour queries"""
+    palettes = [_colors(5, seed=i) for i in range(INDEX_SIZE)]
+    index = similarity.build(palettes)
+    query = _colors(5, seed=-1)
+
+    yield f"similarity.build.{INDEX_SIZE}", lambda: similarity.build(palettes)
+    yield f"similarity.query.{INDEX_SIZE}", lambda: index.query(query)
+
+def _fill_store(palettes):
+    """Insert palettes into a new in-memory library"""
+    library = store.PaletteStore(":memory:")
+    library.add_many({"palette": palette, "mood": "calm" if i % 5 == 0 else None}
+                     for i, palette in enumerate(palettes))
+    return library
+
+def store_cases():
+    """Palette library bulk inserts and indexed queries"""
+    palettes = [_colors(5, seed=i) for i in range(STORE_SIZE)]
+    library = _fill_store(palettes)
+
+    yield f"store.add_many.{STORE_SIZE}", lambda: _fill_store(palettes).close()
+    yield f"store.query.{STORE_SIZE}", \
+        lambda: list(library.query(mood="calm", min_colors=5, min_contrast_white=2))
+
+def contrast_cases():
+    """WCAG contrast checks"""
+    yield "contrast.ratio", lambda: accessibility.calculate_contrast_ratio(BASE_COLOR, (255, 255, 255))
+    yield "contrast.apca", lambda: accessibility.apca_contrast(BASE_COLOR, (255, 255, 255))
+
+    tokens = _colors(PAIRWISE_SIZE)
+    for metric in accessibility.METRICS:
+        yield f"contrast.matrix.{metric}.{PAIRWISE_SIZE}", \
+            lambda metric=metric: accessibility.contrast_matrix(tokens, tokens, metric)
+
+    # Uncached, as repeated calls with the same pair would only time the cache
+    solve = accessibility._nearest_compliant.__wrapped__
+    yield "contrast.suggest", lambda: solve(BASE_COLOR, (255, 255, 255), accessibility.WCAG_LEVELS["AAA"])
+
+    for size in FORMAT_PALETTE_SIZES:
+        palette = _colors(size, seed=size)
+        yield f"contrast.check_palette.{size}", lambda palette=palette: accessibility.check_contrast(palette)
+
+def generator_cases():
+    """Every generator across palette sizes"""
+    for size in PALETTE_SIZES:
+        yield f"generate.ui.{size}", lambda size=size: ui_palette.generate(BASE_COLOR, size)
+        yield f"generate.ui_dark.{size}", lambda size=size: ui_palette.generate(BASE_COLOR, size, True)
+        for harmony_type in ["complementary", "analogous", "triadic", "tetradic"]:
+            yield (f"generate.harmony.{harmony_type}.{size}",
+                   lambda size=size, harmony_type=harmony_type: harmony.generate(BASE_COLOR, harmony_type, size))
+        yield f"generate.mono.{size}", lambda size=size: monochromatic.generate(BASE_COLOR, size)
+        yield f"generate.accessible.{size}", lambda size=size: accessible.generate(BASE_COLOR, size)
+        yield f"generate.cvd_safe.{size}", lambda size=size: cvd_safe.generate(BASE_COLOR, size)
+
+    for mood_name in mood.MOOD_PROFILES:
+        yield f"generate.mood.{mood_name}", lambda mood_name=mood_name: mood.generate_base_color(mood_name)
+
+def formatter_cases():
+    """Every formatter, rendering in memory"""
+    from colormaestro.formatters import html, image_formatter
+
+    for size in FORMAT_PALETTE_SIZES:
+        palette = ui_palette.generate(BASE_COLOR, size)
+        yield f"format.terminal.{size}", lambda palette=palette: terminal.render(palette, color_depth=24)
+        yield f"format.css.{size}", lambda palette=palette: css.generate(palette)
+        yield f"format.scss.{size}", lambda palette=palette: scss.generate(palette)
+        yield f"format.tailwind.{size}", lambda palette=palette: tailwind.generate(palette)
+        yield f"format.json.{size}", lambda palette=palette: json_formatter.generate(palette)
+        yield f"format.ndjson.{size}", lambda palette=palette: json_formatter.generate_line(palette)
+        yield f"format.html.{size}", lambda palette=palette: html.render(palette)
+        yield f"format.png.{size}", lambda palette=palette: image_formatter.render(palette, "png")
+        yield f"format.svg.{size}", lambda palette=palette: image_formatter.render(palette, "svg")
+
+def _synthetic_image(path, size):
+    """Write a reproducible photo-like test image (gradients plus noise)"""
+    from PIL import Image, ImageChops
+
+    gradient = Image.linear_gradient("L").resize((size, size))
+    # getrandbits rather than randbytes (Python 3.9+), producing the same bytes
+    noise = random.Random(size).getrandbits(8 * size * size).to_bytes(size * size, "little")
+    noise = Image.frombytes("L", (size, size), noise)
+    red = ImageChops.add(gradient, noise.point(lambda v: v // 8))
+    green = gradient.rotate(90)
+    blue = Image.radial_gradient("L").resize((size, size))
+    Image.merge("RGB", (red, green, blue)).save(path)
+
+def image_cases(workdir):
+    """Dominant color extraction, simulation and recoloring on synthetic images of several sizes"""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return
+
+    from colormaestro.formatters import image_formatter
+    from colormaestro.parsers import image_parser
+
+    recolor_palette = ui_palette.generate(BASE_COLOR, 8)
+    for size in IMAGE_SIZES:
+        path = os.path.join(workdir, f"synthetic_{size}.png")
+        _synthetic_image(path, size)
+        yield f"parse.image.{size}", lambda path=path: image_parser.extract_dominant_color(path)
+
+        image = image_parser.load_image(path).convert("RGB")
+        yield f"cvd.image.{size}", lambda image=image: cvd.simulate_image(image, "deutan")
+        yield f"recolor.image.{size}", lambda image=image: image_formatter.recolor(image, recolor_palette)
+        yield f"recolor.dither.{size}", lambda image=image: image_formatter.recolor(image, recolor_palette, True)
+
+def all_cases(workdir):
+    """Get every benchmark case
+
+    Args:
+        workdir (str): Directory for generated input files
+
+    Yields:
+        tuple: (name, function) pairs
+    """
+    yield from conversion_cases()
+    yield from difference_cases()
+    yield from cvd_cases()
+    yield from dedupe_cases()
+    yield from similarity_cases()
+    yield from store_cases()
+    yield from contrast_cases()
+    yield from generator_cases()
+    yield from formatter_cases()
+    yield from image_cases(workdir)
@@ -0,0 +1,231 @@
+"""Memory benchmarks (run with ``python -m benchmarks.memory``)
+
+Each case runs in fresh child processes: one measures peak RSS, the other
+peak Python allocations with tracemalloc (which would otherwise inflate
+RSS). Results are checked against the budgets in memory_budgets.json.
+"""
+import argparse
+import fnmatch
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+DEFAULT_BUDGETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memory_budgets.json")
+
+# Margin added to measured values when saving budgets (0.2 = 20%)
+DEFAULT_HEADROOM = 0.2
+
+# Image sizes in megapixels used for the image extraction cases
+IMAGE_MEGAPIXELS = [1, 10, 50]
+
+# Number of palettes generated or formatted by the bulk cases
+BULK_COUNT = 10000
+
+MB = 1024 * 1024
+
+def _synthetic_image(path, megapixels):
+    """Write a reproducible photo-like JPEG of about the given size"""
+    from PIL import Image, ImageChops
+
+    size = int(math.sqrt(megapixels * 1000000))
+    gradient = Image.linear_gradient("L").resize((size, size))
+    # getrandbits rather than randbytes (Python 3.9+), producing the same bytes
+    noise = random.Random(size).getrandbits(8 * size * size).to_bytes(size * size, "little")
+    noise = Image.frombytes("L", (size, size), noise)
+    red = ImageChops.add(gradient, noise.point(lambda v: v // 8))
+    blue = Image.radial_gradient("L").resize((size, size))
+    Image.merge("RGB", (red, gradient.rotate(90), blue)).save(path, quality=90)
+
+def _palettes():
+    from colormaestro import pipeline
+
+    rng = random.Random(0)
+    colors = [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(BULK_COUNT)]
+    return [pipeline.generate_palette(color, "ui") for color in colors]
+
+def _image_case(megapixels):
+    def prepare(workdir):
+        _synthetic_image(os.path.join(workdir, f"synthetic_{megapixels}mp.jpg"), megapixels)
+
+    def setup(workdir):
+        from colormaestro.parsers import image_parser
+        path = os.path.join(workdir, f"synthetic_{megapixels}mp.jpg")
+        return lambda: image_parser.extract_dominant_color(path)
+
+    return prepare, setup
+
+def _generate_case(workdir):
+    return _palettes
+
+def _css_case(workdir):
+    from colormaestro.formatters import css
+    palettes = _palettes()
+    return lambda: "\n".join(css.generate(palette) for palette in palettes)
+
+def _json_case(workdir):
+    from colormaestro.formatters import json_formatter
+    palettes = _palettes()
+    return lambda: [json_formatter.generate(palette) for palette in palettes]
+
+def _ndjson_case(workdir):
+    from colormaestro.formatters import json_formatter
+    palettes = _palettes()
+    return lambda: json_formatter.write_lines(palettes, io.StringIO())
+
+def cases():
+    """Get the memory benchmark cases
+
+    Returns:
+        dict: Case name to (prepare, setup) functions taking the work
+              directory; prepare (or None) runs once in the parent, setup
+              runs in the child and returns the function to measure
+    """
+    all_cases = {}
+    for megapixels in IMAGE_MEGAPIXELS:
+        all_cases[f"parse.image.{megapixels}mp"] = _image_case(megapixels)
+    all_cases[f"generate.bulk.{BULK_COUNT}"] = (None, _generate_case)
+    all_cases[f"format.bulk.css.{BULK_COUNT}"] = (None, _css_case)
+    all_cases[f"format.bulk.json.{BULK_COUNT}"] = (None, _json_case)
+    all_cases[f"format.bulk.ndjson.{BULK_COUNT}"] = (None, _ndjson_case)
+    return all_cases
+
+def _max_rss():
+    """Get the peak resident set size of this process in bytes (None if unknown)"""
+    # Linux: VmHWM belongs to the current address space, whereas ru_maxrss
+    # is inherited from the parent across fork and exec
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, other systems kilobytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+def _child(name, mode, workdir):
+    """Measure one case in this (fresh) process and print the result as JSON"""
+    func = cases()[name][1](workdir)
+
+    if mode == "tracemalloc":
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(json.dumps({"tracemalloc_peak": peak}))
+    else:
+        func()
+        print(json.dumps({"rss_peak": _max_rss()}))
+
+def measure(name, workdir):
+    """Measure a case in child processes
+
+    Returns:
+        dict: 'tracemalloc_peak' and 'rss_peak' in bytes
+    """
+    result = {}
+    for mode in ("rss", "tracemalloc"):
+        output = subprocess.run([sys.executable, "-m", "benchmarks.memory", "--child", name, mode, workdir],
+                                capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        result.update(json.loads(output.stdout))
+    return result
+
+def check(results, budgets):
+    """Compare results with budgets
+
+    Args:
+        results (dict): Case name to measured values in bytes
+        budgets (dict): Case name to budgets in MB ('tracemalloc_peak_mb', 'rss_peak_mb')
+
+    Returns:
+        list: Messages describing exceeded budgets
+    """
+    failures = []
+    for name, result in results.items():
+        for key, value in result.items():
+            budget = budgets.get(name, {}).get(f"{key}_mb")
+            if budget is not None and value is not None and value / MB > budget:
+                failures.append(f"{name}: {key} {value / MB:.1f} MB exceeds the budget of {budget:.1f} MB")
+    return failures
+
+def budgets_from(results, headroom=DEFAULT_HEADROOM):
+    """Derive budgets from measured results plus headroom"""
+    budgets = {}
+    for name, result in results.items():
+        budgets[name] = {f"{key}_mb": round(value / MB * (1 + headroom), 1)
+                         for key, value in result.items() if value is not None}
+    return budgets
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory",
+                                     description="Measure peak memory use against stored budgets")
+    parser.add_argument("patterns", nargs="*", metavar="PATTERN", help="Glob patterns selecting cases by name")
+    parser.add_argument("-o", "--output", help="Write measurements to this JSON file")
+    parser.add_argument("--budgets", default=DEFAULT_BUDGETS,
+                        help="Budgets JSON file (default: benchmarks/memory_budgets.json)")
+    parser.add_argument("--save-budgets", action="store_true",
+                        help="Store the measurements plus headroom as the new budgets")
+    parser.add_argument("--headroom", type=float, default=DEFAULT_HEADROOM,
+                        help="Margin added to measurements when saving budgets (default: 0.2)")
+    parser.add_argument("--child", nargs=3, metavar=("NAME", "MODE", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(*args.child)
+        return 0
+
+    selected = {name: case for name, case in cases().items()
+                if not args.patterns or any(fnmatch.fnmatchcase(name, p) for p in args.patterns)}
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, (prepare, _) in selected.items():
+            if prepare:
+                prepare(workdir)
+            results[name] = measure(name, workdir)
+            rss = results[name]["rss_peak"]
+            print(f"{name:<30} tracemalloc {results[name]['tracemalloc_peak'] / MB:8.1f} MB   "
+                  f"RSS {rss / MB if rss else float('nan'):8.1f} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.save_budgets:
+        budgets = {}
+        if os.path.exists(args.budgets):
+            with open(args.budgets) as f:
+                budgets = json.load(f)
+        budgets.update(budgets_from(results, args.headroom))
+        with open(args.budgets, "w") as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Budgets saved to: {args.budgets}")
+        return 0
+
+    if not os.path.exists(args.budgets):
+        print(f"No budgets at {args.budgets}; run with --save-budgets to create them")
+        return 0
+
+    with open(args.budgets) as f:
+        failures = check(results, json.load(f))
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import fnmatch
+import json
+import math
+import platform
+import statistics
+import sys
+import timeit
+
+# Allowed slowdown before a benchmark counts as a regression (0.3 = 30%)
+DEFAULT_THRESHOLD = 0.3
+
+# Name of the case measuring the speed of the machine itself
+CALIBRATION = "calibration"
+
+# Benchmarks run between two timings of the calibration case; the fastest
+# timing of a run is kept, so brief slowdowns of the machine do not skew it
+CALIBRATION_INTERVAL = 10
+
+def calibration():
+    """Fixed pure-Python work that no change to the package can speed up
+
+    Timing it in every run and in the baseline tells how much faster or
+    slower this machine is than the one that recorded the baseline.
+    """
+    table = {}
+    total = 0.0
+    for i in range(2000):
+        key = f"{i % 97:02x}"
+        table[key] = table.get(key, 0) + i
+        total += (i * 0.5) ** 0.5
+    return sorted(table.values()), total
+
+def measure(func, repeat=5, min_time=0.2):
+    """Time a function with timeit
+
+    The number of calls per round is chosen so that a round takes at
+    least ``min_time`` seconds, which keeps fast functions measurable.
+
+    Args:
+        func (callable): Function to time, called without arguments
+        repeat (int): Number of rounds
+        min_time (float): Minimum duration of a round in seconds
+
+    Returns:
+        dict: 'min' and 'median' seconds per call, 'number' of calls per round
+              and 'repeat'
+    """
+    timer = timeit.Timer(func)
+
+    # Grow the call count until a round is measurable, then scale it to min_time
+    number = 1
+    elapsed = timer.timeit(number)
+    while elapsed < min_time / 10:
+        number *= 10
+        elapsed = timer.timeit(number)
+    number = max(number, math.ceil(number * min_time / elapsed))
+
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"min": min(times), "median": statistics.median(times), "number": number, "repeat": repeat}
+
+def run(cases, patterns=None, repeat=5, min_time=0.2, progress=None, calibrate=False):
+    """Run benchmark cases
+
+    Args:
+        cases (iterable): (name, function) pairs
+        patterns (list): Glob patterns selecting benchmarks by name (all if empty)
+        repeat (int): Number of timing rounds per benchmark
+        min_time (float): Minimum duration of a round in seconds
+        progress (callable): Called with (name, result) after each benchmark
+        calibrate (bool): Whether to also run the CALIBRATION case, whatever the
+                          patterns, before, during and after the others
+
+    Returns:
+        dict: Benchmark name to result, as returned by ``measure``
+    """
+    results = {}
+
+    def run_calibration():
+        result = measure(calibration, repeat, min_time)
+        if CALIBRATION not in results or result["min"] < results[CALIBRATION]["min"]:
+            results[CALIBRATION] = result
+
+    if calibrate:
+        run_calibration()
+    count = 0
+    for name, func in cases:
+        if patterns and not any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+            continue
+        results[name] = measure(func, repeat, min_time)
+        if progress:
+            progress(name, results[name])
+        count += 1
+        if calibrate and count % CALIBRATION_INTERVAL == 0:
+            run_calibration()
+    if calibrate:
+        run_calibration()
+        if progress:
+            progress(CALIBRATION, results[CALIBRATION])
+    return results
+
+def environment():
+    """Describe the machine and versions the benchmarks ran with"""
+    info = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+    try:
+        import PIL
+        info["pillow"] = PIL.__version__
+    except ImportError:
+        pass
+    return info
+
+def save(path, results, env=None):
+    """Write benchmark results to a JSON file"""
+    with open(path, "w") as f:
+        json.dump({"environment": env or environment(), "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def load(path):
+    """Read benchmark results written by ``save``
+
+    Returns:
+        dict: Benchmark name to result
+    """
+    with open(path) as f:
+        return json.load(f)["results"]
+
+def threshold_for(name, threshold=DEFAULT_THRESHOLD, overrides=None):
+    """Get the regression threshold of a benchmark
+
+    Args:
+        name (str): Benchmark name
+        threshold (float): Default threshold
+        overrides (list): (glob pattern, threshold) pairs; the last match wins
+
+    Returns:
+        float: Allowed relative slowdown
+    """
+    for pattern, value in overrides or []:
+        if fnmatch.fnmatchcase(name, pattern):
+            threshold = value
+    return threshold
+
+def speed_factor(results, baseline):
+    """Get how much slower this machine is than the baseline machine
+
+    Returns:
+        float: Ratio of the CALIBRATION times (1.0 if either run lacks it)
+    """
+    if CALIBRATION not in results or CALIBRATION not in baseline:
+        return 1.0
+    return results[CALIBRATION]["min"] / baseline[CALIBRATION]["min"]
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, overrides=None, normalize=True):
+    """Compare benchmark results with a baseline
+
+    The fastest round ('min') is compared, as it is the least affected by
+    other activity on the machine. Baseline times are scaled by
+    ``speed_factor`` first, so a baseline recorded on another machine
+    still flags only real regressions.
+
+    Args:
+        results (dict): Current results
+        baseline (dict): Baseline results
+        threshold (float): Default allowed relative slowdown
+        overrides (list): (glob pattern, threshold) pairs
+        normalize (bool): Whether to scale by the machine speed (absolute times if False)
+
+    Returns:
+        list: One dict per benchmark present in both, with 'name', 'baseline'
+              (scaled to this machine), 'current', 'ratio', 'threshold' and
+              'regressed' keys
+    """
+    factor = speed_factor(results, baseline) if normalize else 1.0
+    comparison = []
+    for name, result in results.items():
+        if name not in baseline or name == CALIBRATION:
+            continue
+        allowed = threshold_for(name, threshold, overrides)
+        expected = baseline[name]["min"] * factor
+        ratio = result["min"] / expected
+        comparison.append({
+            "name": name,
+            "baseline": expected,
+            "current": result["min"],
+            "ratio": ratio,
+            "threshold": allowed,
+            "regressed": ratio > 1 + allowed,
+        })
+    return comparison
+
+def format_time(seconds):
+    """Format a duration with a readable unit"""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def print_comparison(comparison, file=sys.stdout):
+    """Print a comparison table, marking regressions"""
+    width = max([len(row["name"]) for row in comparison] + [9])
+    print(f"{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}", file=file)
+    for row in comparison:
+        change = f"{(row['ratio'] - 1) * 100:+.1f}%"
+        mark = "  REGRESSION" if row["regressed"] else ""
+        print(f"{row['name']:<{width}}  {format_time(row['baseline']):>10}  "
+              f"{format_time(row['current']):>10}  {change:>8}{mark}", file=file)
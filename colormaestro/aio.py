@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import weakref
+from . import pipeline, export as export_stage
+from .formatters import html, image_formatter
+from .parsers import image_parser
+
+DEFAULT_MAX_CONCURRENCY = 64
+
+_executor = None
+_max_concurrency = DEFAULT_MAX_CONCURRENCY
+_semaphores = weakref.WeakKeyDictionary()
+
+def configure(executor=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """Configure how blocking work is offloaded
+
+    Args:
+        executor (concurrent.futures.Executor): Executor for blocking work
+                                                (the loop's default executor if None)
+        max_concurrency (int): Maximum number of operations running at once per event loop
+    """
+    global _executor, _max_concurrency
+    _executor = executor
+    _max_concurrency = max_concurrency
+    _semaphores.clear()
+
+def _semaphore():
+    """Get the concurrency semaphore of the running event loop"""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(_max_concurrency)
+    return semaphore
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking function on the configured executor
+
+    A per-loop semaphore caps how many operations run at once. Cancelling
+    the awaiting task cancels work that has not started yet; work already
+    running on the executor completes (file writes stay atomic either way)
+    and keeps its slot until it does, so the cap holds across cancellations.
+
+    Args:
+        func (callable): Function to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The return value of func
+    """
+    semaphore = _semaphore()
+    await semaphore.acquire()
+    loop = asyncio.get_running_loop()
+
+    # Whichever of the worker thread and a cancellation comes first decides
+    # who releases the slot: the thread when it finishes, or the
+    # cancellation when the work never started (it is then skipped)
+    lock = threading.Lock()
+    state = {"started": False, "dropped": False}
+
+    def release():
+        try:
+            loop.call_soon_threadsafe(semaphore.release)
+        except RuntimeError:
+            # The loop is closed, and its semaphore with it
+            pass
+
+    def call():
+        with lock:
+            if state["dropped"]:
+                return None
+            state["started"] = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            release()
+
+    try:
+        return await loop.run_in_executor(_executor, call)
+    except asyncio.CancelledError:
+        with lock:
+            if not state["started"]:
+                state["dropped"] = True
+                semaphore.release()
+        raise
+
+async def extract_dominant_color(image_path):
+    """Extract the dominant color from an image (see ``image_parser.extract_dominant_color``)"""
+    return await run_blocking(image_parser.extract_dominant_color, image_path)
+
+async def parse(input, mood=None):
+    """Parse an input into a base color (see ``pipeline.parse_input``)
+
+    Hex and random inputs never touch the disk, so they are parsed on the
+    loop; any other input may be an image file, so even checking for one
+    runs on the executor.
+    """
+    if not input or input.startswith('#'):
+        return pipeline.parse_input(input, mood)
+    return await run_blocking(pipeline.parse_input, input, mood)
+
+async def generate(base_color, palette_type="ui", harmony="complementary", num_colors=5, dark=False, space="hsv"):
+    """Generate a palette (see ``pipeline.generate_palette``)"""
+    return await run_blocking(pipeline.generate_palette, base_color, palette_type, harmony, num_colors, dark, space)
+
+async def generate_html(palette, output_path, show_demo=False, skip_unchanged=False):
+    """Generate an HTML preview file (see ``html.generate``)"""
+    return await run_blocking(html.generate, palette, output_path, show_demo, skip_unchanged)
+
+async def generate_image(palette, output_path, format_type="png", skip_unchanged=False):
+    """Generate an image file of the palette (see ``image_formatter.generate``)"""
+    return await run_blocking(image_formatter.generate, palette, output_path, format_type, skip_unchanged)
+
+async def export(palette, fmt, path=None, show_demo=False, skip_unchanged=False):
+    """Export the palette in a single format (see ``export.export_format``)"""
+    return await run_blocking(export_stage.export_format, palette, fmt, path, show_demo, skip_unchanged)
+
+async def export_all(palette, jobs, show_demo=False, skip_unchanged=False):
+    """Export the palette in several formats concurrently
+
+    Args:
+        palette (list): List of RGB color tuples
+        jobs (list): List of (format, path) tuples, as returned by ``export.plan``
+        show_demo (bool): Whether to show UI component samples
+        skip_unchanged (bool): Leave files untouched if their content is identical
+
+    Returns:
+        list: One dict per job with 'format', 'path', 'output' and 'error' keys, in job order
+    """
+    outputs = await asyncio.gather(
+        *(export(palette, fmt, path, show_demo, skip_unchanged) for fmt, path in jobs),
+        return_exceptions=True
+    )
+
+    results = []
+    for (fmt, path), output in zip(jobs, outputs):
+        # Cancellation of the caller must propagate, not be reported per format
+        if isinstance(output, asyncio.CancelledError):
+            raise output
+        error = output if isinstance(output, Exception) else None
+        results.append({"format": fmt, "path": path, "output": None if error else output, "error": error})
+
+    return results
@@ -0,0 +1,191 @@
+import json
+import os
+import shlex
+from collections import deque
+import click
+from . import pipeline
+from .pipeline import BATCH_FORMATS
+from .formatters import css, scss, tailwind, json_formatter
+
+# Lines sent to a worker per task, to amortize inter-process overhead
+DEFAULT_CHUNK_SIZE = 256
+
+# Chunks in flight per worker; bounds memory regardless of input size
+PENDING_CHUNKS_PER_WORKER = 4
+
+# Options accepted at the end of each input line; --help is an unknown
+# option there rather than printing usage into the output
+_line_command = click.Command('line', add_help_option=False, params=[
+    click.Argument(['input'], required=False),
+    click.Option(['-t', '--type', 'palette_type'], type=click.Choice(pipeline.PALETTE_TYPES)),
+    click.Option(['--harmony'], type=click.Choice(pipeline.HARMONY_TYPES)),
+    click.Option(['-n', '--colors', 'num_colors'], type=int),
+    click.Option(['--mood'], type=click.Choice(pipeline.MOOD_OPTIONS)),
+    click.Option(['--dark'], is_flag=True, default=None),
+    click.Option(['--space'], type=click.Choice(pipeline.COLOR_SPACES)),
+])
+
+def parse_line(line, defaults=None):
+    """Parse a batch input line into palette options
+
+    Lines hold an input followed by optional per-line options, e.g.
+    ``#3A86FF -t harmony --harmony triadic -n 6``.
+
+    Args:
+        line (str): Input line
+        defaults (dict): Default values for options not given on the line
+
+    Returns:
+        dict: Options with 'input', 'palette_type', 'harmony', 'num_colors',
+              'mood', 'dark' and 'space' keys
+    """
+    options = {
+        "input": None,
+        "palette_type": "ui",
+        "harmony": "complementary",
+        "num_colors": 5,
+        "mood": None,
+        "dark": False,
+        "space": "hsv",
+    }
+    options.update(defaults or {})
+
+    ctx = _line_command.make_context('line', shlex.split(line))
+    options.update({key: value for key, value in ctx.params.items() if value is not None})
+
+    return options
+
+def process_line(line, defaults=None, output_format="ndjson"):
+    """Generate and format the palette for one batch input line
+
+    Args:
+        line (str): Input line
+        defaults (dict): Default values for options not given on the line
+        output_format (str): One of BATCH_FORMATS
+
+    Returns:
+        str: Formatted output without a trailing newline
+
+    Raises:
+        ValueError: If the line cannot be parsed or processed
+    """
+    try:
+        options = parse_line(line, defaults)
+    except click.ClickException as e:
+        raise ValueError(e.format_message())
+
+    base_color = pipeline.parse_input(options["input"], options["mood"])
+    palette = pipeline.generate_palette(base_color, options["palette_type"], options["harmony"],
+                                        options["num_colors"], options["dark"], options["space"])
+
+    if output_format == "ndjson":
+        record = json_formatter.generate_line(palette)
+        return '{"input":%s,%s' % (json.dumps(options["input"]), record[1:])
+    elif output_format == "json":
+        return json_formatter.generate(palette)
+    elif output_format == "css":
+        return css.generate(palette)
+    elif output_format == "scss":
+        return scss.generate(palette)
+    elif output_format == "tailwind":
+        return tailwind.generate(palette)
+    elif output_format == "hex":
+        return " ".join(f"#{r:02x}{g:02x}{b:02x}" for r, g, b in palette)
+
+    raise ValueError(f"Unknown batch format: {output_format}")
+
+def _process_chunk(lines, defaults, output_format):
+    """Process a chunk of lines, returning (output, error) pairs"""
+    results = []
+    for line in lines:
+        try:
+            results.append((process_line(line, defaults, output_format), None))
+        except Exception as e:
+            results.append((None, f"{line.strip()}: {e}"))
+    return results
+
+def _chunks(lines, chunk_size):
+    """Group non-blank lines into lists of at most chunk_size lines"""
+    chunk = []
+    for line in lines:
+        if not line.strip():
+            continue
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run(lines, defaults=None, output_format="ndjson", workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Process batch input lines, yielding results in input order
+
+    Lines are read lazily and sent to a process pool in chunks. At most
+    ``PENDING_CHUNKS_PER_WORKER`` chunks per worker are in flight at once,
+    so memory stays bounded however many lines the input has.
+
+    Args:
+        lines (iterable): Input lines
+        defaults (dict): Default values for options not given on a line
+        output_format (str): One of BATCH_FORMATS
+        workers (int): Number of worker processes; 1 processes lines in the
+                       current process (defaults to the number of CPUs)
+        chunk_size (int): Number of lines per worker task
+
+    Yields:
+        tuple: (output, error) per non-blank line; exactly one of them is None
+    """
+    chunks = _chunks(lines, chunk_size)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from _process_chunk(chunk, defaults, output_format)
+        return
+
+    # Loading the process pool machinery is only worth it when it is used
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_pending = workers * PENDING_CHUNKS_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        for chunk in chunks:
+            pending.append(executor.submit(_process_chunk, chunk, defaults, output_format))
+
+            # Back-pressure: wait for the oldest chunk before reading further
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+def rerun(lines, previous, defaults=None, output_format="ndjson", workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Process batch input lines, reusing the results of unchanged lines
+
+    Used by watch mode: only lines whose text is new since the previous run
+    are processed.
+
+    Args:
+        lines (iterable): Input lines
+        previous (dict): Results of an earlier run, as returned by this function
+        defaults (dict): Default values for options not given on a line
+        output_format (str): One of BATCH_FORMATS
+        workers (int): Number of worker processes
+        chunk_size (int): Number of lines per worker task
+
+    Returns:
+        tuple: List of (output, error) pairs in input order, and a dict of
+               results by line to pass as ``previous`` next time
+    """
+    lines = [line.strip() for line in lines if line.strip()]
+    new = [line for line in dict.fromkeys(lines) if line not in previous]
+
+    results = dict(zip(new, run(new, defaults, output_format, workers, chunk_size)))
+    for line in lines:
+        if line not in results:
+            results[line] = previous[line]
+
+    return [results[line] for line in lines], results
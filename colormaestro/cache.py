@@ -0,0 +1,165 @@
+import base64
+import hashlib
+import json
+import os
+from . import __version__
+from .utils import fileio
+
+# Total size of cached entries before the least recently used are evicted
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+ENTRY_SUFFIX = ".json"
+
+# Bytes read at a time when hashing input files
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+def cache_dir():
+    """Get the cache directory
+
+    ``COLORMAESTRO_CACHE_DIR`` overrides the default location under
+    ``XDG_CACHE_HOME`` (``~/.cache`` if unset).
+
+    Returns:
+        str: Directory path (not necessarily existing yet)
+    """
+    directory = os.environ.get("COLORMAESTRO_CACHE_DIR")
+    if directory:
+        return directory
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "colormaestro")
+
+def file_digest(path):
+    """Hash the content of a file
+
+    Args:
+        path (str): File path
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DIGEST_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def make_key(**parts):
+    """Build a cache key from the parameters that determine a result
+
+    The package version is always part of the key, so upgrades never
+    replay outputs rendered by older code.
+
+    Args:
+        **parts: JSON-serializable values
+
+    Returns:
+        str: Hex digest identifying the result
+    """
+    parts["version"] = __version__
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def _entry_path(key, directory):
+    return os.path.join(directory or cache_dir(), key + ENTRY_SUFFIX)
+
+def get(key, directory=None):
+    """Look up a cached result
+
+    A hit marks the entry as recently used.
+
+    Args:
+        key (str): Key from ``make_key``
+        directory (str): Cache directory (``cache_dir()`` if None)
+
+    Returns:
+        dict: Entry with 'palette' (list of RGB tuples) and 'contents'
+              (format name to rendered content) keys, or None on a miss
+    """
+    path = _entry_path(key, directory)
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        os.utime(path)
+    except (OSError, ValueError):
+        # Missing, concurrently evicted or corrupt entries are misses
+        return None
+
+    contents = {}
+    for fmt, item in data["contents"].items():
+        contents[fmt] = base64.b64decode(item["data"]) if item["binary"] else item["data"]
+
+    return {"palette": [tuple(rgb) for rgb in data["palette"]], "contents": contents}
+
+def put(key, palette, contents, directory=None, max_size=DEFAULT_MAX_SIZE):
+    """Store a result, evicting the least recently used entries beyond max_size
+
+    Args:
+        key (str): Key from ``make_key``
+        palette (list): List of RGB color tuples
+        contents (dict): Format name to rendered content (str or bytes)
+        directory (str): Cache directory (``cache_dir()`` if None)
+        max_size (int): Maximum total size of the cache in bytes
+    """
+    encoded = {}
+    for fmt, content in contents.items():
+        if isinstance(content, bytes):
+            encoded[fmt] = {"binary": True, "data": base64.b64encode(content).decode("ascii")}
+        else:
+            encoded[fmt] = {"binary": False, "data": content}
+
+    data = json.dumps({"palette": [list(rgb) for rgb in palette], "contents": encoded})
+    fileio.write_atomic(_entry_path(key, directory), data)
+    evict(directory, max_size)
+
+def _entries(directory):
+    """List cache entries as (mtime, size, path) tuples"""
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith(ENTRY_SUFFIX) and entry.is_file():
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        pass
+    return entries
+
+def evict(directory=None, max_size=DEFAULT_MAX_SIZE):
+    """Remove the least recently used entries until the cache fits in max_size
+
+    Args:
+        directory (str): Cache directory (``cache_dir()`` if None)
+        max_size (int): Maximum total size of the cache in bytes
+
+    Returns:
+        int: Number of entries removed
+    """
+    entries = sorted(_entries(directory or cache_dir()))
+    total = sum(size for _, size, _ in entries)
+
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        total -= size
+
+    return removed
+
+def clear(directory=None):
+    """Remove every cache entry
+
+    Args:
+        directory (str): Cache directory (``cache_dir()`` if None)
+
+    Returns:
+        int: Number of entries removed
+    """
+    return evict(directory, max_size=-1)
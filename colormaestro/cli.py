@@ -1,110 +1,839 @@
 #!/usr/bin/env python3
+from array import array
 import os
+import random
 import click
-from pathlib import Path
-from .parsers import hex_parser, name_parser, image_parser
-from .generators import harmony as harmony_generator, ui_palette, monochromatic, accessible, mood as mood_generator
-from .formatters import terminal, html, css, scss, tailwind, json_formatter, image_formatter
-from .utils import color_conversion, accessibility as accessibility_utils
-
-PALETTE_TYPES = ["ui", "harmony", "mono", "accessible"]
-HARMONY_TYPES = ["complementary", "analogous", "triadic", "tetradic"]
-OUTPUT_FORMATS = ["terminal", "html", "css", "scss", "tailwind", "json", "png", "svg"]
-MOOD_OPTIONS = ["professional", "playful", "serious", "calm", "energetic"]
-
-@click.command()
+from .formatters import terminal, json_formatter
+from .utils import accessibility as accessibility_utils, color_conversion, color_difference, cvd, fileio
+from .pipeline import PALETTE_TYPES, HARMONY_TYPES, MOOD_OPTIONS, COLOR_SPACES, BATCH_FORMATS
+from . import export, pipeline, profiling
+
+OUTPUT_FORMATS = ["terminal", "html", "css", "scss", "tailwind", "json", "ndjson", "png", "svg"]
+
+class DefaultCommandGroup(click.Group):
+    """Command group that falls back to a default command
+
+    Arguments that do not start with a subcommand name are passed to the
+    default command, so ``colormaestro '#3A86FF' -o css`` keeps working
+    alongside ``colormaestro batch``.
+    """
+
+    def __init__(self, *args, default_command=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if not args or (args[0] not in self.commands and args[0] != '--help'):
+            args = [self.default_command] + list(args)
+        return super().parse_args(ctx, args)
+
+@click.group(cls=DefaultCommandGroup, default_command='generate')
+def cli():
+    """Color Palette Maestro: Generate stunning color palettes instantly
+
+    Run 'colormaestro [INPUT] [OPTIONS]' to generate a palette (see
+    'colormaestro generate --help'), or use one of the commands below.
+    """
+
+def _clear_cache(ctx, param, value):
+    """Clear the result cache and exit"""
+    if not value or ctx.resilient_parsing:
+        return
+    from . import cache
+
+    removed = cache.clear()
+    click.echo(f"Removed {removed} cached result(s) from {cache.cache_dir()}")
+    ctx.exit()
+
+def _cache_key(input, kind, seed, mood, palette_type, harmony, num_colors, dark, space, demo, formats):
+    """Build the result cache key for a generate run (None if it must not be cached)"""
+    from . import cache
+
+    if kind == "random":
+        # Random palettes are only reproducible with a seed
+        if seed is None:
+            return None
+        source = {"seed": seed, "mood": mood}
+    elif kind == "image":
+        # Key on the image content, so edits invalidate and renames do not
+        source = {"image": cache.file_digest(input)}
+    elif kind == "hex":
+        source = {"hex": input.lower()}
+    else:
+        source = {"name": input.lower().replace(' ', '-')}
+
+    return cache.make_key(
+        kind=kind,
+        source=source,
+        palette_type=palette_type,
+        harmony=harmony,
+        num_colors=num_colors,
+        dark=dark,
+        space=space,
+        demo=demo,
+        formats=sorted(formats),
+        # Terminal output depends on the color depth of the terminal
+        color_depth=terminal.detect_color_depth() if "terminal" in formats else None,
+    )
+
+@cli.command()
 @click.argument('input', required=False)
 @click.option('-t', '--type', 'palette_type', type=click.Choice(PALETTE_TYPES), default="ui",
-              help='Palette type: ui, harmony, mono, accessible')
+              help='Palette type: ui, harmony, mono, accessible, cvd-safe')
 @click.option('--harmony', type=click.Choice(HARMONY_TYPES), default="complementary",
               help='Harmony type: complementary, analogous, triadic, tetradic')
 @click.option('-n', '--colors', 'num_colors', type=int, default=5,
               help='Number of colors to generate (default: 5)')
 @click.option('-o', '--output', 'output_format', type=str, default="terminal",
-              help='Output format: terminal, html, css, scss, tailwind, json, png, svg')
+              help='Output format: terminal, html, css, scss, tailwind, json, ndjson, png, svg')
 @click.option('--html', 'html_filename', type=str, help='Generate HTML preview file')
 @click.option('--image', 'image_filename', type=str, help='Generate image file of palette')
 @click.option('--mood', type=click.Choice(MOOD_OPTIONS), help='Color mood')
 @click.option('--dark', is_flag=True, help='Generate dark mode variant')
+@click.option('--space', type=click.Choice(COLOR_SPACES), default="hsv",
+              help='Color space ui, harmony, mono and accessible palettes are computed in: hsv, oklch, lch')
 @click.option('--light', is_flag=True, help='Generate light mode variant')
 @click.option('--demo', is_flag=True, help='Show sample UI elements with palette')
 @click.option('--accessibility', 'check_accessibility', is_flag=True, help='Check WCAG contrast compliance')
+@click.option('--apca-level', type=click.Choice(list(accessibility_utils.APCA_LEVELS)), default="content",
+              help='APCA level reported by --accessibility: body (Lc 75), content (60), large (45), non-text (30)')
 @click.option('--copy', is_flag=True, help='Copy primary color to clipboard')
-def cli(input, palette_type, harmony, num_colors, output_format, html_filename,
-        image_filename, mood, dark, light, demo, check_accessibility, copy):
-    """Color Palette Maestro: Generate stunning color palettes instantly
+@click.option('--out-dir', 'output_dir', type=click.Path(file_okay=False),
+              help='Write css, scss, tailwind and json outputs (and default file names) to this directory')
+@click.option('--skip-unchanged', is_flag=True, help='Do not rewrite output files whose content has not changed')
+@click.option('-j', '--jobs', 'jobs_count', type=int, default=None,
+              help='Maximum number of formats exported in parallel (default: one per format, up to 8)')
+@click.option('--preview', is_flag=True, help='Show a terminal preview of the input image')
+@click.option('--preview-cells', type=int, default=terminal.MAX_PREVIEW_CELLS,
+              help='Maximum number of character cells used by the image preview')
+@click.option('--profile', is_flag=True, help='Print the time spent in each stage to stderr')
+@click.option('--profile-output', type=click.Path(dir_okay=False),
+              help='Write cProfile stats of the run to this file (implies --profile; exports run serially)')
+@click.option('--seed', type=int, help='Seed for random palettes (makes them reproducible and cacheable)')
+@click.option('--cache/--no-cache', 'use_cache', default=False, envvar='COLORMAESTRO_CACHE', show_envvar=True,
+              help='Replay outputs of identical earlier runs from the result cache')
+@click.option('--clear-cache', is_flag=True, expose_value=False, is_eager=True, callback=_clear_cache,
+              help='Remove all cached results and exit')
+@click.option('--save', is_flag=True, help='Save the palette to the palette library (see the library command)')
+@click.option('--recolor', 'recolor_image', type=click.Path(exists=True, dir_okay=False),
+              help='Apply the palette to an image, saved as NAME.recolored.png (in --out-dir if set)')
+@click.option('--dither', is_flag=True, help='Use Floyd-Steinberg dithering with --recolor')
+@click.option('--watch', is_flag=True, help='Regenerate whenever the input image changes')
+@click.option('--poll-interval', type=float,
+              help='Seconds between checks of watched files (default: 0.5)')
+@click.option('--debounce', type=float,
+              help='Seconds a changed file must stay unchanged before regenerating (default: 0.3)')
+def generate(input, palette_type, harmony, num_colors, output_format, html_filename,
+        image_filename, mood, dark, space, light, demo, check_accessibility, apca_level, copy,
+        output_dir, skip_unchanged, jobs_count, preview, preview_cells, profile, profile_output,
+        seed, use_cache, save, recolor_image, dither, watch, poll_interval, debounce):
+    """Generate a color palette (the default command)
 
     INPUT can be a hex color (#3A86FF), color name (sky-blue), or path to an image file.
     If no INPUT is provided, a random palette will be generated.
     """
+    # Reports are emitted when the command finishes, including on errors
+    ctx = click.get_current_context()
+    timer = profiling.StageTimer(enabled=profile or bool(profile_output))
+    if profile_output:
+        ctx.call_on_close(profiling.start_cprofile(profile_output))
+        # cProfile only sees the calling thread
+        jobs_count = 1
+    if timer.enabled:
+        ctx.call_on_close(lambda: click.echo(timer.report(), err=True))
+
     click.echo(click.style("Color Palette Maestro", fg="bright_magenta", bold=True))
     click.echo("──────────────────────────────────────")
 
     # Parse input
-    base_color = None
-    if not input:
+    kind = pipeline.input_kind(input)
+    if kind == "random":
         click.echo("Generating random palette...")
-        if mood:
-            base_color = mood_generator.generate_base_color(mood)
-        else:
-            base_color = color_conversion.random_color()
-    elif input.startswith('#'):
+    elif kind == "hex":
         click.echo(f"Parsing hex color: {input}")
-        base_color = hex_parser.parse(input)
-    elif os.path.isfile(input):
+    elif kind == "image":
         click.echo(f"Extracting colors from image: {input}")
-        base_color = image_parser.extract_dominant_color(input)
     else:
         click.echo(f"Parsing color name: {input}")
-        base_color = name_parser.parse(input)
-
-    # Generate palette
-    palette = None
-    if palette_type == "ui":
-        palette = ui_palette.generate(base_color, num_colors, dark)
-    elif palette_type == "harmony":
-        palette = harmony_generator.generate(base_color, harmony, num_colors)
-    elif palette_type == "mono":
-        palette = monochromatic.generate(base_color, num_colors)
-    elif palette_type == "accessible":
-        palette = accessible.generate(base_color, num_colors)
-
-    # Output formatting
-    output_formats = output_format.split(',')
-    for fmt in output_formats:
-        fmt = fmt.strip()
-        if fmt == "terminal":
-            terminal.display(palette, show_demo=demo)
-        elif fmt == "html" or html_filename:
-            html_path = html_filename or "palette.html"
-            html.generate(palette, html_path, show_demo=demo)
-            click.echo(f"HTML preview saved to: {html_path}")
-        elif fmt == "css":
-            css_output = css.generate(palette)
-            click.echo(css_output)
-        elif fmt == "scss":
-            scss_output = scss.generate(palette)
-            click.echo(scss_output)
-        elif fmt == "tailwind":
-            tailwind_output = tailwind.generate(palette)
-            click.echo(tailwind_output)
-        elif fmt == "json":
-            json_output = json_formatter.generate(palette)
-            click.echo(json_output)
-        elif fmt in ["png", "svg"] or image_filename:
-            img_path = image_filename or f"palette.{fmt}"
-            image_formatter.generate(palette, img_path, fmt)
-            click.echo(f"Image saved to: {img_path}")
-
-    # Additional features
-    if check_accessibility:
-        results = accessibility_utils.check_contrast(palette)
-        accessibility_utils.display_results(results)
-
-    if copy:
-        primary_color = palette[0]
-        # Copy to clipboard - platform specific code would go here
-        click.echo(f"Primary color {primary_color} copied to clipboard")
+
+    if seed is not None:
+        random.seed(seed)
+
+    if watch and kind != "image":
+        raise click.UsageError("--watch needs an image file as INPUT")
+
+    jobs = export.plan(output_format.split(','), html_filename, image_filename, output_dir)
+    if use_cache:
+        from . import cache
+
+    def run(previous_palette=None):
+        """Run the pipeline once
+
+        When re-running after a change, exports are skipped if the palette
+        did not change, and only files whose content changed are rewritten.
+
+        Returns:
+            tuple: (palette, failed)
+        """
+        cache_key = cached = None
+        if use_cache:
+            with timer.stage("cache lookup"):
+                cache_key = _cache_key(input, kind, seed, mood, palette_type, harmony, num_colors, dark, space, demo,
+                                       [fmt for fmt, _ in jobs])
+                if cache_key:
+                    cached = cache.get(cache_key)
+
+        if kind == "image" and preview:
+            with timer.stage("image preview"):
+                terminal.show_image(input, max_cells=preview_cells)
+
+        if cached:
+            # Replay the rendered outputs; only the files are (re)written
+            palette = cached["palette"]
+            if palette == previous_palette:
+                click.echo("Palette unchanged")
+                return palette, False
+            with timer.stage("cache replay"):
+                results = export.replay(jobs, cached["contents"], skip_unchanged or previous_palette is not None)
+        else:
+            with timer.stage("image decode" if kind == "image" else "parse"):
+                base_color = pipeline.parse_input(input, mood, kind)
+
+            # Generate palette
+            with timer.stage("generate"):
+                palette = pipeline.generate_palette(base_color, palette_type, harmony, num_colors, dark, space)
+
+            if palette == previous_palette:
+                click.echo("Palette unchanged")
+                return palette, False
+
+            # Output formatting
+            results = export.export_all(palette, jobs, show_demo=demo, max_workers=jobs_count,
+                                        skip_unchanged=skip_unchanged or previous_palette is not None, timer=timer)
+
+            if cache_key and all(result["error"] is None for result in results):
+                with timer.stage("cache store"):
+                    cache.put(cache_key, palette, {result["format"]: result["content"] for result in results})
+
+        failed = False
+        with timer.stage("output"):
+            for result in results:
+                if result["error"] is not None:
+                    failed = True
+                    click.echo(click.style(f"Error exporting {result['format']}: {result['error']}", fg="red"), err=True)
+                else:
+                    click.echo(result["output"], nl=False)
+
+        # Additional features
+        if check_accessibility:
+            with timer.stage("accessibility"):
+                results = accessibility_utils.check_contrast(palette, apca_level)
+                accessibility_utils.display_results(results)
+                accessibility_utils.display_near_duplicates(palette)
+                accessibility_utils.display_color_vision(palette)
+
+        if recolor_image:
+            from .formatters import image_formatter
+
+            with timer.stage("recolor"):
+                path = image_formatter.generate_recolored(recolor_image, palette,
+                                                          _recolored_path(recolor_image, output_dir), dither,
+                                                          skip_unchanged or previous_palette is not None)
+            click.echo(f"Recolored image saved to: {path}")
+
+        if save:
+            # Loads sqlite3, so only imported when saving
+            from . import store
+
+            with timer.stage("library"), store.PaletteStore() as library:
+                palette_id = library.add(palette, palette_type, mood, input)
+            click.echo(f"Palette saved to the library with id {palette_id}")
+
+        if copy:
+            primary_color = palette[0]
+            # Copy to clipboard - platform specific code would go here
+            click.echo(f"Primary color {primary_color} copied to clipboard")
+
+        return palette, failed
+
+    palette, failed = run()
+
+    if watch:
+        click.echo(f"Watching {input} for changes (Ctrl+C to stop)")
+        try:
+            for _ in _watch_changes([input], poll_interval, debounce):
+                click.echo(f"\n{input} changed, regenerating...")
+                try:
+                    palette, failed = run(palette)
+                except Exception as e:
+                    # Keep watching: the next save may fix the input
+                    click.echo(click.style(f"Error: {e}", fg="red"), err=True)
+        except KeyboardInterrupt:
+            pass
+
+    if failed:
+        raise SystemExit(1)
+
+@cli.command()
+@click.argument('input_file', type=click.File('r'), default='-')
+@click.option('-f', '--format', 'output_format', type=click.Choice(BATCH_FORMATS), default="ndjson",
+              help='Output format for each input (default: ndjson)')
+@click.option('--out', 'output_file', type=click.File('w'), default='-', help='Output file (default: stdout)')
+@click.option('-w', '--workers', type=int, default=None, help='Number of worker processes (default: CPU count)')
+@click.option('--chunk-size', type=int,
+              help='Number of input lines sent to a worker at a time (default: 256)')
+@click.option('-t', '--type', 'palette_type', type=click.Choice(PALETTE_TYPES), default="ui",
+              help='Default palette type')
+@click.option('--harmony', type=click.Choice(HARMONY_TYPES), default="complementary",
+              help='Default harmony type')
+@click.option('-n', '--colors', 'num_colors', type=int, default=5, help='Default number of colors')
+@click.option('--mood', type=click.Choice(MOOD_OPTIONS), help='Default mood for random palettes')
+@click.option('--dark', is_flag=True, help='Generate dark mode variants by default')
+@click.option('--space', type=click.Choice(COLOR_SPACES), default="hsv",
+              help='Default color space of ui, harmony, mono and accessible palettes')
+@click.option('--watch', is_flag=True, help='Re-run whenever INPUT_FILE changes, reprocessing changed lines only')
+@click.option('--poll-interval', type=float,
+              help='Seconds between checks of INPUT_FILE (default: 0.5)')
+@click.option('--debounce', type=float,
+              help='Seconds a changed INPUT_FILE must stay unchanged before re-running (default: 0.3)')
+def batch(input_file, output_format, output_file, workers, chunk_size, palette_type, harmony,
+          num_colors, mood, dark, space, watch, poll_interval, debounce):
+    """Generate palettes for many inputs, one per line
+
+    Each line of INPUT_FILE (stdin by default) holds an input (hex color,
+    color name or image path), optionally followed by options overriding
+    the defaults, e.g. '#3A86FF -t harmony --harmony triadic -n 6'.
+    Results are streamed in input order; failing lines are reported on stderr.
+    """
+    from . import batch as batch_mode
+
+    if chunk_size is None:
+        chunk_size = batch_mode.DEFAULT_CHUNK_SIZE
+    defaults = {
+        "palette_type": palette_type,
+        "harmony": harmony,
+        "num_colors": num_colors,
+        "mood": mood,
+        "dark": dark,
+        "space": space,
+    }
+
+    if watch:
+        _watch_batch(input_file, output_file, defaults, output_format, workers, chunk_size,
+                     poll_interval, debounce)
+        return
+
+    failures = 0
+    for output, error in batch_mode.run(input_file, defaults, output_format, workers, chunk_size):
+        if error is not None:
+            failures += 1
+            click.echo(click.style(f"Error: {error}", fg="red"), err=True)
+        else:
+            output_file.write(output if output.endswith("\n") else output + "\n")
+
+    if failures:
+        click.echo(f"{failures} input(s) failed", err=True)
+        raise SystemExit(1)
+
+def _watch_batch(input_file, output_file, defaults, output_format, workers, chunk_size, poll_interval, debounce):
+    """Re-run a batch whenever its input file changes, reprocessing changed lines only"""
+    from . import batch as batch_mode
+
+    if input_file.name == '<stdin>':
+        raise click.UsageError("--watch needs an INPUT_FILE path")
+
+    path = input_file.name
+    input_file.close()
+    to_stdout = output_file.name == '<stdout>'
+
+    previous = {}
+
+    def run():
+        nonlocal previous
+        with open(path) as f:
+            results, previous = batch_mode.rerun(f, previous, defaults, output_format, workers, chunk_size)
+
+        lines = []
+        for output, error in results:
+            if error is not None:
+                click.echo(click.style(f"Error: {error}", fg="red"), err=True)
+            else:
+                lines.append(output if output.endswith("\n") else output + "\n")
+
+        if to_stdout:
+            click.echo("".join(lines), nl=False)
+        elif fileio.write_if_changed(output_file.name, "".join(lines)):
+            click.echo(f"Output saved to: {output_file.name}", err=True)
+        else:
+            click.echo(f"Output unchanged: {output_file.name}", err=True)
+
+    run()
+    click.echo(f"Watching {path} for changes (Ctrl+C to stop)", err=True)
+    try:
+        for _ in _watch_changes([path], poll_interval, debounce):
+            run()
+    except KeyboardInterrupt:
+        pass
+
+@cli.command()
+@click.argument('input_file', type=click.File('r'), default='-')
+@click.option('--out', 'output_file', type=click.File('w'), default='-', help='Output file (default: stdout)')
+@click.option('--threshold', type=float,
+              help='Largest OKLab distance between matching colors of duplicates (default: 0.02)')
+@click.option('--clusters', is_flag=True,
+              help='Print "LINE<TAB>FIRST_LINE" for every palette instead of the unique lines')
+def dedupe(input_file, output_file, threshold, clusters):
+    """Remove near-duplicate palettes from a collection
+
+    Each line of INPUT_FILE (stdin by default) holds a palette: a json or
+    ndjson record, or hex colors separated by spaces or commas. The first
+    palette of each group of perceptually identical palettes is kept, in
+    input order; palettes are streamed, so the output starts right away.
+    """
+    from . import dedupe as dedupe_mode
+
+    if threshold is None:
+        threshold = dedupe_mode.DEFAULT_THRESHOLD
+    try:
+        deduplicator = dedupe_mode.Deduplicator(threshold)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--threshold'")
+
+    # Input line number of each palette added to the deduplicator
+    line_numbers = array("q")
+    failures = 0
+    for line_number, line in enumerate(input_file, 1):
+        if not line.strip():
+            continue
+        try:
+            palette = dedupe_mode.parse_line(line)
+        except ValueError as e:
+            failures += 1
+            click.echo(click.style(f"Error on line {line_number}: {e}", fg="red"), err=True)
+            continue
+
+        line_numbers.append(line_number)
+        representative = deduplicator.add(palette)
+        if clusters:
+            output_file.write(f"{line_number}\t{line_numbers[representative]}\n")
+        elif representative == len(line_numbers) - 1:
+            output_file.write(line if line.endswith("\n") else line + "\n")
+
+    click.echo(f"{deduplicator.unique} unique of {deduplicator.count} palette(s)", err=True)
+    if failures:
+        click.echo(f"{failures} line(s) could not be parsed", err=True)
+        raise SystemExit(1)
+
+@cli.command('index')
+@click.argument('input_file', type=click.File('r'), default='-')
+@click.option('-o', '--out', 'index_path', type=click.Path(dir_okay=False), required=True,
+              help='Index file to write')
+@click.option('--lists', type=int, help='Number of inverted lists (default: about the square root of the palette count)')
+def index_command(input_file, index_path, lists):
+    """Build a similarity index from a palette collection
+
+    Each line of INPUT_FILE (stdin by default) holds a palette, as for the
+    dedupe command. Result ids of the index are the positions of the valid
+    palettes in the input, starting at 0.
+    """
+    from . import similarity, dedupe as dedupe_mode
+
+    def palettes():
+        for line_number, line in enumerate(input_file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield dedupe_mode.parse_line(line)
+            except ValueError as e:
+                click.echo(click.style(f"Skipping line {line_number}: {e}", fg="red"), err=True)
+
+    try:
+        index = similarity.build(palettes(), lists)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    index.save(index_path)
+    click.echo(f"Indexed {len(index)} palette(s) in {index_path}", err=True)
+
+@cli.command()
+@click.argument('index_path', type=click.Path(exists=True, dir_okay=False))
+@click.argument('palette')
+@click.option('-k', 'count', type=int, default=10, help='Number of results (default: 10)')
+@click.option('--nprobe', type=int, default=None,
+              help='Inverted lists scanned; higher is slower but more exact (default: 8)')
+def similar(index_path, palette, count, nprobe):
+    """Find the indexed palettes most similar to PALETTE
+
+    PALETTE holds hex colors separated by spaces or commas. Results are
+    printed nearest first as ID, distance and colors.
+    """
+    from . import similarity, dedupe as dedupe_mode
+
+    try:
+        colors = dedupe_mode.parse_line(palette)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'PALETTE'")
+
+    with similarity.Index.load(index_path) as index:
+        results = index.query(colors, count, nprobe or similarity.DEFAULT_NPROBE)
+        for palette_id, distance in results:
+            hex_colors = " ".join(color_conversion.rgb_to_hex(rgb) for rgb in index.palette(palette_id))
+            click.echo(f"{palette_id}\t{distance:.4f}\t{hex_colors}")
+
+def _watch_changes(paths, poll_interval, debounce):
+    """Watch files for changes, with the watch module defaults for unset options"""
+    from . import watch as watch_mode
+
+    return watch_mode.changes(paths,
+                              watch_mode.DEFAULT_INTERVAL if poll_interval is None else poll_interval,
+                              watch_mode.DEFAULT_DEBOUNCE if debounce is None else debounce)
+
+def _recolored_path(image_path, output_dir=None):
+    """Default path of a recolored image: NAME.recolored.png"""
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    return os.path.join(output_dir or "", f"{stem}.recolored.png")
+
+@cli.command()
+@click.argument('image', type=click.Path(exists=True, dir_okay=False))
+@click.argument('palette')
+@click.option('--out', 'output_path', type=click.Path(dir_okay=False),
+              help='Output image; the format follows the extension (default: NAME.recolored.png)')
+@click.option('--dither', is_flag=True, help='Use Floyd-Steinberg dithering')
+@click.option('--skip-unchanged', is_flag=True, help='Do not rewrite the output file if its content has not changed')
+def recolor(image, palette, output_path, dither, skip_unchanged):
+    """Preview a palette on an image
+
+    Every pixel of IMAGE is replaced with its nearest color of PALETTE
+    (hex colors separated by spaces or commas).
+    """
+    from .formatters import image_formatter
+    from . import dedupe as dedupe_mode
+
+    try:
+        colors = dedupe_mode.parse_line(palette)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'PALETTE'")
+
+    try:
+        path = image_formatter.generate_recolored(image, colors, output_path or _recolored_path(image),
+                                                  dither, skip_unchanged)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'PALETTE'")
+    click.echo(f"Recolored image saved to: {path}")
+
+@cli.command()
+@click.argument('input')
+@click.option('-d', '--deficiency', 'deficiencies', type=click.Choice(cvd.DEFICIENCIES), multiple=True,
+              help='Deficiency to simulate (repeatable; default: all)')
+@click.option('--severity', type=click.FloatRange(0, 1), default=1.0,
+              help='0 (normal vision) to 1 (dichromacy) (default: 1)')
+@click.option('--method', type=click.Choice(cvd.METHODS), default="machado",
+              help='Simulation model: machado, or vienot for protan and deutan (default: machado)')
+@click.option('--out-dir', 'output_dir', type=click.Path(file_okay=False), default='.',
+              help='Directory simulated images are written to (default: current directory)')
+def simulate(input, deficiencies, severity, method, output_dir):
+    """Simulate color vision deficiencies on a palette or an image
+
+    INPUT is either hex colors separated by spaces or commas, printed as
+    simulated hex colors per deficiency, or an image file, written as
+    NAME.DEFICIENCY.png to --out-dir.
+    """
+    deficiencies = deficiencies or cvd.DEFICIENCIES
+    try:
+        for deficiency in deficiencies:
+            cvd.matrix(deficiency, severity, method)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    if os.path.isfile(input):
+        from .parsers import image_parser
+
+        image = image_parser.load_image(input)
+        os.makedirs(output_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(input))[0]
+        for deficiency in deficiencies:
+            path = os.path.join(output_dir, f"{stem}.{deficiency}.png")
+            cvd.simulate_image(image, deficiency, severity, method).save(path)
+            click.echo(f"Image saved to: {path}")
+        return
+
+    from . import dedupe as dedupe_mode
+
+    try:
+        palette = dedupe_mode.parse_line(input)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'INPUT'")
+    for deficiency in deficiencies:
+        hex_colors = " ".join(color_conversion.rgb_to_hex(rgb) for rgb in cvd.simulate(palette, deficiency, severity, method))
+        click.echo(f"{deficiency}\t{hex_colors}")
+
+@cli.command()
+@click.argument('input_file', type=click.File('r'), default='-')
+@click.option('--severity', type=click.FloatRange(0, 1), default=1.0,
+              help='0 (normal vision) to 1 (dichromacy) (default: 1)')
+@click.option('--method', type=click.Choice(cvd.METHODS), default="machado",
+              help='Simulation model: machado, or vienot for protan and deutan only (default: machado)')
+@click.option('--metric', type=click.Choice(color_difference.METRICS), default="ciede2000",
+              help='Color difference metric (default: ciede2000)')
+@click.option('--threshold', type=float,
+              help='Smallest difference between distinguishable colors (default: 10 for ciede2000, 0.1 for oklab)')
+@click.option('--failing', is_flag=True, help='Only print palettes with confusable colors')
+def audit(input_file, severity, method, metric, threshold, failing):
+    """Check that palettes stay distinguishable with color vision deficiencies
+
+    Each line of INPUT_FILE (stdin by default) holds a palette, as for the
+    dedupe command. For each palette, the smallest difference between two
+    of its colors is printed for normal vision and after simulating
+    protan, deutan and tritan vision, as
+    "LINE<TAB>NORMAL<TAB>PROTAN<TAB>DEUTAN<TAB>TRITAN<TAB>ok|confusable".
+    The vienot method only models protan and deutan vision, so its lines
+    have no TRITAN column:
+    "LINE<TAB>NORMAL<TAB>PROTAN<TAB>DEUTAN<TAB>ok|confusable".
+    """
+    from . import dedupe as dedupe_mode
+
+    deficiencies = cvd.DEFICIENCIES if method == "machado" else ["protan", "deutan"]
+
+    # Input line number of each palette, in order
+    line_numbers = array("q")
+
+    def palettes():
+        for line_number, line in enumerate(input_file, 1):
+            if not line.strip():
+                continue
+            try:
+                palette = dedupe_mode.parse_line(line)
+            except ValueError as e:
+                click.echo(click.style(f"Skipping line {line_number}: {e}", fg="red"), err=True)
+                continue
+            line_numbers.append(line_number)
+            yield palette
+
+    confusable = 0
+    for k, report in enumerate(cvd.audit(palettes(), deficiencies, severity, method, metric, threshold)):
+        failed = any(result["confusable"] for result in report.values())
+        confusable += failed
+        if failing and not failed:
+            continue
+        columns = ["-" if result["min_difference"] is None else f"{result['min_difference']:.4g}"
+                   for result in report.values()]
+        click.echo("\t".join([str(line_numbers[k])] + columns + ["confusable" if failed else "ok"]))
+
+    click.echo(f"{confusable} of {len(line_numbers)} palette(s) have confusable colors", err=True)
+    if confusable:
+        raise SystemExit(1)
+
+def _suggestion_column(foreground, background, result, wcag_level):
+    """Format the nearest passing foreground of a pair for the contrast command"""
+    if result["wcag"]:
+        return "-"
+    suggestion = accessibility_utils.nearest_compliant_color(foreground, background, wcag_level)
+    return color_conversion.rgb_to_hex(suggestion) if suggestion else "-"
+
+@cli.command()
+@click.argument('foregrounds', type=click.File('r'))
+@click.argument('backgrounds', type=click.File('r'))
+@click.option('--wcag-level', type=click.Choice(list(accessibility_utils.WCAG_LEVELS)), default="AA",
+              help='WCAG 2 level pairs must reach: AA (4.5:1), AAA (7:1), AA-large (3:1) (default: AA)')
+@click.option('--apca-level', type=click.Choice(list(accessibility_utils.APCA_LEVELS)), default="content",
+              help='APCA level pairs must reach: body (Lc 75), content (60), large (45), non-text (30) (default: content)')
+@click.option('--failing', is_flag=True, help='Only print pairs failing either metric')
+@click.option('--strict', is_flag=True, help='Exit with status 1 if any pair fails either metric')
+@click.option('--suggest', is_flag=True,
+              help='Add the nearest foreground of the same hue that passes the WCAG level to failing pairs')
+def contrast(foregrounds, backgrounds, wcag_level, apca_level, failing, strict, suggest):
+    """Check every foreground color on every background with WCAG 2 and APCA
+
+    FOREGROUNDS and BACKGROUNDS are files ('-' for stdin) of hex colors,
+    one or more per line. Every pair is printed as
+    "FOREGROUND<TAB>BACKGROUND<TAB>RATIO<TAB>LC<TAB>WCAG<TAB>APCA", where
+    LC is the APCA contrast of the foreground as text on the background.
+    With --suggest, a last column holds the nearest foreground of the same
+    hue that passes the WCAG level ('-' if it passes or none can).
+    """
+    from . import dedupe as dedupe_mode
+
+    colors = []
+    for source in (foregrounds, backgrounds):
+        parsed = []
+        for line_number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                parsed.extend(dedupe_mode.parse_line(line))
+            except ValueError as e:
+                raise click.ClickException(f"{source.name}, line {line_number}: {e}")
+        colors.append(parsed)
+    foreground_colors, background_colors = colors
+
+    total = wcag_passed = apca_passed = 0
+    for result in accessibility_utils.check_pairs(foreground_colors, background_colors, wcag_level, apca_level):
+        total += 1
+        wcag_passed += result["wcag"]
+        apca_passed += result["apca"]
+        if failing and result["wcag"] and result["apca"]:
+            continue
+        foreground = foreground_colors[result["foreground"]]
+        background = background_colors[result["background"]]
+        columns = [
+            color_conversion.rgb_to_hex(foreground),
+            color_conversion.rgb_to_hex(background),
+            f"{result['ratio']:.2f}",
+            f"{result['lc']:.1f}",
+            "pass" if result["wcag"] else "fail",
+            "pass" if result["apca"] else "fail",
+        ]
+        if suggest:
+            columns.append(_suggestion_column(foreground, background, result, wcag_level))
+        click.echo("\t".join(columns))
+
+    click.echo(f"{wcag_passed} of {total} pair(s) pass WCAG {wcag_level}, {apca_passed} pass APCA {apca_level}",
+               err=True)
+    if strict and (wcag_passed < total or apca_passed < total):
+        raise SystemExit(1)
+
+@cli.group()
+@click.option('--path', 'library_path', type=click.Path(dir_okay=False),
+              help='Library database (default: $COLORMAESTRO_LIBRARY or ~/.local/share/colormaestro/palettes.db)')
+@click.pass_context
+def library(ctx, library_path):
+    """Store and search palettes in a local library
+
+    The library is an SQLite database indexed by the hue and luminance of
+    the primary color, mood, type and contrast, so filtered queries stay
+    fast on large libraries. 'colormaestro generate --save' adds to it too.
+    """
+    ctx.obj = library_path
+
+@library.command('add')
+@click.argument('input_file', type=click.File('r'), default='-')
+@click.option('-t', '--type', 'palette_type', type=click.Choice(PALETTE_TYPES), help='Palette type to record')
+@click.option('--mood', type=click.Choice(MOOD_OPTIONS), help='Mood to record')
+@click.option('--batch-size', type=int,
+              help='Palettes written per transaction (default: 1000)')
+@click.pass_obj
+def library_add(library_path, input_file, palette_type, mood, batch_size):
+    """Add palettes to the library
+
+    Each line of INPUT_FILE (stdin by default) holds a palette, as for the
+    dedupe command.
+    """
+    from . import store, dedupe as dedupe_mode
+
+    if batch_size is None:
+        batch_size = store.DEFAULT_BATCH_SIZE
+
+    def records():
+        for line_number, line in enumerate(input_file, 1):
+            if not line.strip():
+                continue
+            try:
+                palette = dedupe_mode.parse_line(line)
+            except ValueError as e:
+                click.echo(click.style(f"Skipping line {line_number}: {e}", fg="red"), err=True)
+                continue
+            yield {"palette": palette, "palette_type": palette_type, "mood": mood}
+
+    with store.PaletteStore(library_path) as palettes:
+        ids = palettes.add_many(records(), batch_size)
+        click.echo(f"Added {len(ids)} palette(s) to {palettes.path}", err=True)
+
+@library.command('query')
+@click.option('--mood', type=click.Choice(MOOD_OPTIONS), help='Only palettes generated with this mood')
+@click.option('-t', '--type', 'palette_type', type=click.Choice(PALETTE_TYPES),
+              help='Only palettes of this type')
+@click.option('--min-colors', type=int, help='Minimum number of colors')
+@click.option('--max-colors', type=int, help='Maximum number of colors')
+@click.option('--hue', type=float, help='Hue of the primary color in degrees (matched within its 30 degree bucket)')
+@click.option('--min-luminance', type=float, help='Minimum relative luminance of the primary color (0-1)')
+@click.option('--max-luminance', type=float, help='Maximum relative luminance of the primary color (0-1)')
+@click.option('--min-contrast-white', type=float, help='Minimum contrast of every color against white')
+@click.option('--min-contrast-black', type=float, help='Minimum contrast of every color against black')
+@click.option('--aa-white', is_flag=True, help='Every color passes WCAG AA against white (same as --min-contrast-white 4.5)')
+@click.option('--aa-black', is_flag=True, help='Every color passes WCAG AA against black (same as --min-contrast-black 4.5)')
+@click.option('--limit', type=int, help='Maximum number of results')
+@click.option('-f', '--format', 'output_format', type=click.Choice(OUTPUT_FORMATS),
+              help='Export results in this format instead of listing them')
+@click.option('--out-dir', 'output_dir', type=click.Path(file_okay=False),
+              help='Write one file per result to this directory (required for html, png and svg)')
+@click.option('--explain', is_flag=True, help='Print the SQLite query plan instead of the results')
+@click.pass_obj
+def library_query(library_path, mood, palette_type, min_colors, max_colors, hue, min_luminance, max_luminance,
+                  min_contrast_white, min_contrast_black, aa_white, aa_black, limit, output_format, output_dir,
+                  explain):
+    """Find palettes in the library
+
+    Results are listed as ID and colors, or exported with any output
+    format: ndjson streams one record per line, other text formats print
+    each palette (or write palette-ID files with --out-dir).
+    """
+    if aa_white:
+        min_contrast_white = max(min_contrast_white or 0, 4.5)
+    if aa_black:
+        min_contrast_black = max(min_contrast_black or 0, 4.5)
+    filters = dict(mood=mood, palette_type=palette_type, min_colors=min_colors, max_colors=max_colors, hue=hue,
+                   min_luminance=min_luminance, max_luminance=max_luminance,
+                   min_contrast_white=min_contrast_white, min_contrast_black=min_contrast_black)
+    if output_format and output_format not in export.TEXT_FILENAMES and output_format != "terminal" \
+            and not output_dir:
+        raise click.UsageError(f"--format {output_format} needs --out-dir")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    from . import store
+
+    with store.PaletteStore(library_path) as palettes:
+        if explain:
+            for detail in palettes.explain(limit, **filters):
+                click.echo(detail)
+            return
+
+        records = palettes.query(limit, **filters)
+        if output_format == "ndjson" and not output_dir:
+            count = json_formatter.write_lines(record["palette"] for record in records)
+        else:
+            count = 0
+            for record in records:
+                count += 1
+                if output_format is None:
+                    hex_colors = " ".join(color_conversion.rgb_to_hex(rgb) for rgb in record["palette"])
+                    click.echo(f"{record['id']}\t{hex_colors}")
+                    continue
+                path = _library_export_path(output_format, record["id"], output_dir)
+                click.echo(export.export_format(record["palette"], output_format, path), nl=False)
+
+    click.echo(f"{count} palette(s) found", err=True)
+
+def _library_export_path(fmt, palette_id, output_dir):
+    """Get the file a library palette is exported to (None for the console)"""
+    if not output_dir or fmt == "terminal":
+        return None
+    # palette.css becomes palette-12.css, tailwind.config.js tailwind-12.config.js
+    root, _, ext = export.TEXT_FILENAMES.get(fmt, f"palette.{fmt}").partition(".")
+    return os.path.join(output_dir, f"{root}-{palette_id}.{ext}")
+
+@cli.command()
+@click.option('--host', help='Interface to bind to (default: 127.0.0.1)')
+@click.option('--port', type=int, help='Port to listen on (default: 8765)')
+@click.option('-w', '--workers', type=int, default=None,
+              help='Worker processes for image decoding and PNG rendering (default: CPU count)')
+@click.option('--image-root', type=click.Path(exists=True, file_okay=False),
+              help='Directory image inputs may be read from (image inputs are rejected otherwise)')
+@click.option('--quiet', is_flag=True, help='Do not log requests')
+def serve(host, port, workers, image_root, quiet):
+    """Run a local HTTP palette service
+
+    Endpoints: /parse, /generate, /format, /accessibility and /stats, with
+    options as query parameters, e.g.
+    /format?input=3A86FF&type=harmony&colors=6&format=css
+    """
+    # The HTTP server stack is only loaded for this command
+    from . import server
+
+    host = host or server.DEFAULT_HOST
+    port = server.DEFAULT_PORT if port is None else port
+
+    click.echo(f"Serving palettes on http://{host}:{port}/ (Ctrl+C to stop)")
+    server.serve(host, port, workers, image_root, quiet)
 
 if __name__ == '__main__':
     cli()
@@ -0,0 +1,231 @@
+"""Near-duplicate detection for large palette collections
+
+Palettes are compared by their colors in OKLab, regardless of color order:
+two palettes of the same size are duplicates when their colors can be
+paired one to one with every pair closer than the threshold.
+
+Instead of comparing every pair of palettes, palettes are hashed into a
+grid over their sorted OKLab coordinates: the smallest and largest L, a
+and b of their colors. Sorting each coordinate separately does not depend
+on the color order, and no sorted coordinate of a duplicate can differ by
+more than the threshold, so with cells three thresholds wide only the
+cells within the threshold of a palette (one or two per axis) can hold its
+duplicates. Only the unique representatives found so far are stored and
+compared, so collections are processed in one streaming pass, in time
+linear in their size for a bounded density of distinct palettes.
+"""
+import itertools
+import json
+import math
+import re
+from array import array
+from operator import sub
+from .utils import color_conversion, color_spaces
+from .utils.color_difference import JND
+
+# Largest OKLab distance between corresponding colors of duplicate palettes
+DEFAULT_THRESHOLD = JND["oklab"]
+
+_HEX_SPLIT = re.compile(r"[\s,;]+")
+
+# Width of the grid cells in thresholds: wider cells mean fewer cells to
+# probe per palette but more representatives per cell
+CELL_SCALE = 3
+
+def signature(palette):
+    """Get the order-independent OKLab signature of a palette
+
+    Args:
+        palette (list): List of RGB color tuples
+
+    Returns:
+        tuple: Flat (L, a, b, L, a, b, ...) coordinates of the colors, sorted
+    """
+    return tuple(itertools.chain.from_iterable(sorted(color_spaces.rgb_to_oklab(palette))))
+
+def sorted_coordinates(coordinates):
+    """Sort each coordinate of a signature separately
+
+    Args:
+        coordinates (tuple): Signature from ``signature``
+
+    Returns:
+        tuple: Sorted L values, then sorted a values, then sorted b values
+    """
+    return tuple(sorted(coordinates[0::3]) + sorted(coordinates[1::3]) + sorted(coordinates[2::3]))
+
+class Deduplicator:
+    """Streaming near-duplicate detector
+
+    Args:
+        threshold (float): Largest OKLab distance between corresponding colors
+                           of duplicates (DEFAULT_THRESHOLD is about one JND)
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        if threshold <= 0:
+            raise ValueError("The threshold must be positive")
+        self.threshold = threshold
+        self.count = 0
+        self.unique = 0
+        # Grid cell to (representative ids, their sorted coordinates, their signatures)
+        self._cells = {}
+
+    def _cells_to_probe(self, features, size):
+        """Get the grid cell of a palette and every cell its duplicates can be in"""
+        cell_width = self.threshold * CELL_SCALE
+        margin = 1 / CELL_SCALE
+        count = len(features) // 3
+
+        axes = []
+        # Smallest and largest L, a and b
+        for value in features[0::count] + features[count - 1::count]:
+            position = value / cell_width
+            index = math.floor(position)
+            fraction = position - index
+            if fraction < margin:
+                axes.append((index, index - 1))
+            elif fraction > 1 - margin:
+                axes.append((index, index + 1))
+            else:
+                axes.append((index,))
+
+        return [(size,) + cell for cell in itertools.product(*axes)]
+
+    def _matches(self, coordinates, signatures, offset):
+        """Check whether the signature at offset is a duplicate of coordinates
+
+        Colors are paired by bipartite matching (augmenting paths), so a
+        pairing is found whenever one exists, whichever palette comes first.
+        """
+        threshold = self.threshold
+        width = len(coordinates)
+        others = [signatures[j:j + 3] for j in range(offset, offset + width, 3)]
+        candidates = []
+        for i in range(0, width, 3):
+            color = coordinates[i:i + 3]
+            close = [k for k, other in enumerate(others) if math.dist(color, other) <= threshold]
+            if not close:
+                return False
+            candidates.append(close)
+
+        # Color of this palette paired with each color of the other
+        paired = [None] * len(others)
+
+        def augment(i, visited):
+            for k in candidates[i]:
+                if k not in visited:
+                    visited.add(k)
+                    if paired[k] is None or augment(paired[k], visited):
+                        paired[k] = i
+                        return True
+            return False
+
+        return all(augment(i, set()) for i in range(len(candidates)))
+
+    def add(self, palette):
+        """Add a palette to the collection
+
+        Args:
+            palette (list): List of RGB color tuples
+
+        Returns:
+            int: Index (in the order palettes were added) of the first palette
+                 it duplicates, or its own index if it is unique
+        """
+        if not palette:
+            raise ValueError("Cannot deduplicate an empty palette")
+        index = self.count
+        self.count += 1
+
+        coordinates = signature(palette)
+        features = sorted_coordinates(coordinates)
+        width = len(coordinates)
+        threshold = self.threshold
+        # The first cell is the palette's own
+        probes = self._cells_to_probe(features, len(palette))
+
+        for cell in probes:
+            entry = self._cells.get(cell)
+            if entry is None:
+                continue
+            ids, cell_features, signatures = entry
+            for k, representative in enumerate(ids):
+                # Sorted coordinates of duplicates differ by at most the threshold
+                start = k * width
+                if max(map(abs, map(sub, features, cell_features[start:start + width]))) > threshold:
+                    continue
+                if self._matches(coordinates, signatures, start):
+                    return representative
+
+        entry = self._cells.get(probes[0])
+        if entry is None:
+            entry = self._cells[probes[0]] = (array('q'), array('d'), array('d'))
+        entry[0].append(index)
+        entry[1].extend(features)
+        entry[2].extend(coordinates)
+        self.unique += 1
+        return index
+
+def clusters(palettes, threshold=DEFAULT_THRESHOLD):
+    """Assign each palette of a stream to its cluster of near-duplicates
+
+    Args:
+        palettes (iterable): Iterable of palettes (lists of RGB color tuples)
+        threshold (float): Largest OKLab distance between corresponding colors
+
+    Yields:
+        tuple: (index, representative) where representative is the index of
+               the first palette of the cluster (index itself if unique)
+    """
+    deduplicator = Deduplicator(threshold)
+    for index, palette in enumerate(palettes):
+        yield index, deduplicator.add(palette)
+
+def unique(palettes, threshold=DEFAULT_THRESHOLD):
+    """Filter a stream of palettes down to the first of each cluster of near-duplicates
+
+    Args:
+        palettes (iterable): Iterable of palettes (lists of RGB color tuples)
+        threshold (float): Largest OKLab distance between corresponding colors
+
+    Yields:
+        list: Unique palettes, in input order
+    """
+    deduplicator = Deduplicator(threshold)
+    for index, palette in enumerate(palettes):
+        if deduplicator.add(palette) == index:
+            yield palette
+
+def parse_line(line):
+    """Parse a palette from a collection line
+
+    Lines are either JSON records with a 'palette' list (as written by
+    the json and ndjson formats) or hex colors separated by spaces or commas.
+
+    Args:
+        line (str): Input line
+
+    Returns:
+        list: List of RGB color tuples
+
+    Raises:
+        ValueError: If the line holds no valid palette
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        try:
+            colors = [color["hex"] for color in json.loads(line)["palette"]]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Not a palette record: {e}")
+    else:
+        colors = [token for token in _HEX_SPLIT.split(line) if token]
+
+    palette = []
+    for color in colors:
+        if not re.fullmatch(r"#?(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6})", color):
+            raise ValueError(f"Invalid hex color: {color}")
+        palette.append(color_conversion.hex_to_rgb(color))
+    if not palette:
+        raise ValueError("Empty palette")
+    return palette
@@ -0,0 +1,217 @@
+import os
+from .formatters import terminal, css, scss, tailwind, json_formatter
+from .utils import fileio
+from . import profiling
+
+# Upper bound on export threads, whatever the number of requested formats
+MAX_EXPORT_WORKERS = 8
+
+IMAGE_FORMATS = ["png", "svg"]
+
+# File names used for text formats when exporting to an output directory
+TEXT_FILENAMES = {
+    "css": "palette.css",
+    "scss": "palette.scss",
+    "tailwind": "tailwind.config.js",
+    "json": "palette.json",
+    "ndjson": "palette.ndjson",
+}
+
+# Labels used in the console message for each written file
+FILE_LABELS = {
+    "html": "HTML preview",
+    "png": "Image",
+    "svg": "Image",
+    "css": "CSS",
+    "scss": "SCSS",
+    "tailwind": "Tailwind config",
+    "json": "JSON",
+    "ndjson": "NDJSON",
+}
+
+def _image_path(fmt, image_filename, output_dir=None):
+    """Get the output path for an image format"""
+    if not image_filename:
+        return os.path.join(output_dir or "", f"palette.{fmt}")
+
+    # Keep png and svg exports from overwriting each other
+    root, ext = os.path.splitext(image_filename)
+    if ext.lower() in (".png", ".svg") and ext[1:].lower() != fmt:
+        return f"{root}.{fmt}"
+
+    return image_filename
+
+def plan(output_formats, html_filename=None, image_filename=None, output_dir=None):
+    """Build the list of export jobs for the requested formats
+
+    Args:
+        output_formats (list): Requested output format names, in order
+        html_filename (str): Path for the HTML preview (implies 'html')
+        image_filename (str): Path for the palette image (implies an image format)
+        output_dir (str): Directory for default file names; text formats are
+                          written there instead of to the console when set
+
+    Returns:
+        list: List of (format, path) tuples; path is None for console output
+    """
+    formats = []
+    for fmt in output_formats:
+        fmt = fmt.strip()
+        if fmt and fmt not in formats:
+            formats.append(fmt)
+
+    if html_filename and "html" not in formats:
+        formats.append("html")
+
+    if image_filename and not any(fmt in IMAGE_FORMATS for fmt in formats):
+        formats.append("svg" if image_filename.lower().endswith(".svg") else "png")
+
+    jobs = []
+    for fmt in formats:
+        if fmt == "html":
+            jobs.append((fmt, html_filename or os.path.join(output_dir or "", "palette.html")))
+        elif fmt in IMAGE_FORMATS:
+            jobs.append((fmt, _image_path(fmt, image_filename, output_dir)))
+        elif output_dir and fmt in TEXT_FILENAMES:
+            jobs.append((fmt, os.path.join(output_dir, TEXT_FILENAMES[fmt])))
+        else:
+            jobs.append((fmt, None))
+
+    return jobs
+
+def _save(fmt, path, content, skip_unchanged):
+    """Write an export to its file and describe the outcome"""
+    if fileio.write_if_changed(path, content, skip_unchanged):
+        return f"{FILE_LABELS[fmt]} saved to: {path}\n"
+    return f"{FILE_LABELS[fmt]} unchanged: {path}\n"
+
+def _render(palette, fmt, show_demo):
+    """Render the palette in a single format"""
+    if fmt == "terminal":
+        return terminal.render(palette, show_demo=show_demo)
+    elif fmt == "html":
+        # HTML and image formatters pull in Jinja2 and Pillow; load them on demand
+        from .formatters import html
+        return html.render(palette, show_demo=show_demo)
+    elif fmt in IMAGE_FORMATS:
+        from .formatters import image_formatter
+        return image_formatter.render(palette, fmt)
+    elif fmt == "css":
+        return css.generate(palette)
+    elif fmt == "scss":
+        return scss.generate(palette)
+    elif fmt == "tailwind":
+        return tailwind.generate(palette)
+    elif fmt == "json":
+        return json_formatter.generate(palette)
+    elif fmt == "ndjson":
+        return json_formatter.generate_line(palette)
+
+    raise ValueError(f"Unknown output format: {fmt}")
+
+def _emit(fmt, path, content, skip_unchanged, timer):
+    """Turn rendered content into console output, writing it to its file if any"""
+    if fmt == "terminal":
+        return content
+
+    if fmt in TEXT_FILENAMES:
+        if path is None:
+            return content + "\n"
+        if not content.endswith("\n"):
+            content += "\n"
+
+    with timer.stage(f"write {fmt}"):
+        return _save(fmt, path, content, skip_unchanged)
+
+def export_format(palette, fmt, path=None, show_demo=False, skip_unchanged=False, timer=None):
+    """Export the palette in a single format
+
+    Args:
+        palette (list): List of RGB color tuples
+        fmt (str): Output format name
+        path (str): Output file path; required for html, png and svg, and
+                    optional for text formats (printed when omitted)
+        show_demo (bool): Whether to show UI component samples
+        skip_unchanged (bool): Leave files untouched if their content is identical
+        timer (profiling.StageTimer): Timer recording the 'format' and 'write' stages
+
+    Returns:
+        str: Console output for the format, including the trailing newline
+    """
+    if timer is None:
+        timer = profiling.DISABLED
+
+    with timer.stage(f"format {fmt}"):
+        content = _render(palette, fmt, show_demo)
+
+    return _emit(fmt, path, content, skip_unchanged, timer)
+
+def _run_job(palette, fmt, path, show_demo, skip_unchanged, timer):
+    """Run one export job, capturing its error instead of raising"""
+    result = {"format": fmt, "path": path, "content": None, "output": None, "error": None}
+    try:
+        with timer.stage(f"format {fmt}"):
+            result["content"] = _render(palette, fmt, show_demo)
+        result["output"] = _emit(fmt, path, result["content"], skip_unchanged, timer)
+    except Exception as e:
+        result["error"] = e
+    return result
+
+def replay(jobs, contents, skip_unchanged=False):
+    """Export previously rendered content, e.g. from the result cache
+
+    Args:
+        jobs (list): List of (format, path) tuples, as returned by ``plan``
+        contents (dict): Format name to rendered content (the 'content' of
+                         ``export_all`` results)
+        skip_unchanged (bool): Leave files untouched if their content is identical
+
+    Returns:
+        list: One dict per job, as returned by ``export_all``
+    """
+    results = []
+    for fmt, path in jobs:
+        result = {"format": fmt, "path": path, "content": contents[fmt], "output": None, "error": None}
+        try:
+            result["output"] = _emit(fmt, path, contents[fmt], skip_unchanged, profiling.DISABLED)
+        except Exception as e:
+            result["error"] = e
+        results.append(result)
+    return results
+
+def export_all(palette, jobs, show_demo=False, max_workers=None, skip_unchanged=False, timer=None):
+    """Export the palette in several formats concurrently
+
+    File formats spend most of their time in file I/O and Pillow, which
+    release the GIL, so jobs run on a bounded thread pool. Results are
+    returned in job order regardless of completion order, so console output
+    stays deterministic.
+
+    Args:
+        palette (list): List of RGB color tuples
+        jobs (list): List of (format, path) tuples, as returned by ``plan``
+        show_demo (bool): Whether to show UI component samples
+        max_workers (int): Maximum number of threads (defaults to one per job,
+                           capped at MAX_EXPORT_WORKERS)
+        skip_unchanged (bool): Leave files untouched if their content is identical
+        timer (profiling.StageTimer): Timer recording the stages of each job
+
+    Returns:
+        list: One dict per job with 'format', 'path', 'content' (the rendered
+              output), 'output' (console text) and 'error' keys
+    """
+    if timer is None:
+        timer = profiling.DISABLED
+
+    if max_workers is None:
+        max_workers = min(MAX_EXPORT_WORKERS, len(jobs))
+
+    # Avoid thread start-up cost for the common single-format case
+    if len(jobs) <= 1 or max_workers <= 1:
+        return [_run_job(palette, fmt, path, show_demo, skip_unchanged, timer) for fmt, path in jobs]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_run_job, palette, fmt, path, show_demo, skip_unchanged, timer) for fmt, path in jobs]
+        return [future.result() for future in futures]
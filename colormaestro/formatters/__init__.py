@@ -1,8 +1,13 @@
-# Import formatters for easier access from other modules
-from . import terminal
-from . import html
-from . import css
-from . import scss
-from . import tailwind
-from . import json_formatter
-from . import image_formatter
+# Formatters are imported on first access, so that importing one of them does
+# not load the dependencies of the others (e.g. Jinja2 or Pillow)
+import importlib
+
+__all__ = ["terminal", "html", "css", "scss", "tailwind", "json_formatter", "image_formatter"]
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
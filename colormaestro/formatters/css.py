@@ -1,7 +1,10 @@
+from .. import metrics
+
 def rgb_to_hex(rgb):
     """Convert RGB tuple to hex string"""
     return f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
 
+@metrics.instrument("format", "css")
 def generate(palette):
     """Generate CSS variables from the color palette
 
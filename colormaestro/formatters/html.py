@@ -1,18 +1,36 @@
 import os
-import jinja2
-from ..utils import color_conversion
+from functools import lru_cache
+from ..utils import color_conversion, fileio
+from .. import metrics
 
-def generate(palette, output_path, show_demo=False):
+def generate(palette, output_path, show_demo=False, skip_unchanged=False):
     """Generate HTML preview of the color palette
 
     Args:
         palette (list): List of RGB color tuples
         output_path (str): Path to save the HTML file
         show_demo (bool): Whether to show UI component samples
+        skip_unchanged (bool): Leave the file untouched if its content is identical
 
     Returns:
         str: Path to the generated HTML file
     """
+    html_content = render(palette, show_demo)
+
+    # Write to file (atomically, creating the directory if needed)
+    fileio.write_if_changed(output_path, html_content, skip_unchanged)
+
+    return output_path
+
+def load_template():
+    """Load the HTML preview template
+
+    Returns:
+        jinja2.Template: Compiled template, reusable across renders
+    """
+    # Jinja2 is only imported when HTML output is actually requested
+    import jinja2
+
     # Get the directory containing this script
     package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     templates_dir = os.path.join(package_dir, 'templates')
@@ -24,7 +42,28 @@ def generate(palette, output_path, show_demo=False):
     )
 
     # Load the template
-    template = env.get_template('html_preview.html')
+    return env.get_template('html_preview.html')
+
+@lru_cache(maxsize=1)
+def _default_template():
+    """Get the template used when none is passed, loaded on first use"""
+    return load_template()
+
+@metrics.instrument("format", "html")
+def render(palette, show_demo=False, template=None):
+    """Render the HTML preview of the color palette
+
+    Args:
+        palette (list): List of RGB color tuples
+        show_demo (bool): Whether to show UI component samples
+        template (jinja2.Template): Pre-loaded template (the default template,
+                                    loaded once per process, if None)
+
+    Returns:
+        str: HTML document
+    """
+    if template is None:
+        template = _default_template()
 
     # Prepare color data
     colors = []
@@ -47,16 +86,7 @@ def generate(palette, output_path, show_demo=False):
         })
 
     # Render the template
-    html_content = template.render(
+    return template.render(
         palette=colors,
         show_demo=show_demo
     )
-
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-
-    # Write to file
-    with open(output_path, 'w') as f:
-        f.write(html_content)
-
-    return output_path
@@ -1,36 +1,79 @@
+import io
+import os
 try:
     from PIL import Image, ImageDraw, ImageFont
 except ImportError:
     Image = None
     ImageDraw = None
     ImageFont = None
+from ..utils import fileio
+from .. import metrics
 
-def generate(palette, output_path, format_type="png"):
+def generate(palette, output_path, format_type="png", skip_unchanged=False):
     """Generate an image file of the color palette
 
     Args:
         palette (list): List of RGB color tuples
         output_path (str): Path to save the image file
         format_type (str): Image format ('png' or 'svg')
+        skip_unchanged (bool): Leave the file untouched if its content is identical
 
     Returns:
         str: Path to the generated image file
     """
     if format_type.lower() == "svg":
-        return _generate_svg(palette, output_path)
+        return _generate_svg(palette, output_path, skip_unchanged)
     else:
-        return _generate_png(palette, output_path)
+        return _generate_png(palette, output_path, skip_unchanged)
 
-def _generate_png(palette, output_path):
+def render(palette, format_type="png"):
+    """Render an image of the color palette in memory
+
+    Args:
+        palette (list): List of RGB color tuples
+        format_type (str): Image format ('png' or 'svg')
+
+    Returns:
+        bytes or str: PNG data, or SVG markup
+    """
+    if format_type.lower() == "svg":
+        return _render_svg(palette)
+    else:
+        return _render_png(palette)
+
+def _generate_png(palette, output_path, skip_unchanged=False):
     """Generate a PNG image of the color palette
 
     Args:
         palette (list): List of RGB color tuples
         output_path (str): Path to save the PNG file
+        skip_unchanged (bool): Leave the file untouched if its content is identical
 
     Returns:
         str: Path to the generated PNG file
     """
+    fileio.write_if_changed(output_path, _render_png(palette, _image_format(output_path)), skip_unchanged)
+
+    return output_path
+
+def _image_format(output_path):
+    """Get the Pillow format implied by the file extension (PNG by default)"""
+    if Image is None:
+        return "PNG"
+    extension = os.path.splitext(output_path)[1].lower()
+    return Image.registered_extensions().get(extension, "PNG")
+
+@metrics.instrument("format", "png")
+def _render_png(palette, image_format="PNG"):
+    """Render a PNG image of the color palette
+
+    Args:
+        palette (list): List of RGB color tuples
+        image_format (str): Pillow format name used for encoding
+
+    Returns:
+        bytes: Encoded image data
+    """
     if Image is None:
         raise ImportError("Pillow (PIL) library is required for PNG generation. Install with 'pip install pillow'")
 
@@ -88,21 +131,104 @@ def _generate_png(palette, output_path):
         # Move to next position
         x += swatch_width + swatch_padding
 
-    # Save the image
-    img.save(output_path)
+    # Encode the image
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format)
+
+    return buffer.getvalue()
+
+def recolor(image, palette, dither=False):
+    """Map every pixel of an image to its nearest palette color
+
+    Pillow matches pixels through a 64x64x64 grid of nearest palette
+    entries (by sRGB distance), filled on first use and read per pixel in
+    C, so large images are recolored in a fraction of a second. Pixels
+    close to the boundary between two palette colors may get either one.
+    Transparency is kept.
+
+    Args:
+        image (PIL.Image.Image): Image in any mode
+        palette (list): List of RGB color tuples (up to 256)
+        dither (bool): Spread the difference to each pixel's palette color
+                       over its neighbours (Floyd-Steinberg)
+
+    Returns:
+        PIL.Image.Image: Recolored RGB (or RGBA) image
+    """
+    if Image is None:
+        raise ImportError("Pillow (PIL) library is required for image processing. Install with 'pip install pillow'")
+    if not 1 <= len(palette) <= 256:
+        raise ValueError("Images can be recolored with 1 to 256 palette colors")
+
+    flat = [component for color in palette for component in color]
+    # Pad with the last color: some Pillow versions match black padding entries
+    flat.extend(flat[-3:] * (256 - len(palette)))
+    palette_image = Image.new("P", (1, 1))
+    palette_image.putpalette(flat)
+    dither_mode = Image.FLOYDSTEINBERG if dither else Image.NONE
+
+    if image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+        rgba = image.convert("RGBA")
+        recolored = rgba.convert("RGB").quantize(palette=palette_image, dither=dither_mode).convert("RGB")
+        recolored.putalpha(rgba.getchannel("A"))
+        return recolored
+    return image.convert("RGB").quantize(palette=palette_image, dither=dither_mode).convert("RGB")
+
+@metrics.instrument("format", "recolor")
+def generate_recolored(image_path, palette, output_path, dither=False, skip_unchanged=False):
+    """Recolor an image file with a palette and save the result
+
+    Args:
+        image_path (str): Path to the image to recolor
+        palette (list): List of RGB color tuples
+        output_path (str): Path to save the image file (format from its extension)
+        dither (bool): Use Floyd-Steinberg dithering
+        skip_unchanged (bool): Leave the file untouched if its content is identical
+
+    Returns:
+        str: Path to the generated image file
+    """
+    from ..parsers import image_parser
+
+    with image_parser.load_image(image_path) as img:
+        metrics.IMAGE_DECODE_PIXELS.observe(img.width * img.height)
+        recolored = recolor(img, palette, dither)
+
+    image_format = _image_format(output_path)
+    if image_format == "JPEG" and recolored.mode == "RGBA":
+        recolored = recolored.convert("RGB")
+
+    buffer = io.BytesIO()
+    recolored.save(buffer, format=image_format)
+    fileio.write_if_changed(output_path, buffer.getvalue(), skip_unchanged)
 
     return output_path
 
-def _generate_svg(palette, output_path):
+def _generate_svg(palette, output_path, skip_unchanged=False):
     """Generate an SVG image of the color palette
 
     Args:
         palette (list): List of RGB color tuples
         output_path (str): Path to save the SVG file
+        skip_unchanged (bool): Leave the file untouched if its content is identical
 
     Returns:
         str: Path to the generated SVG file
     """
+    fileio.write_if_changed(output_path, _render_svg(palette), skip_unchanged)
+
+    return output_path
+
+@metrics.instrument("format", "svg")
+def _render_svg(palette):
+    """Render an SVG image of the color palette
+
+    Args:
+        palette (list): List of RGB color tuples
+
+    Returns:
+        str: SVG markup
+    """
     # Define dimensions
     width = 800
     height = 400
@@ -158,8 +284,4 @@ def _generate_svg(palette, output_path):
     # Close SVG
     svg += '</svg>\n'
 
-    # Write to file
-    with open(output_path, 'w') as f:
-        f.write(svg)
-
-    return output_path
+    return svg
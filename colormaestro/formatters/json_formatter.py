@@ -1,6 +1,23 @@
 import json
+import sys
+from functools import lru_cache
 from ..utils import color_conversion
+from .. import metrics
 
+# Number of encoded lines collected before each write in NDJSON mode
+NDJSON_BATCH_SIZE = 1024
+
+def _color_name(index):
+    """Get the JSON key name for the color at a palette position"""
+    if index == 0:
+        return "primary"
+    elif index == 1:
+        return "secondary"
+    elif index == 2:
+        return "accent"
+    return f"color-{index+1}"
+
+@metrics.instrument("format", "json")
 def generate(palette):
     """Generate JSON representation of the color palette
 
@@ -21,15 +38,7 @@ def generate(palette):
         s_percent = s * 100
         v_percent = v * 100
 
-        color_name = None
-        if i == 0:
-            color_name = "primary"
-        elif i == 1:
-            color_name = "secondary"
-        elif i == 2:
-            color_name = "accent"
-        else:
-            color_name = f"color-{i+1}"
+        color_name = _color_name(i)
 
         color_data = {
             "name": color_name,
@@ -49,3 +58,99 @@ def generate(palette):
         palette_data["palette"].append(color_data)
 
     return json.dumps(palette_data, indent=2)
+
+@lru_cache(maxsize=65536)
+def _hsv_fragment(rgb):
+    """Serialize the derived HSV object for a color (cached per color)"""
+    h, s, v = color_conversion.rgb_to_hsv(rgb)
+    return '{"h":%r,"s":%r,"v":%r}' % (round(h * 360, 2), round(s * 100, 2), round(v * 100, 2))
+
+metrics.REGISTRY.register_cache("json_hsv", _hsv_fragment)
+
+def compile_layout(derived=True):
+    """Pre-serialize the key layout used for NDJSON records
+
+    The returned encoder only fills color values into pre-built string
+    fragments, so no dictionaries are built and ``json.dumps`` is never
+    called per palette. Records have the same structure as ``generate``
+    output, serialized compactly on a single line.
+
+    Args:
+        derived (bool): Whether to include derived fields (HSV)
+
+    Returns:
+        callable: Function encoding a palette (list of RGB tuples) to a JSON line
+    """
+    prefixes = []
+
+    def prefix(index):
+        # Extend the per-position "name" fragments on demand
+        while len(prefixes) <= index:
+            name = json.dumps(_color_name(len(prefixes)))
+            prefixes.append('{"name":%s,"hex":"#' % name)
+        return prefixes[index]
+
+    def encode(palette):
+        parts = []
+        for i, rgb in enumerate(palette):
+            r, g, b = rgb
+            fragment = '%s%02x%02x%02x","rgb":{"r":%d,"g":%d,"b":%d}' % (prefix(i), r, g, b, r, g, b)
+            if derived:
+                fragment += ',"hsv":' + _hsv_fragment((r, g, b))
+            parts.append(fragment + '}')
+        return '{"palette":[' + ','.join(parts) + ']}'
+
+    return encode
+
+@metrics.instrument("format", "ndjson")
+def generate_line(palette, derived=True):
+    """Generate a compact single-line JSON record for the color palette
+
+    Args:
+        palette (list): List of RGB color tuples
+        derived (bool): Whether to include derived fields (HSV)
+
+    Returns:
+        str: JSON string without a trailing newline
+    """
+    return compile_layout(derived)(palette)
+
+def write_lines(palettes, output=None, layout=None, derived=True):
+    """Stream palettes as JSON Lines (NDJSON), one compact record per palette
+
+    Args:
+        palettes (iterable): Iterable of palettes (lists of RGB color tuples)
+        output (str or file): Path or writable text file; defaults to stdout
+        layout (callable): Encoder from ``compile_layout``; built from
+                           ``derived`` when omitted
+        derived (bool): Whether to include derived fields (HSV)
+
+    Returns:
+        int: Number of records written
+    """
+    encode = layout or compile_layout(derived)
+
+    if output is None:
+        return _write_lines(palettes, sys.stdout, encode)
+    if hasattr(output, 'write'):
+        return _write_lines(palettes, output, encode)
+
+    with open(output, 'w', buffering=1 << 20) as f:
+        return _write_lines(palettes, f, encode)
+
+def _write_lines(palettes, stream, encode):
+    """Encode palettes and write them to a stream in batches"""
+    count = 0
+    batch = []
+    for palette in palettes:
+        batch.append(encode(palette))
+        if len(batch) >= NDJSON_BATCH_SIZE:
+            stream.write('\n'.join(batch) + '\n')
+            count += len(batch)
+            batch = []
+
+    if batch:
+        stream.write('\n'.join(batch) + '\n')
+        count += len(batch)
+
+    return count
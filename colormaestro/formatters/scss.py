@@ -1,9 +1,11 @@
 from ..utils import color_conversion
+from .. import metrics
 
 def rgb_to_hex(rgb):
     """Convert RGB tuple to hex string"""
     return f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
 
+@metrics.instrument("format", "scss")
 def generate(palette):
     """Generate SCSS variables from the color palette
 
@@ -1,10 +1,131 @@
 import click
 import os
+from .. import metrics
+
+# Channel levels of the 6x6x6 color cube in the xterm-256 palette (indices 16-231)
+XTERM_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+# Lazily built 32x32x32 table mapping 5-bit RGB cells to xterm-256 indices
+_xterm_table = None
+
+# Upper half block: foreground paints the top pixel, background the bottom one
+HALF_BLOCK = "\u2580"
+
+# Maximum number of character cells used by an image preview
+MAX_PREVIEW_CELLS = 4000
 
 def rgb_to_hex(rgb):
     """Convert RGB tuple to hex string"""
     return f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
 
+def detect_color_depth(environ=None):
+    """Detect how many colors the terminal supports
+
+    Args:
+        environ (dict): Environment to inspect (defaults to os.environ)
+
+    Returns:
+        int: 24 for true color, 256 for xterm-256 or 0 for no color
+    """
+    if environ is None:
+        environ = os.environ
+
+    if "NO_COLOR" in environ or environ.get("TERM") == "dumb":
+        return 0
+
+    colorterm = environ.get("COLORTERM", "").lower()
+    if colorterm in ("truecolor", "24bit"):
+        return 24
+
+    # Terminals known to support 24-bit color without advertising COLORTERM
+    if environ.get("TERM_PROGRAM") in ("iTerm.app", "WezTerm", "vscode") or "WT_SESSION" in environ:
+        return 24
+
+    return 256
+
+def _build_xterm_table():
+    """Build the RGB to xterm-256 quantization table
+
+    The nearest cube level is separable per channel, so each cell only
+    compares its cube candidate against its nearest grayscale ramp entry.
+    """
+    def nearest_level(v):
+        return min(range(6), key=lambda i: abs(XTERM_CUBE_LEVELS[i] - v))
+
+    centers = [(i << 3) + 4 for i in range(32)]
+    cube = [nearest_level(c) for c in centers]
+
+    table = bytearray(32 * 32 * 32)
+    for ri, r in enumerate(centers):
+        cr = XTERM_CUBE_LEVELS[cube[ri]]
+        for gi, g in enumerate(centers):
+            cg = XTERM_CUBE_LEVELS[cube[gi]]
+            for bi, b in enumerate(centers):
+                cb = XTERM_CUBE_LEVELS[cube[bi]]
+                cube_dist = (r - cr) ** 2 + (g - cg) ** 2 + (b - cb) ** 2
+
+                # Grayscale ramp (indices 232-255): levels 8, 18, ..., 238
+                gray = max(0, min(23, round(((r + g + b) / 3 - 8) / 10)))
+                level = 8 + gray * 10
+                gray_dist = (r - level) ** 2 + (g - level) ** 2 + (b - level) ** 2
+
+                index = (ri << 10) | (gi << 5) | bi
+                if gray_dist < cube_dist:
+                    table[index] = 232 + gray
+                else:
+                    table[index] = 16 + 36 * cube[ri] + 6 * cube[gi] + cube[bi]
+
+    return table
+
+def rgb_to_xterm256(rgb):
+    """Map an RGB tuple to the nearest xterm-256 color index
+
+    Args:
+        rgb (tuple): RGB color tuple (0-255, 0-255, 0-255)
+
+    Returns:
+        int: xterm-256 color index (16-255)
+    """
+    global _xterm_table
+    if _xterm_table is None:
+        _xterm_table = _build_xterm_table()
+
+    return _xterm_table[((rgb[0] >> 3) << 10) | ((rgb[1] >> 3) << 5) | (rgb[2] >> 3)]
+
+def _fg(rgb, color_depth):
+    """ANSI escape sequence setting the foreground color"""
+    if color_depth == 24:
+        return f"\033[38;2;{rgb[0]};{rgb[1]};{rgb[2]}m"
+    if color_depth == 256:
+        return f"\033[38;5;{rgb_to_xterm256(rgb)}m"
+    return ""
+
+def _bg(rgb, color_depth):
+    """ANSI escape sequence setting the background color"""
+    if color_depth == 24:
+        return f"\033[48;2;{rgb[0]};{rgb[1]};{rgb[2]}m"
+    if color_depth == 256:
+        return f"\033[48;5;{rgb_to_xterm256(rgb)}m"
+    return ""
+
+def _reset(color_depth):
+    """ANSI escape sequence resetting colors"""
+    return "\033[0m" if color_depth else ""
+
+def _color_line(color, color_depth):
+    """Format a single palette line with a colored block and color info"""
+    hex_color = rgb_to_hex(color)
+    r, g, b = color
+
+    # Create a colored block using Unicode block characters instead of click bg color
+    block = "██████████"  # Unicode full blocks
+
+    # Format terminal output with ANSI escape codes
+    # This bypasses click's color limitations
+    color_display = f"{_fg(color, color_depth)}{block}{_reset(color_depth)}"
+
+    return f"{color_display}  {hex_color}  RGB: {r}, {g}, {b}"
+
 def display(palette, show_demo=False):
     """Display the color palette in the terminal
 
@@ -12,43 +133,141 @@ def display(palette, show_demo=False):
         palette (list): List of RGB color tuples
         show_demo (bool): Whether to show UI component samples
     """
-    click.echo("\nColor Palette:\n")
+    color_depth = detect_color_depth()
 
-    # Calculate the best text color (black or white) based on color brightness
-    def get_text_color(rgb):
-        brightness = (rgb[0] * 299 + rgb[1] * 587 + rgb[2] * 114) / 1000
-        return "black" if brightness > 128 else "white"
+    click.echo("\nColor Palette:\n")
 
     # Display color info without using hex for bg/fg
-    for i, color in enumerate(palette):
-        hex_color = rgb_to_hex(color)
-        r, g, b = color
+    for color in palette:
+        click.echo(_color_line(color, color_depth))
 
-        # Create a colored block using Unicode block characters instead of click bg color
-        block = "██████████"  # Unicode full blocks
+    if show_demo:
+        click.echo("\nNote: UI demos are available in HTML output format.")
 
-        # Format terminal output with ANSI escape codes
-        # This bypasses click's color limitations
-        color_display = f"\033[38;2;{r};{g};{b}m{block}\033[0m"
+@metrics.instrument("format", "terminal")
+def render(palette, show_demo=False, color_depth=None):
+    """Render the whole palette display as a single string
 
-        # Print the color block and info
-        click.echo(f"{color_display}  {hex_color}  RGB: {r}, {g}, {b}")
+    Args:
+        palette (list): List of RGB color tuples
+        show_demo (bool): Whether to show UI component samples
+        color_depth (int): 24, 256 or 0; detected from the environment if None
+
+    Returns:
+        str: Frame with the same content as ``display``
+    """
+    if color_depth is None:
+        color_depth = detect_color_depth()
+
+    lines = ["\nColor Palette:\n"]
+    lines.extend(_color_line(color, color_depth) for color in palette)
 
     if show_demo:
-        click.echo("\nNote: UI demos are available in HTML output format.")
+        lines.append("\nNote: UI demos are available in HTML output format.")
+
+    return "\n".join(lines) + "\n"
+
+def show(palette, show_demo=False, color_depth=None, file=None):
+    """Display the color palette in the terminal with a single write
+
+    Args:
+        palette (list): List of RGB color tuples
+        show_demo (bool): Whether to show UI component samples
+        color_depth (int): 24, 256 or 0; detected from the environment if None
+        file (file): Stream to write to (defaults to stdout)
+    """
+    click.echo(render(palette, show_demo, color_depth), file=file, nl=False)
+
+def _preview_size(width, height, max_width, max_cells):
+    """Calculate the preview size in columns and half-block rows"""
+    cols = max(1, min(max_width, width))
+    rows = max(1, round(cols * height / width / 2))
+
+    # Shrink uniformly when the cell budget is exceeded
+    if cols * rows > max_cells:
+        scale = (max_cells / (cols * rows)) ** 0.5
+        cols = max(1, int(cols * scale))
+        rows = max(1, int(rows * scale))
+
+    return cols, rows
+
+def render_image(image, max_width=None, max_cells=MAX_PREVIEW_CELLS, color_depth=24):
+    """Render an image preview using half-block characters
+
+    The image is downsampled once with an area-average (box) filter to two
+    pixels per character cell, so the cost per frame does not depend on the
+    size of the source image beyond decoding it.
+
+    Args:
+        image (str or PIL.Image.Image): Path to image file or an opened image
+        max_width (int): Maximum number of columns (defaults to terminal width)
+        max_cells (int): Maximum number of character cells in the preview
+        color_depth (int): 24, 256 or 0
+
+    Returns:
+        str: Preview frame, one line per row of cells
+    """
+    from ..parsers import image_parser
+
+    if max_width is None:
+        max_width = os.get_terminal_size().columns if os.isatty(1) else 80
+
+    if isinstance(image, str):
+        img = image_parser.load_image(image)
+        cols, rows = _preview_size(img.width, img.height, max_width, max_cells)
+
+        # Let JPEG decode at a reduced scale before resampling
+        img.draft('RGB', (cols, rows * 2))
+    else:
+        img = image
+        cols, rows = _preview_size(img.width, img.height, max_width, max_cells)
+
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    img = img.resize((cols, rows * 2), image_parser.Image.BOX)
+    data = img.tobytes()
+
+    lines = []
+    row_bytes = cols * 3
+    reset = _reset(color_depth)
+    for y in range(rows):
+        top = 2 * y * row_bytes
+        bottom = top + row_bytes
+        cells = []
+        for x in range(0, row_bytes, 3):
+            upper = (data[top + x], data[top + x + 1], data[top + x + 2])
+            lower = (data[bottom + x], data[bottom + x + 1], data[bottom + x + 2])
+            cells.append(f"{_fg(upper, color_depth)}{_bg(lower, color_depth)}{HALF_BLOCK}")
+        lines.append("".join(cells) + reset)
+
+    return "\n".join(lines) + "\n"
+
+def show_image(image, max_width=None, max_cells=MAX_PREVIEW_CELLS, color_depth=None, file=None):
+    """Display an image preview in the terminal with a single write
+
+    Args:
+        image (str or PIL.Image.Image): Path to image file or an opened image
+        max_width (int): Maximum number of columns (defaults to terminal width)
+        max_cells (int): Maximum number of character cells in the preview
+        color_depth (int): 24, 256 or 0; detected from the environment if None
+        file (file): Stream to write to (defaults to stdout)
+    """
+    if color_depth is None:
+        color_depth = detect_color_depth()
+
+    click.echo(render_image(image, max_width, max_cells, color_depth), file=file, nl=False)
 
-def display_ui_demo(palette):
+def display_ui_demo(palette, color_depth=24):
     """Display sample UI components using the color palette"""
     click.echo("\nUI Component Samples:\n")
 
     primary = palette[0]
-    primary_hex = rgb_to_hex(primary)
-    r, g, b = primary
 
     # Display a button representation using Unicode characters
     click.echo("Button:")
     button_text = "  BUTTON  "
-    button_display = f"\033[48;2;{r};{g};{b}m\033[38;2;255;255;255m{button_text}\033[0m"
+    button_display = f"{_bg(primary, color_depth)}{_fg((255, 255, 255), color_depth)}{button_text}{_reset(color_depth)}"
     click.echo(button_display)
 
     # Show color palette as a row of blocks
@@ -56,6 +275,5 @@ def display_ui_demo(palette):
         click.echo("\nColor blocks:")
         blocks = ""
         for color in palette:
-            r, g, b = color
-            blocks += f"\033[48;2;{r};{g};{b}m    \033[0m"
+            blocks += f"{_bg(color, color_depth)}    {_reset(color_depth)}"
         click.echo(blocks)
@@ -3,4 +3,5 @@ from . import harmony
 from . import ui_palette
 from . import monochromatic
 from . import accessible
+from . import cvd_safe
 from . import mood
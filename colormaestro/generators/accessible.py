@@ -1,16 +1,40 @@
-from ..utils import color_conversion
+from ..utils import color_conversion, color_spaces
 from ..utils import accessibility
+from .. import metrics
 
-def generate(base_color, num_colors):
+# Contrast required for text and for other colors, per metric
+_THRESHOLDS = {
+    "wcag": (accessibility.WCAG_LEVELS["AA"], accessibility.WCAG_LEVELS["AA-large"]),
+    "apca": (accessibility.APCA_LEVELS["content"], accessibility.APCA_LEVELS["large"]),
+}
+
+@metrics.instrument("generate", "accessible")
+def generate(base_color, num_colors, metric="wcag", space="hsv"):
     """Generate an accessible color palette that meets WCAG contrast guidelines
 
     Args:
         base_color (tuple): RGB color tuple (0-255, 0-255, 0-255)
         num_colors (int): Number of colors to generate
+        metric (str): Contrast metric: 'wcag' (AA ratios) or 'apca' (Lc 60
+                      for text, 45 between colors)
+        space (str): Color space candidate colors are computed in ('hsv', 'oklch' or 'lch')
 
     Returns:
         list: List of RGB color tuples
     """
+    if metric not in _THRESHOLDS:
+        raise ValueError(f"Unknown contrast metric: {metric}. Valid options are: {', '.join(_THRESHOLDS)}")
+    text_contrast, color_contrast = _THRESHOLDS[metric]
+
+    def score(color1, color2):
+        return accessibility.calculate_contrast(color1, color2, metric)
+
+    # Candidates are HSV variants of the original base color, converted in batches
+    original = base_color
+
+    def to_rgb(variants):
+        return color_spaces.hsv_variants_to_rgb(original, variants, space)
+
     # Convert to HSV for easier manipulation
     h, s, v = color_conversion.rgb_to_hsv(base_color)
 
@@ -22,19 +46,19 @@ def generate(base_color, num_colors):
     black = (0, 0, 0)
 
     # Check if base color needs adjustment to meet accessibility
-    base_with_white = accessibility.calculate_contrast_ratio(base_color, white)
-    base_with_black = accessibility.calculate_contrast_ratio(base_color, black)
+    base_with_white = score(base_color, white)
+    base_with_black = score(base_color, black)
 
     # If neither contrast is sufficient, adjust the base color
-    if base_with_white < 4.5 and base_with_black < 4.5:
+    if base_with_white < text_contrast and base_with_black < text_contrast:
         # Make color more saturated and either darker or lighter
         new_s = min(1.0, s + 0.2)
         new_v = min(0.9, v + 0.3) if base_with_white > base_with_black else max(0.1, v - 0.3)
-        adjusted_base = color_conversion.hsv_to_rgb((h, new_s, new_v))
+        adjusted_base, = to_rgb([(h, new_s, new_v)])
 
         # Replace base color if adjustment improves contrast
-        new_with_white = accessibility.calculate_contrast_ratio(adjusted_base, white)
-        new_with_black = accessibility.calculate_contrast_ratio(adjusted_base, black)
+        new_with_white = score(adjusted_base, white)
+        new_with_black = score(adjusted_base, black)
 
         if max(new_with_white, new_with_black) > max(base_with_white, base_with_black):
             palette[0] = adjusted_base
@@ -47,14 +71,14 @@ def generate(base_color, num_colors):
     best_contrast = 0
     best_complement = None
 
-    for s_adj in [0.7, 0.8, 0.9, 1.0]:
-        for v_adj in [0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]:
-            test_color = color_conversion.hsv_to_rgb((h_comp, s_adj, v_adj))
-            contrast = accessibility.calculate_contrast_ratio(base_color, test_color)
+    candidates = to_rgb([(h_comp, s_adj, v_adj)
+                         for s_adj in [0.7, 0.8, 0.9, 1.0] for v_adj in [0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]])
+    for test_color in candidates:
+        contrast = score(base_color, test_color)
 
-            if contrast > best_contrast and contrast >= 4.5:
-                best_contrast = contrast
-                best_complement = test_color
+        if contrast > best_contrast and contrast >= text_contrast:
+            best_contrast = contrast
+            best_complement = test_color
 
     # If we found a good complement, add it
     if best_complement:
@@ -62,7 +86,7 @@ def generate(base_color, num_colors):
     else:
         # If no good complement, use a very different value
         new_v = 0.9 if v < 0.5 else 0.1
-        palette.append(color_conversion.hsv_to_rgb((h_comp, s, new_v)))
+        palette.extend(to_rgb([(h_comp, s, new_v)]))
 
     # Generate remaining colors
     if num_colors > 2:
@@ -75,19 +99,17 @@ def generate(base_color, num_colors):
             best_contrast = 0
             best_color = None
 
-            for s_adj in [0.7, 0.8, 0.9, 1.0]:
-                for v_adj in [0.3, 0.5, 0.7, 0.9]:
-                    test_color = color_conversion.hsv_to_rgb((new_h, s_adj, v_adj))
-
-                    # Calculate minimum contrast with existing colors
-                    min_contrast = min(
-                        accessibility.calculate_contrast_ratio(test_color, existing)
-                        for existing in palette
-                    )
+            candidates = to_rgb([(new_h, s_adj, v_adj) for s_adj in [0.7, 0.8, 0.9, 1.0] for v_adj in [0.3, 0.5, 0.7, 0.9]])
+            for test_color in candidates:
+                # Calculate minimum contrast with existing colors
+                min_contrast = min(
+                    score(test_color, existing)
+                    for existing in palette
+                )
 
-                    if min_contrast > best_contrast and min_contrast >= 3.0:
-                        best_contrast = min_contrast
-                        best_color = test_color
+                if min_contrast > best_contrast and min_contrast >= color_contrast:
+                    best_contrast = min_contrast
+                    best_color = test_color
 
             # Add the best color or fall back to a default
             if best_color:
@@ -95,6 +117,6 @@ def generate(base_color, num_colors):
             else:
                 # Fallback: create a color with different lightness
                 new_v = 0.8 if i % 2 == 0 else 0.4
-                palette.append(color_conversion.hsv_to_rgb((new_h, 0.8, new_v)))
+                palette.extend(to_rgb([(new_h, 0.8, new_v)]))
 
     return palette
@@ -0,0 +1,126 @@
+"""Categorical palettes that stay distinguishable with color vision deficiencies
+
+Colors are picked from a precomputed grid of sRGB candidates. The distance
+between two colors is the smallest of their OKLab distances under normal
+vision and simulated protan, deutan and tritan vision, so a palette that
+is well spread under that distance is well spread for every viewer.
+
+The palette is grown by farthest-point sampling from the base color: each
+step adds the candidate farthest from every color picked so far, keeping
+the distance of each candidate to its nearest picked color up to date with
+one pass over the grid per view. Greedy swaps then replace a color of the
+closest pair whenever that increases the smallest distance in the palette.
+"""
+import math
+from functools import lru_cache
+from itertools import repeat
+from ..utils import color_spaces, cvd
+from .. import metrics
+
+# Levels per sRGB channel of the candidate grid
+GRID_LEVELS = 16
+
+# OKLab lightness range of the candidates: very dark and very light colors
+# are hard to tell apart from each other and from backgrounds
+MIN_LIGHTNESS = 0.35
+MAX_LIGHTNESS = 0.92
+
+# Upper bound on the greedy swaps made after farthest-point sampling
+MAX_SWAPS = 64
+
+def _views(colors):
+    """Get the OKLab coordinates of colors under normal vision and each deficiency"""
+    views = [color_spaces.rgb_to_oklab(colors)]
+    views.extend(color_spaces.rgb_to_oklab(cvd.simulate(colors, deficiency)) for deficiency in cvd.DEFICIENCIES)
+    return views
+
+@lru_cache(maxsize=1)
+def _candidates():
+    """Get the candidate grid and its coordinates under each view"""
+    levels = [round(i * 255 / (GRID_LEVELS - 1)) for i in range(GRID_LEVELS)]
+    grid = [(r, g, b) for r in levels for g in levels for b in levels]
+    grid = [rgb for rgb, (L, _, _) in zip(grid, color_spaces.rgb_to_oklab(grid))
+            if MIN_LIGHTNESS <= L <= MAX_LIGHTNESS]
+    return grid, _views(grid)
+
+def _distances(point_views, views):
+    """Get the distance from one color to every candidate (the minimum over views)"""
+    dist = math.dist
+    rows = [list(map(dist, repeat(point), coordinates)) for point, coordinates in zip(point_views, views)]
+    return list(map(min, *rows))
+
+def _pair_distance(a, b):
+    """Get the distance between two colors given their views"""
+    return min(math.dist(x, y) for x, y in zip(a, b))
+
+def min_distance(palette):
+    """Get the smallest distance between two palette colors under any view
+
+    Args:
+        palette (list): List of RGB color tuples
+
+    Returns:
+        float: Smallest OKLab distance between two colors, under normal vision
+               or any simulated deficiency (inf for fewer than two colors)
+    """
+    views = list(zip(*_views(palette)))
+    return min((_pair_distance(views[i], views[j])
+                for i in range(len(views)) for j in range(i + 1, len(views))), default=math.inf)
+
+@metrics.instrument("generate", "cvd_safe")
+def generate(base_color, num_colors):
+    """Generate a categorical palette that stays distinguishable for color-blind users
+
+    Args:
+        base_color (tuple): RGB color tuple (0-255, 0-255, 0-255), kept as the first color
+        num_colors (int): Number of colors to generate
+
+    Returns:
+        list: List of RGB color tuples, most distinct first after the base color
+    """
+    grid, views = _candidates()
+    base_views = [view[0] for view in _views([base_color])]
+
+    palette = [tuple(base_color)]
+    picked_views = [base_views]
+    # Rows of candidate distances to each picked color, and their minimum
+    rows = [_distances(base_views, views)]
+    nearest = rows[0]
+
+    while len(palette) < num_colors:
+        best = max(range(len(grid)), key=nearest.__getitem__)
+        point_views = [view[best] for view in views]
+        palette.append(grid[best])
+        picked_views.append(point_views)
+        rows.append(_distances(point_views, views))
+        nearest = list(map(min, nearest, rows[-1]))
+
+    # Greedy swaps: move a color of the closest pair (never the base color)
+    # to the candidate farthest from the others, while that helps
+    for _ in range(MAX_SWAPS):
+        count = len(palette)
+        pairs = [(_pair_distance(picked_views[i], picked_views[j]), i, j)
+                 for i in range(count) for j in range(i + 1, count)]
+        if not pairs:
+            break
+        bottleneck, i, j = min(pairs)
+
+        improved = False
+        for k in (j, i):
+            if k == 0:
+                continue
+            others = [row for m, row in enumerate(rows) if m != k]
+            distances = list(map(min, *others)) if len(others) > 1 else others[0]
+            best = max(range(len(grid)), key=distances.__getitem__)
+            # Pairs not involving k are unchanged; the new color must beat the bottleneck
+            rest = min((d for d, a, b in pairs if k not in (a, b)), default=math.inf)
+            if min(distances[best], rest) > bottleneck:
+                palette[k] = grid[best]
+                picked_views[k] = [view[best] for view in views]
+                rows[k] = _distances(picked_views[k], views)
+                improved = True
+                break
+        if not improved:
+            break
+
+    return palette
@@ -1,12 +1,16 @@
-from ..utils import color_conversion
+from ..utils import color_conversion, color_spaces
+from .. import metrics
 
-def generate(base_color, harmony_type, num_colors):
+@metrics.instrument("generate", "harmony")
+def generate(base_color, harmony_type, num_colors, space="hsv"):
     """Generate a color palette based on color harmony principles
 
     Args:
         base_color (tuple): RGB color tuple (0-255, 0-255, 0-255)
         harmony_type (str): Type of harmony ('complementary', 'analogous', 'triadic', 'tetradic')
         num_colors (int): Number of colors to generate
+        space (str): Color space the harmony is computed in ('hsv', 'oklch' or 'lch');
+                     the perceptual spaces keep lightness and chroma even across hues
 
     Returns:
         list: List of RGB color tuples
@@ -14,15 +18,14 @@ def generate(base_color, harmony_type, num_colors):
     # Convert to HSV for easier manipulation
     h, s, v = color_conversion.rgb_to_hsv(base_color)
 
-    # Start with the base color
-    palette = [base_color]
+    # HSV descriptions of the colors following the base color
+    variants = []
 
     # Generate harmony colors based on type
     if harmony_type == "complementary":
         # Complementary color (opposite on the color wheel)
         h_comp = (h + 0.5) % 1.0
-        comp_color = color_conversion.hsv_to_rgb((h_comp, s, v))
-        palette.append(comp_color)
+        variants.append((h_comp, s, v))
 
         # Fill remaining colors with variations
         remaining = num_colors - 2
@@ -33,12 +36,12 @@ def generate(base_color, harmony_type, num_colors):
                     # Variation of base color
                     new_s = max(0.2, min(1.0, s - 0.3 + (0.6 * i / remaining)))
                     new_v = max(0.3, min(1.0, v - 0.2 + (0.4 * i / remaining)))
-                    palette.append(color_conversion.hsv_to_rgb((h, new_s, new_v)))
+                    variants.append((h, new_s, new_v))
                 else:
                     # Variation of complementary color
                     new_s = max(0.2, min(1.0, s - 0.3 + (0.6 * i / remaining)))
                     new_v = max(0.3, min(1.0, v - 0.2 + (0.4 * i / remaining)))
-                    palette.append(color_conversion.hsv_to_rgb((h_comp, new_s, new_v)))
+                    variants.append((h_comp, new_s, new_v))
 
     elif harmony_type == "analogous":
         # Analogous colors (adjacent on the color wheel)
@@ -57,15 +60,15 @@ def generate(base_color, harmony_type, num_colors):
             s_new = min(1.0, s * (1.0 + (i % 3 - 1) * 0.1))
             v_new = min(1.0, v * (1.0 + (i % 2 - 0.5) * 0.1))
 
-            palette.append(color_conversion.hsv_to_rgb((h_new, s_new, v_new)))
+            variants.append((h_new, s_new, v_new))
 
     elif harmony_type == "triadic":
         # Triadic colors (evenly spaced around the color wheel)
         h1 = (h + 1/3) % 1.0
         h2 = (h + 2/3) % 1.0
 
-        palette.append(color_conversion.hsv_to_rgb((h1, s, v)))
-        palette.append(color_conversion.hsv_to_rgb((h2, s, v)))
+        variants.append((h1, s, v))
+        variants.append((h2, s, v))
 
         # Fill remaining colors
         remaining = num_colors - 3
@@ -74,7 +77,7 @@ def generate(base_color, harmony_type, num_colors):
                 h_base = [h, h1, h2][i % 3]
                 new_s = max(0.2, min(1.0, s - 0.2 + (0.4 * i / remaining)))
                 new_v = max(0.3, min(1.0, v - 0.1 + (0.2 * i / remaining)))
-                palette.append(color_conversion.hsv_to_rgb((h_base, new_s, new_v)))
+                variants.append((h_base, new_s, new_v))
 
     elif harmony_type == "tetradic":
         # Tetradic/rectangular (two complementary pairs)
@@ -82,9 +85,9 @@ def generate(base_color, harmony_type, num_colors):
         h2 = (h + 0.5) % 1.0
         h3 = (h + 0.75) % 1.0
 
-        palette.append(color_conversion.hsv_to_rgb((h1, s, v)))
-        palette.append(color_conversion.hsv_to_rgb((h2, s, v)))
-        palette.append(color_conversion.hsv_to_rgb((h3, s, v)))
+        variants.append((h1, s, v))
+        variants.append((h2, s, v))
+        variants.append((h3, s, v))
 
         # Fill remaining colors
         remaining = num_colors - 4
@@ -93,6 +96,7 @@ def generate(base_color, harmony_type, num_colors):
                 h_base = [h, h1, h2, h3][i % 4]
                 new_s = max(0.2, min(1.0, s - 0.2 + (0.4 * i / remaining)))
                 new_v = max(0.3, min(1.0, v - 0.1 + (0.2 * i / remaining)))
-                palette.append(color_conversion.hsv_to_rgb((h_base, new_s, new_v)))
+                variants.append((h_base, new_s, new_v))
 
-    return palette
+    # Start with the base color
+    return [base_color] + color_spaces.hsv_variants_to_rgb(base_color, variants, space)
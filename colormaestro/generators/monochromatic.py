@@ -1,11 +1,14 @@
-from ..utils import color_conversion
+from ..utils import color_conversion, color_spaces
+from .. import metrics
 
-def generate(base_color, num_colors):
+@metrics.instrument("generate", "mono")
+def generate(base_color, num_colors, space="hsv"):
     """Generate a monochromatic color palette from a base color
 
     Args:
         base_color (tuple): RGB color tuple (0-255, 0-255, 0-255)
         num_colors (int): Number of colors to generate
+        space (str): Color space the variations are computed in ('hsv', 'oklch' or 'lch')
 
     Returns:
         list: List of RGB color tuples
@@ -13,7 +16,7 @@ def generate(base_color, num_colors):
     # Convert to HSV for easier manipulation
     h, s, v = color_conversion.rgb_to_hsv(base_color)
 
-    palette = []
+    variants = []
 
     # Create variations by adjusting saturation and value
     for i in range(num_colors):
@@ -31,9 +34,10 @@ def generate(base_color, num_colors):
             new_s = s
             new_v = v
 
-        # Convert back to RGB and add to palette
-        rgb = color_conversion.hsv_to_rgb((h, new_s, new_v))
-        palette.append(rgb)
+        variants.append((h, new_s, new_v))
+
+    # Convert back to RGB in one batch
+    palette = color_spaces.hsv_variants_to_rgb(base_color, variants, space)
 
     # Sort by brightness (value)
     palette.sort(key=lambda rgb: sum(rgb), reverse=True)
@@ -1,5 +1,6 @@
 import random
 from ..utils import color_conversion
+from .. import metrics
 
 # Define mood profiles with HSV ranges
 MOOD_PROFILES = {
@@ -30,6 +31,7 @@ MOOD_PROFILES = {
     },
 }
 
+@metrics.instrument("generate", "mood")
 def generate_base_color(mood):
     """Generate a base color that fits a specified mood
 
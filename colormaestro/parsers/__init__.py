@@ -1,4 +1,13 @@
-# Import parsers for easier access from other modules
-from . import hex_parser
-from . import name_parser
-from . import image_parser
+# Parsers are imported on first access, so that importing one of them does
+# not load the dependencies of the others (e.g. Pillow)
+import importlib
+
+__all__ = ["hex_parser", "name_parser", "image_parser"]
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,5 +1,7 @@
 from ..utils import color_conversion
+from .. import metrics
 
+@metrics.instrument("parse", "hex")
 def parse(hex_input):
     """Parse a hex color input
 
@@ -3,15 +3,16 @@ try:
     from PIL import Image
 except ImportError:
     Image = None
+from .. import metrics
 
-def extract_dominant_color(image_path):
-    """Extract the dominant color from an image
+def load_image(image_path):
+    """Open an image file with Pillow
 
     Args:
         image_path (str): Path to image file
 
     Returns:
-        tuple: RGB color tuple (0-255, 0-255, 0-255)
+        PIL.Image.Image: The opened (lazily decoded) image
     """
     if not os.path.exists(image_path):
         raise FileNotFoundError(f"Image file not found: {image_path}")
@@ -19,19 +20,34 @@ def extract_dominant_color(image_path):
     if Image is None:
         raise ImportError("Pillow (PIL) library is required for image processing. Install with 'pip install pillow'")
 
+    return Image.open(image_path)
+
+@metrics.instrument("parse", "image")
+def extract_dominant_color(image_path):
+    """Extract the dominant color from an image
+
+    Args:
+        image_path (str): Path to image file
+
+    Returns:
+        tuple: RGB color tuple (0-255, 0-255, 0-255)
+    """
     # Open the image
-    img = Image.open(image_path)
+    with load_image(image_path) as img:
+        metrics.IMAGE_DECODE_PIXELS.observe(img.width * img.height)
 
-    # Resize image to speed up processing
-    img = img.copy()
-    img.thumbnail((100, 100))
+        # Resize image to speed up processing. Resizing the lazily opened
+        # image (rather than a copy, which forces a full decode) lets
+        # formats such as JPEG decode at a reduced scale, so the full-size
+        # image never has to be held in memory.
+        img.thumbnail((100, 100))
 
-    # Convert to RGB mode if not already
-    if img.mode != 'RGB':
-        img = img.convert('RGB')
+        # Convert to RGB mode if not already
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
 
-    # Get colors from image
-    pixels = list(img.getdata())
+        # Get colors from image
+        pixels = list(img.getdata())
 
     # Count occurrences of each color
     color_count = {}
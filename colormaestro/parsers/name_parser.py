@@ -2,6 +2,7 @@ import json
 import os
 import random
 from ..utils import color_conversion
+from .. import metrics
 
 # Dictionary of common color names to hex values
 COLOR_NAMES = {
@@ -74,6 +75,7 @@ def get_color_name_dict():
     """
     return COLOR_NAMES
 
+@metrics.instrument("parse", "name")
 def parse(color_name):
     """Parse a color name to RGB
 
@@ -0,0 +1,87 @@
+import os
+from .parsers import hex_parser, name_parser
+from .generators import harmony as harmony_generator, ui_palette, monochromatic, accessible, cvd_safe, \
+    mood as mood_generator
+from .utils import color_conversion
+
+PALETTE_TYPES = ["ui", "harmony", "mono", "accessible", "cvd-safe"]
+HARMONY_TYPES = ["complementary", "analogous", "triadic", "tetradic"]
+MOOD_OPTIONS = ["professional", "playful", "serious", "calm", "energetic"]
+COLOR_SPACES = ["hsv", "oklch", "lch"]
+BATCH_FORMATS = ["ndjson", "json", "css", "scss", "tailwind", "hex"]
+
+def input_kind(input):
+    """Classify a palette input
+
+    Args:
+        input (str): Hex color, color name, image path, or None
+
+    Returns:
+        str: One of 'random', 'hex', 'image' or 'name'
+    """
+    if not input:
+        return "random"
+    elif input.startswith('#'):
+        return "hex"
+    elif os.path.isfile(input):
+        return "image"
+    return "name"
+
+def parse_input(input, mood=None, kind=None):
+    """Parse a palette input into a base color
+
+    Args:
+        input (str): Hex color (#3A86FF), color name (sky-blue), image path, or
+                     None for a random color
+        mood (str): Mood used for random colors
+        kind (str): Input kind, as returned by ``input_kind`` (detected if None)
+
+    Returns:
+        tuple: RGB color tuple (0-255, 0-255, 0-255)
+    """
+    if kind is None:
+        kind = input_kind(input)
+
+    if kind == "random":
+        if mood:
+            return mood_generator.generate_base_color(mood)
+        return color_conversion.random_color()
+    elif kind == "hex":
+        return hex_parser.parse(input)
+    elif kind == "image":
+        # Imported here so hex and name inputs never load Pillow
+        from .parsers import image_parser
+        return image_parser.extract_dominant_color(input)
+    return name_parser.parse(input)
+
+def generate_palette(base_color, palette_type="ui", harmony="complementary", num_colors=5, dark=False,
+                     space="hsv"):
+    """Generate a palette with one of the generators
+
+    Args:
+        base_color (tuple): RGB color tuple (0-255, 0-255, 0-255)
+        palette_type (str): Palette type ('ui', 'harmony', 'mono', 'accessible', 'cvd-safe')
+        harmony (str): Harmony type for 'harmony' palettes
+        num_colors (int): Number of colors to generate
+        dark (bool): Whether to optimize 'ui' palettes for dark mode
+        space (str): Color space 'ui', 'harmony', 'mono' and 'accessible' palettes
+                     are computed in ('cvd-safe' palettes are picked in OKLab)
+
+    Returns:
+        list: List of RGB color tuples
+    """
+    if space not in COLOR_SPACES:
+        raise ValueError(f"Unknown color space: {space}. Valid options are: {', '.join(COLOR_SPACES)}")
+
+    if palette_type == "ui":
+        return ui_palette.generate(base_color, num_colors, dark, space)
+    elif palette_type == "harmony":
+        return harmony_generator.generate(base_color, harmony, num_colors, space)
+    elif palette_type == "mono":
+        return monochromatic.generate(base_color, num_colors, space)
+    elif palette_type == "accessible":
+        return accessible.generate(base_color, num_colors, space=space)
+    elif palette_type == "cvd-safe":
+        return cvd_safe.generate(base_color, num_colors)
+
+    raise ValueError(f"Unknown palette type: {palette_type}. Valid options are: {', '.join(PALETTE_TYPES)}")
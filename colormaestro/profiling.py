@@ -0,0 +1,101 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Shared no-op context returned by disabled timers
+_NULL_STAGE = nullcontext()
+
+class StageTimer:
+    """Collect wall-clock durations of named pipeline stages
+
+    Stages may be timed from several threads at once (e.g. concurrent
+    exports). A disabled timer hands out a shared no-op context, so the
+    hooks cost a method call and nothing else.
+
+    Args:
+        enabled (bool): Whether stages are timed
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.stages = []
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """Time a block of code as the named stage
+
+        Args:
+            name (str): Stage name; repeated names are added up in the report
+
+        Returns:
+            Context manager timing the block
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages.append((name, elapsed))
+
+    def totals(self):
+        """Get the total duration of each stage
+
+        Returns:
+            dict: Stage name to seconds, in order of first completion
+        """
+        totals = {}
+        with self._lock:
+            for name, elapsed in self.stages:
+                totals[name] = totals.get(name, 0.0) + elapsed
+        return totals
+
+    def report(self):
+        """Format the stage durations as a table
+
+        Percentages are relative to the wall time since the timer was
+        created; concurrent stages can add up to more than 100%.
+
+        Returns:
+            str: Report text
+        """
+        wall = time.perf_counter() - self.started
+        totals = self.totals()
+        width = max([len(name) for name in totals] + [5])
+
+        lines = [f"Profile (wall time {wall * 1000:.2f} ms)"]
+        for name, elapsed in totals.items():
+            share = 100 * elapsed / wall if wall else 0.0
+            lines.append(f"  {name:<{width}}  {elapsed * 1000:9.2f} ms  {share:5.1f}%")
+
+        return "\n".join(lines)
+
+# Timer used when the caller does not profile
+DISABLED = StageTimer(enabled=False)
+
+def start_cprofile(output_path):
+    """Start profiling the calling thread with cProfile
+
+    Args:
+        output_path (str): Path the pstats file is written to
+
+    Returns:
+        callable: Function stopping the profiler and writing the stats file
+    """
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    def stop():
+        profiler.disable()
+        profiler.dump_stats(output_path)
+
+    return stop
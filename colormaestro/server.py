@@ -0,0 +1,293 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from . import pipeline, metrics
+from .formatters import html, css, scss, tailwind, json_formatter, image_formatter
+from .parsers import image_parser
+from .utils import color_conversion, accessibility
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Entries kept in each of the parse, generate and format caches
+DEFAULT_CACHE_SIZE = 4096
+
+# Largest palette a request may ask for
+MAX_COLORS = 64
+
+CONTENT_TYPES = {
+    "css": "text/css; charset=utf-8",
+    "scss": "text/x-scss; charset=utf-8",
+    "tailwind": "application/javascript; charset=utf-8",
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "html": "text/html; charset=utf-8",
+    "svg": "image/svg+xml",
+    "png": "image/png",
+}
+
+class PaletteService:
+    """Palette operations with warm caches, shared by all HTTP requests
+
+    Parsed inputs, generated palettes and formatted outputs are cached in
+    LRU caches; the HTML template is loaded once. Image decoding and PNG
+    rendering run on a process pool so they do not hold up other requests.
+
+    Args:
+        workers (int): Number of worker processes for CPU-heavy work
+        image_root (str): Directory image inputs must live in; image inputs
+                          are rejected when None
+        cache_size (int): Maximum number of entries per cache
+    """
+
+    def __init__(self, workers=None, image_root=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.image_root = os.path.realpath(image_root) if image_root else None
+        self.template = html.load_template()
+
+        self._parse_color = lru_cache(maxsize=cache_size)(self._parse_color)
+        self._extract_image = lru_cache(maxsize=cache_size)(self._extract_image)
+        self.generate = lru_cache(maxsize=cache_size)(self.generate)
+        self.format = lru_cache(maxsize=cache_size)(self.format)
+
+        for name, cached in self._caches().items():
+            metrics.REGISTRY.register_cache(f"server_{name}", cached)
+
+    def close(self):
+        """Shut down the worker processes"""
+        for name in self._caches():
+            metrics.REGISTRY.unregister_cache(f"server_{name}")
+        self.executor.shutdown()
+
+    def _caches(self):
+        return {
+            "parse": self._parse_color,
+            "image": self._extract_image,
+            "generate": self.generate,
+            "format": self.format,
+        }
+
+    def _parse_color(self, input, kind):
+        return pipeline.parse_input(input, kind=kind)
+
+    def _extract_image(self, path, mtime_ns, size):
+        # mtime and size are part of the cache key so edited images are re-read
+        return self.executor.submit(image_parser.extract_dominant_color, path).result()
+
+    def parse(self, input, mood=None):
+        """Parse an input into a base color
+
+        Inputs containing a path separator or a dot are image paths,
+        relative to the image root; other inputs are never looked up on
+        disk, and nothing outside the image root is.
+
+        Args:
+            input (str): Hex color (with or without '#'), color name, image
+                         path inside the image root, or None for random
+            mood (str): Mood used for random colors
+
+        Returns:
+            tuple: RGB color tuple (0-255, 0-255, 0-255)
+        """
+        if not input:
+            return pipeline.parse_input(None, mood, "random")
+        if not input.startswith('#') and color_conversion.is_valid_hex(input):
+            input = '#' + input
+
+        if input.startswith('#'):
+            return self._parse_color(input, "hex")
+        if not _is_path(input):
+            return self._parse_color(input, "name")
+
+        if self.image_root is None:
+            raise ValueError("Image inputs are not enabled on this server")
+        path = os.path.realpath(os.path.join(self.image_root, input))
+        # One error for every path outside the root, whether it exists or not
+        if os.path.commonpath([self.image_root, path]) != self.image_root or not os.path.isfile(path):
+            raise ValueError(f"Image not found in the image root: {input}")
+        stat = os.stat(path)
+        return self._extract_image(path, stat.st_mtime_ns, stat.st_size)
+
+    def generate(self, base_color, palette_type="ui", harmony="complementary", num_colors=5, dark=False,
+                 space="hsv"):
+        """Generate a palette (see ``pipeline.generate_palette``)
+
+        Returns:
+            tuple: Tuple of RGB color tuples
+        """
+        return tuple(pipeline.generate_palette(base_color, palette_type, harmony, num_colors, dark, space))
+
+    def format(self, palette, output_format, show_demo=False):
+        """Format a palette
+
+        Args:
+            palette (tuple): Tuple of RGB color tuples
+            output_format (str): One of CONTENT_TYPES
+            show_demo (bool): Whether to show UI component samples (html only)
+
+        Returns:
+            bytes: Formatted output
+        """
+        palette = list(palette)
+
+        if output_format == "css":
+            content = css.generate(palette)
+        elif output_format == "scss":
+            content = scss.generate(palette)
+        elif output_format == "tailwind":
+            content = tailwind.generate(palette)
+        elif output_format == "json":
+            content = json_formatter.generate(palette)
+        elif output_format == "ndjson":
+            content = json_formatter.generate_line(palette) + "\n"
+        elif output_format == "html":
+            content = html.render(palette, show_demo, template=self.template)
+        elif output_format == "svg":
+            content = image_formatter.render(palette, "svg")
+        elif output_format == "png":
+            return self.executor.submit(image_formatter.render, palette, "png").result()
+        else:
+            raise ValueError(f"Unknown output format: {output_format}. Valid options are: {', '.join(CONTENT_TYPES)}")
+
+        return content.encode('utf-8')
+
+    def cache_stats(self):
+        """Get hit and miss counts of the caches
+
+        Returns:
+            dict: Cache name to {'hits', 'misses', 'size'}
+        """
+        stats = {}
+        for name, cached in self._caches().items():
+            info = cached.cache_info()
+            stats[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+        return stats
+
+class PaletteRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler exposing the palette service
+
+    Endpoints (GET, options as query parameters):
+        /parse          input, mood
+        /generate       input, mood, type, harmony, colors (1-MAX_COLORS), dark, space
+        /format         as /generate, plus format and demo
+        /accessibility  as /generate
+        /stats          cache statistics
+        /metrics        library metrics in the Prometheus text format
+    """
+
+    server_version = "ColorMaestro"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        service = self.server.service
+
+        try:
+            if url.path == "/parse":
+                base_color = service.parse(params.get("input"), params.get("mood"))
+                self._send_json({"rgb": list(base_color), "hex": color_conversion.rgb_to_hex(base_color)})
+            elif url.path == "/generate":
+                palette = self._palette(params)
+                self._send_json({"palette": [color_conversion.rgb_to_hex(rgb) for rgb in palette]})
+            elif url.path == "/format":
+                output_format = params.get("format", "json")
+                body = service.format(self._palette(params), output_format, _flag(params.get("demo")))
+                self._send(200, body, CONTENT_TYPES[output_format])
+            elif url.path == "/accessibility":
+                self._send_json(accessibility.check_contrast(list(self._palette(params))))
+            elif url.path == "/stats":
+                self._send_json(service.cache_stats())
+            elif url.path == "/metrics":
+                self._send(200, metrics.render_prometheus().encode('utf-8'), "text/plain; version=0.0.4; charset=utf-8")
+            else:
+                self._send_json({"error": f"Not found: {url.path}"}, 404)
+        except (ValueError, KeyError, FileNotFoundError) as e:
+            self._send_json({"error": str(e)}, 400)
+        except Exception as e:
+            self._send_json({"error": str(e)}, 500)
+
+    def _palette(self, params):
+        """Parse and generate the palette described by query parameters"""
+        service = self.server.service
+        palette_type = params.get("type", "ui")
+        harmony = params.get("harmony", "complementary")
+        space = params.get("space", "hsv")
+
+        if palette_type not in pipeline.PALETTE_TYPES:
+            raise ValueError(f"Unknown palette type: {palette_type}")
+        if harmony not in pipeline.HARMONY_TYPES:
+            raise ValueError(f"Unknown harmony type: {harmony}")
+        if space not in pipeline.COLOR_SPACES:
+            raise ValueError(f"Unknown color space: {space}")
+
+        try:
+            num_colors = int(params.get("colors", 5))
+        except ValueError:
+            raise ValueError(f"colors must be an integer: {params['colors']}")
+        if not 1 <= num_colors <= MAX_COLORS:
+            raise ValueError(f"colors must be between 1 and {MAX_COLORS}")
+
+        base_color = service.parse(params.get("input"), params.get("mood"))
+        return service.generate(base_color, palette_type, harmony, num_colors, _flag(params.get("dark")), space)
+
+    def _send_json(self, data, status=200):
+        self._send(status, json.dumps(data).encode('utf-8'), "application/json")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+def _is_path(input):
+    """Tell whether an input names a file rather than a color (without touching the disk)"""
+    return any(sep and sep in input for sep in ("/", "\\", os.sep, os.altsep, "."))
+
+def _flag(value):
+    """Interpret a query parameter as a boolean flag"""
+    return value is not None and value.lower() in ("1", "true", "yes", "on", "")
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, service=None, quiet=False):
+    """Create the palette HTTP server
+
+    Args:
+        host (str): Interface to bind to
+        port (int): Port to listen on (0 picks a free port)
+        service (PaletteService): Service to expose (created if None)
+        quiet (bool): Whether to suppress request logging
+
+    Returns:
+        ThreadingHTTPServer: Server ready for ``serve_forever``
+    """
+    server = ThreadingHTTPServer((host, port), PaletteRequestHandler)
+    server.service = service or PaletteService()
+    server.quiet = quiet
+    return server
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, image_root=None, quiet=False):
+    """Run the palette HTTP server until interrupted
+
+    Args:
+        host (str): Interface to bind to
+        port (int): Port to listen on
+        workers (int): Number of worker processes for CPU-heavy work
+        image_root (str): Directory image inputs must live in
+        quiet (bool): Whether to suppress request logging
+    """
+    service = PaletteService(workers=workers, image_root=image_root)
+    server = make_server(host, port, service, quiet)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,340 @@
+"""Similarity search over palette libraries
+
+Palettes of any size are described by a fixed-length feature vector: their
+OKLab colors sorted by lightness and resampled to SLOTS colors, followed by
+a chroma-weighted hue histogram. Vectors are stored in an inverted file
+index: a two-level k-means quantizer splits them into about sqrt(N) lists,
+and a query only scans the lists whose centroids are nearest to it.
+
+Indexes are saved to a single binary file of float32 and int64 sections
+that ``Index.load`` memory-maps, so opening an index does not read it and
+queries only touch the pages of the lists they scan.
+"""
+import heapq
+import json
+import math
+import mmap
+import random
+import struct
+from array import array
+from .utils import color_spaces
+
+# Colors a palette is resampled to (sorted by lightness)
+SLOTS = 5
+
+# Hue histogram bins
+HUE_BINS = 12
+
+# Weight of the hue histogram relative to the OKLab coordinates
+HUE_WEIGHT = 0.25
+
+# Colors with an OKLCH chroma below this do not count towards the hue histogram
+ACHROMATIC_CHROMA = 0.02
+
+DIMENSIONS = SLOTS * 3 + HUE_BINS
+
+# Lists scanned per query by default
+DEFAULT_NPROBE = 8
+
+# k-means iterations and training sample size per centroid
+KMEANS_ITERATIONS = 8
+SAMPLE_PER_CENTROID = 32
+
+_MAGIC = b"CMSIMIDX"
+_VERSION = 1
+_ALIGNMENT = 8
+
+def features(palette):
+    """Compute the feature vector of a palette
+
+    Args:
+        palette (list): List of RGB color tuples (any length)
+
+    Returns:
+        list: DIMENSIONS floats
+    """
+    if not palette:
+        raise ValueError("Cannot index an empty palette")
+
+    labs = sorted(color_spaces.rgb_to_oklab(palette))
+    vector = []
+
+    # Resample the lightness-sorted colors to SLOTS colors by interpolation
+    last = len(labs) - 1
+    for slot in range(SLOTS):
+        position = slot * last / (SLOTS - 1)
+        low = math.floor(position)
+        high = min(low + 1, last)
+        weight = position - low
+        vector.extend(x + (y - x) * weight for x, y in zip(labs[low], labs[high]))
+
+    histogram = [0.0] * HUE_BINS
+    for L, C, h in color_spaces.lab_to_lch(labs):
+        if C >= ACHROMATIC_CHROMA:
+            histogram[int(h / 360 * HUE_BINS) % HUE_BINS] += C
+    total = sum(histogram)
+    vector.extend(HUE_WEIGHT * count / total if total else 0.0 for count in histogram)
+
+    return vector
+
+def _nearest(vector, centroids):
+    """Get the index of the centroid nearest to a vector"""
+    dist = math.dist
+    return min(range(len(centroids)), key=lambda i: dist(vector, centroids[i]))
+
+def _kmeans(row, ids, count, rng, iterations=KMEANS_ITERATIONS):
+    """Cluster vectors with Lloyd's algorithm, trained on a sample
+
+    Args:
+        row (callable): Function returning the vector of an id
+        ids (sequence): Ids of the vectors to cluster
+
+    Returns:
+        list: Up to count centroids (fewer when there are fewer distinct vectors)
+    """
+    sample = ids if len(ids) <= count * SAMPLE_PER_CENTROID else rng.sample(ids, count * SAMPLE_PER_CENTROID)
+    sample = [row(i) for i in sample]
+    centroids = [list(v) for v in rng.sample(sample, min(count, len(sample)))]
+
+    for _ in range(iterations):
+        sums = [[0.0] * len(centroids[0]) for _ in centroids]
+        counts = [0] * len(centroids)
+        for vector in sample:
+            i = _nearest(vector, centroids)
+            counts[i] += 1
+            sums[i] = [s + v for s, v in zip(sums[i], vector)]
+        # Keep the previous position of centroids that lost all their vectors
+        centroids = [[s / n for s in total] if n else centroid
+                     for total, n, centroid in zip(sums, counts, centroids)]
+
+    return [tuple(centroid) for centroid in centroids]
+
+def _permute_rows(data, order, width):
+    """Reorder the rows of a flat array in place, so row j becomes row order[j]
+
+    Follows the cycles of the permutation, so only one row is copied aside
+    at a time instead of the whole array.
+    """
+    done = bytearray(len(order))
+    for start in range(len(order)):
+        if done[start] or order[start] == start:
+            continue
+        saved = data[start * width:(start + 1) * width]
+        j = start
+        while True:
+            done[j] = 1
+            k = order[j]
+            if k == start:
+                data[j * width:(j + 1) * width] = saved
+                break
+            data[j * width:(j + 1) * width] = data[k * width:(k + 1) * width]
+            j = k
+
+class Index:
+    """Inverted file index of palette feature vectors
+
+    Build one with ``build``, or open a saved one with ``Index.load``.
+    Result ids are the positions of the palettes in the built collection.
+    """
+
+    def __init__(self, centroids, offsets, vectors, ids, colors, color_offsets, dimensions=DIMENSIONS):
+        self.dimensions = dimensions
+        # Flat float32 centroids, list bounds into vectors/ids, flat float32
+        # vectors grouped by list, palette id of each vector, packed 0xRRGGBB
+        # colors of every palette and their bounds by palette id
+        self._centroids = [tuple(centroids[i:i + dimensions]) for i in range(0, len(centroids), dimensions)]
+        self._offsets = offsets
+        self._vectors = vectors
+        self._ids = ids
+        self._colors = colors
+        self._color_offsets = color_offsets
+        self._mmap = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def palette(self, palette_id):
+        """Get an indexed palette
+
+        Args:
+            palette_id (int): Result id
+
+        Returns:
+            list: List of RGB color tuples
+        """
+        start, end = self._color_offsets[palette_id], self._color_offsets[palette_id + 1]
+        return [(c >> 16, (c >> 8) & 0xFF, c & 0xFF) for c in self._colors[start:end]]
+
+    def query(self, palette, k=10, nprobe=DEFAULT_NPROBE):
+        """Find the indexed palettes most similar to a palette
+
+        Args:
+            palette (list): List of RGB color tuples
+            k (int): Number of results
+            nprobe (int): Number of lists scanned; more is slower but finds
+                          the exact neighbours more often
+
+        Returns:
+            list: (palette id, distance) tuples, nearest first
+        """
+        vector = features(palette)
+        dist = math.dist
+        lists = heapq.nsmallest(nprobe, range(len(self._centroids)),
+                                key=lambda i: dist(vector, self._centroids[i]))
+
+        d = self.dimensions
+        vectors, ids, offsets = self._vectors, self._ids, self._offsets
+        candidates = []
+        for i in lists:
+            for j in range(offsets[i], offsets[i + 1]):
+                candidates.append((dist(vector, vectors[j * d:(j + 1) * d]), j))
+
+        return [(ids[j], distance) for distance, j in heapq.nsmallest(k, candidates)]
+
+    def save(self, path):
+        """Write the index to a file that ``Index.load`` can memory-map
+
+        Args:
+            path (str): Output file path
+        """
+        sections = [
+            ("centroids", array('f', [v for centroid in self._centroids for v in centroid])),
+            ("offsets", array('q', self._offsets)),
+            ("vectors", array('f', self._vectors)),
+            ("ids", array('q', self._ids)),
+            ("colors", array('I', self._colors)),
+            ("color_offsets", array('q', self._color_offsets)),
+        ]
+
+        # Sections start at aligned offsets after the header
+        layout = {}
+        position = 0
+        for name, data in sections:
+            layout[name] = [position, data.typecode, len(data)]
+            position += -(-len(data) * data.itemsize // _ALIGNMENT) * _ALIGNMENT
+        header = json.dumps({"version": _VERSION, "dimensions": self.dimensions, "sections": layout}).encode()
+        base = -(-(len(_MAGIC) + 4 + len(header)) // _ALIGNMENT) * _ALIGNMENT
+
+        with open(path, "wb") as f:
+            f.write(_MAGIC + struct.pack("<I", len(header)) + header)
+            for name, data in sections:
+                f.seek(base + layout[name][0])
+                f.write(data.tobytes())
+            f.truncate(base + position)
+
+    @classmethod
+    def load(cls, path):
+        """Open an index saved with ``save`` by memory-mapping it
+
+        Args:
+            path (str): Index file path
+
+        Returns:
+            Index: The index; call ``close`` when done with it
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if mapped[:len(_MAGIC)] != _MAGIC:
+                raise ValueError(f"Not a palette index: {path}")
+            header_size = struct.unpack_from("<I", mapped, len(_MAGIC))[0]
+            start = len(_MAGIC) + 4
+            header = json.loads(mapped[start:start + header_size])
+            if header["version"] != _VERSION:
+                raise ValueError(f"Unsupported palette index version: {header['version']}")
+        except Exception:
+            mapped.close()
+            raise
+
+        base = -(-(start + header_size) // _ALIGNMENT) * _ALIGNMENT
+        view = memoryview(mapped)
+        sections = {}
+        for name, (offset, typecode, length) in header["sections"].items():
+            itemsize = array(typecode).itemsize
+            sections[name] = view[base + offset:base + offset + length * itemsize].cast(typecode)
+
+        index = cls(sections["centroids"], sections["offsets"], sections["vectors"], sections["ids"],
+                    sections["colors"], sections["color_offsets"], header["dimensions"])
+        index._mmap = mapped
+        return index
+
+    def close(self):
+        """Release the memory map of a loaded index"""
+        if self._mmap is not None:
+            self._centroids = []
+            self._offsets = self._vectors = self._ids = self._colors = self._color_offsets = None
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def build(palettes, lists=None, seed=0):
+    """Build an index over a collection of palettes
+
+    Args:
+        palettes (iterable): Palettes (lists of RGB color tuples), e.g. from
+                             any generator; result ids are their positions
+        lists (int): Number of inverted lists (about sqrt(N) if None)
+        seed (int): Seed of the k-means sampling, for reproducible indexes
+
+    Returns:
+        Index: In-memory index
+    """
+    # Features go straight into a flat float32 array: a list of float
+    # objects per palette would take about ten times the memory
+    d = DIMENSIONS
+    vectors = array('f')
+    colors = array('I')
+    color_offsets = array('q', [0])
+    for palette in palettes:
+        vectors.extend(features(palette))
+        colors.extend((r << 16) | (g << 8) | b for r, g, b in palette)
+        color_offsets.append(len(colors))
+    count = len(color_offsets) - 1
+    if not count:
+        raise ValueError("Cannot build an index without palettes")
+
+    # Tuples, which math.dist takes without converting them
+    def row(i):
+        return tuple(vectors[i * d:(i + 1) * d])
+
+    # Two-level quantizer: branch coarse clusters of branch lists each,
+    # so assigning a vector costs 2 * branch distances instead of branch ** 2
+    if lists is None:
+        lists = max(1, round(math.sqrt(count)))
+    branch = max(1, math.ceil(math.sqrt(lists)))
+    rng = random.Random(seed)
+
+    coarse = _kmeans(row, range(count), branch, rng)
+    groups = [array('q') for _ in coarse]
+    for i in range(count):
+        groups[_nearest(row(i), coarse)].append(i)
+
+    # Palette id of each stored vector, grouped by list
+    centroids = []
+    offsets = array('q', [0])
+    ids = array('q')
+    for g, group in enumerate(groups):
+        if not group:
+            continue
+        fine = _kmeans(row, group, branch, rng)
+        assigned = [array('q') for _ in fine]
+        for i in group:
+            assigned[_nearest(row(i), fine)].append(i)
+        groups[g] = None
+        for centroid, members in zip(fine, assigned):
+            if members:
+                centroids.append(centroid)
+                ids.extend(members)
+                offsets.append(len(ids))
+
+    # Group the vectors by list without a second copy of them
+    _permute_rows(vectors, ids, d)
+    flat_centroids = array('f', [v for centroid in centroids for v in centroid])
+
+    return Index(flat_centroids, offsets, vectors, ids, colors, color_offsets)
@@ -0,0 +1,342 @@
+"""Persistent palette library on SQLite
+
+Palettes are stored one row each in the ``palettes`` table, with the
+values queries filter on precomputed in indexed columns: the hue bucket
+and relative luminance of the primary color, and the lowest WCAG contrast
+of any color against white and against black (so "every color passes AA
+on white" is a range condition on one column). Colors are stored as packed
+0xRRGGBB integers in a ``palette_colors`` table clustered by palette, so
+the colors of the matching palettes are read without touching the others.
+
+Inserts are batched: ``add_many`` writes many palettes per transaction
+with ``executemany``, which is orders of magnitude faster than one
+transaction per palette.
+"""
+import os
+import sqlite3
+import time
+from .utils import accessibility, color_conversion
+
+# Hue buckets of the primary color (30 degrees each)
+HUE_BUCKETS = 12
+
+# Primary colors with a lower HSV saturation have no hue bucket
+ACHROMATIC_SATURATION = 0.1
+
+# Palettes written per transaction by add_many
+DEFAULT_BATCH_SIZE = 1000
+
+# Palettes whose colors are fetched with one query when reading results
+_FETCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS palettes (
+    id INTEGER PRIMARY KEY,
+    size INTEGER NOT NULL,
+    primary_rgb INTEGER NOT NULL,
+    hue_bucket INTEGER,
+    luminance REAL NOT NULL,
+    min_contrast_white REAL NOT NULL,
+    min_contrast_black REAL NOT NULL,
+    palette_type TEXT,
+    mood TEXT,
+    source TEXT,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS palette_colors (
+    palette_id INTEGER NOT NULL REFERENCES palettes (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    rgb INTEGER NOT NULL,
+    PRIMARY KEY (palette_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS palettes_hue ON palettes (hue_bucket, luminance);
+CREATE INDEX IF NOT EXISTS palettes_luminance ON palettes (luminance);
+CREATE INDEX IF NOT EXISTS palettes_contrast_white ON palettes (min_contrast_white);
+CREATE INDEX IF NOT EXISTS palettes_contrast_black ON palettes (min_contrast_black);
+CREATE INDEX IF NOT EXISTS palettes_mood ON palettes (mood, min_contrast_white);
+CREATE INDEX IF NOT EXISTS palettes_type ON palettes (palette_type, min_contrast_white);
+"""
+
+_COLUMNS = ("id", "size", "primary_rgb", "hue_bucket", "luminance", "min_contrast_white",
+            "min_contrast_black", "palette_type", "mood", "source", "created")
+
+def default_path():
+    """Get the default library path
+
+    ``COLORMAESTRO_LIBRARY`` overrides the default location under
+    ``XDG_DATA_HOME`` (``~/.local/share`` if unset).
+
+    Returns:
+        str: Database file path (not necessarily existing yet)
+    """
+    path = os.environ.get("COLORMAESTRO_LIBRARY")
+    if path:
+        return path
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "colormaestro", "palettes.db")
+
+def pack(rgb):
+    """Pack an RGB color tuple into a 0xRRGGBB integer"""
+    return (rgb[0] << 16) | (rgb[1] << 8) | rgb[2]
+
+def unpack(value):
+    """Unpack a 0xRRGGBB integer into an RGB color tuple"""
+    return (value >> 16, (value >> 8) & 0xFF, value & 0xFF)
+
+def hue_bucket(rgb):
+    """Get the hue bucket of a color
+
+    Args:
+        rgb (tuple): RGB color tuple
+
+    Returns:
+        int: Bucket from 0 (red) to HUE_BUCKETS - 1, or None for grays
+    """
+    h, s, v = color_conversion.rgb_to_hsv(rgb)
+    if s < ACHROMATIC_SATURATION or v == 0:
+        return None
+    return int(h * HUE_BUCKETS) % HUE_BUCKETS
+
+def _row(palette, palette_type, mood, source, created):
+    """Compute the palettes row of a palette (without its id)"""
+    if not palette:
+        raise ValueError("Cannot store an empty palette")
+    primary = tuple(palette[0])
+    luminances = [accessibility.relative_luminance(color) for color in palette]
+    # The lowest contrast against white is that of the lightest color, and
+    # against black that of the darkest (white and black luminances are 1 and 0)
+    return (
+        len(palette),
+        pack(primary),
+        hue_bucket(primary),
+        luminances[0],
+        1.05 / (max(luminances) + 0.05),
+        (min(luminances) + 0.05) / 0.05,
+        palette_type,
+        mood,
+        source,
+        created,
+    )
+
+class PaletteStore:
+    """Palette library stored in an SQLite database
+
+    Args:
+        path (str): Database file path (created with its directory if
+                    missing), ":memory:" for a temporary library, or None
+                    for ``default_path()``
+    """
+
+    def __init__(self, path=None):
+        path = path or default_path()
+        if path != ":memory:":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # Transactions are managed explicitly by add_many
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """Close the database connection"""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, palette, palette_type=None, mood=None, source=None):
+        """Store a palette
+
+        Args:
+            palette (list): List of RGB color tuples
+            palette_type (str): Palette type it was generated with, if any
+            mood (str): Mood it was generated with, if any
+            source (str): Input it was generated from, if any
+
+        Returns:
+            int: Id of the stored palette
+        """
+        return self.add_many([{"palette": palette, "palette_type": palette_type, "mood": mood,
+                               "source": source}])[0]
+
+    def add_many(self, records, batch_size=DEFAULT_BATCH_SIZE):
+        """Store many palettes, batch_size per transaction
+
+        Args:
+            records (iterable): Palettes (lists of RGB color tuples) or dicts
+                                with a 'palette' and optional 'palette_type',
+                                'mood' and 'source' keys
+            batch_size (int): Palettes written per transaction
+
+        Returns:
+            list: Ids of the stored palettes, in input order
+        """
+        ids = []
+        batch = []
+        for record in records:
+            batch.append(record if isinstance(record, dict) else {"palette": record})
+            if len(batch) >= batch_size:
+                ids.extend(self._insert(batch))
+                batch = []
+        if batch:
+            ids.extend(self._insert(batch))
+        return ids
+
+    def _insert(self, records):
+        """Insert records in a single transaction"""
+        created = time.time()
+        rows = [_row(record["palette"], record.get("palette_type"), record.get("mood"),
+                     record.get("source"), created) for record in records]
+
+        conn = self._conn
+        # Take the write lock before reading the next id, so concurrent
+        # writers cannot hand out the same ids
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            first = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM palettes").fetchone()[0]
+            ids = range(first, first + len(rows))
+            conn.executemany(f"INSERT INTO palettes ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                             [(palette_id,) + row for palette_id, row in zip(ids, rows)])
+            conn.executemany("INSERT INTO palette_colors (palette_id, position, rgb) VALUES (?, ?, ?)",
+                             [(palette_id, position, pack(color))
+                              for palette_id, record in zip(ids, records)
+                              for position, color in enumerate(record["palette"])])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return list(ids)
+
+    def delete(self, palette_id):
+        """Remove a palette
+
+        Returns:
+            bool: Whether the palette existed
+        """
+        with self._conn:
+            cursor = self._conn.execute("DELETE FROM palettes WHERE id = ?", (palette_id,))
+        return cursor.rowcount > 0
+
+    def get(self, palette_id):
+        """Get a stored palette record
+
+        Args:
+            palette_id (int): Palette id
+
+        Returns:
+            dict: Record (see ``query``), or None if there is no such palette
+        """
+        cursor = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM palettes WHERE id = ?", (palette_id,))
+        return next(self._records(cursor), None)
+
+    def _where(self, mood=None, palette_type=None, min_colors=None, max_colors=None, hue=None,
+               min_luminance=None, max_luminance=None, min_contrast_white=None, min_contrast_black=None):
+        """Build the WHERE clause and parameters of the query filters"""
+        conditions = []
+        params = []
+        if mood is not None:
+            conditions.append("mood = ?")
+            params.append(mood)
+        if palette_type is not None:
+            conditions.append("palette_type = ?")
+            params.append(palette_type)
+        if min_colors is not None:
+            conditions.append("size >= ?")
+            params.append(min_colors)
+        if max_colors is not None:
+            conditions.append("size <= ?")
+            params.append(max_colors)
+        if hue is not None:
+            conditions.append("hue_bucket = ?")
+            params.append(int(hue % 360 / 360 * HUE_BUCKETS))
+        if min_luminance is not None:
+            conditions.append("luminance >= ?")
+            params.append(min_luminance)
+        if max_luminance is not None:
+            conditions.append("luminance <= ?")
+            params.append(max_luminance)
+        if min_contrast_white is not None:
+            conditions.append("min_contrast_white >= ?")
+            params.append(min_contrast_white)
+        if min_contrast_black is not None:
+            conditions.append("min_contrast_black >= ?")
+            params.append(min_contrast_black)
+
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    def query(self, limit=None, **filters):
+        """Find stored palettes
+
+        Filters on the primary color, the mood, the type and the contrast
+        are served by indexes; a query like
+        ``query(mood="calm", min_colors=5, min_contrast_white=4.5)`` (calm
+        palettes of at least five colors that all pass AA on white) only
+        reads the rows of one index range.
+
+        Args:
+            limit (int): Maximum number of results
+            **filters: Any of mood, palette_type, min_colors, max_colors,
+                       hue (degrees; matches the hue bucket of the primary
+                       color), min_luminance and max_luminance (of the
+                       primary color, 0-1), min_contrast_white and
+                       min_contrast_black (lowest ratio of any color)
+
+        Yields:
+            dict: Records with 'id', 'palette' (list of RGB color tuples),
+                  'palette_type', 'mood', 'source', 'created', 'hue_bucket',
+                  'luminance', 'min_contrast_white' and 'min_contrast_black',
+                  in the order of the index serving the query
+        """
+        sql, params = self._select(limit, filters)
+        yield from self._records(self._conn.execute(sql, params))
+
+    def count(self, **filters):
+        """Count the stored palettes matching the query filters"""
+        where, params = self._where(**filters)
+        return self._conn.execute(f"SELECT COUNT(*) FROM palettes{where}", params).fetchone()[0]
+
+    def explain(self, limit=None, **filters):
+        """Get the SQLite query plan of a query
+
+        Returns:
+            list: Plan details, e.g. ['SEARCH palettes USING INDEX palettes_mood (mood=? AND min_contrast_white>?)']
+        """
+        sql, params = self._select(limit, filters)
+        return [row[-1] for row in self._conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+    def _select(self, limit, filters):
+        """Build the SELECT statement of a query"""
+        where, params = self._where(**filters)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM palettes{where}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def _records(self, cursor):
+        """Turn palettes rows into records, fetching their colors in batches"""
+        while True:
+            rows = cursor.fetchmany(_FETCH_SIZE)
+            if not rows:
+                return
+
+            colors = {}
+            placeholders = ", ".join("?" * len(rows))
+            for palette_id, rgb in self._conn.execute(
+                    f"SELECT palette_id, rgb FROM palette_colors WHERE palette_id IN ({placeholders})"
+                    " ORDER BY palette_id, position", [row[0] for row in rows]):
+                colors.setdefault(palette_id, []).append(unpack(rgb))
+
+            for row in rows:
+                record = dict(zip(_COLUMNS, row))
+                del record["size"], record["primary_rgb"]
+                record["palette"] = colors.get(record["id"], [])
+                yield record
@@ -1,3 +1,7 @@
 # Import utilities for easier access from other modules
 from . import color_conversion
 from . import accessibility
+from . import fileio
+from . import color_spaces
+from . import color_difference
+from . import cvd
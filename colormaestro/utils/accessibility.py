@@ -1,3 +1,301 @@
+import math
+from array import array
+from functools import lru_cache
+from . import color_spaces
+
+# Contrast thresholds per level: WCAG 2 ratios and APCA lightness contrast
+# (|Lc|) for text and non-text elements
+WCAG_LEVELS = {"AA": 4.5, "AAA": 7.0, "AA-large": 3.0}
+APCA_LEVELS = {"body": 75, "content": 60, "large": 45, "non-text": 30}
+
+METRICS = ["wcag", "apca"]
+
+def _channel_tables(decode, coefficients):
+    """Tabulate the weighted luminance contribution of each 8-bit value per channel"""
+    decoded = [decode(i / 255.0) for i in range(256)]
+    return tuple(tuple(k * c for c in decoded) for k in coefficients)
+
+def _wcag_decode(c):
+    return c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4
+
+def _apca_decode(c):
+    return c ** 2.4
+
+_WCAG_COEFFICIENTS = (0.2126, 0.7152, 0.0722)
+_APCA_COEFFICIENTS = (0.2126729, 0.7151522, 0.0721750)
+
+# WCAG 2 relative luminance (piecewise sRGB decoding)
+_WCAG_TABLES = _channel_tables(_wcag_decode, _WCAG_COEFFICIENTS)
+
+# APCA 0.0.98G screen luminance (simple 2.4 exponent)
+_APCA_TABLES = _channel_tables(_apca_decode, _APCA_COEFFICIENTS)
+
+# APCA constants
+_APCA_BLACK_THRESHOLD = 0.022
+_APCA_BLACK_CLAMP = 1.414
+_APCA_DELTA_Y_MIN = 0.0005
+_APCA_SCALE = 1.14
+_APCA_OFFSET = 0.027
+_APCA_LOW_CLIP = 0.1
+# Exponents for dark text on light backgrounds and light text on dark ones
+_APCA_NORMAL_BG, _APCA_NORMAL_TEXT = 0.56, 0.57
+_APCA_REVERSE_BG, _APCA_REVERSE_TEXT = 0.65, 0.62
+
+# Bisection steps on OKLCH lightness when suggesting compliant colors:
+# 2^-10 is below the lightness difference between neighbouring 8-bit colors
+_LIGHTNESS_STEPS = 10
+
+def relative_luminance(rgb):
+    """Calculate the WCAG relative luminance of a color
+
+    Integer components are looked up in tables; float components (and
+    any outside 0-255) go through the WCAG formula.
+
+    Args:
+        rgb (tuple): RGB color tuple (0-255, 0-255, 0-255)
+
+    Returns:
+        float: Relative luminance (0-1)
+    """
+    r, g, b = rgb
+    if type(r) is int and type(g) is int and type(b) is int and 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255:
+        tr, tg, tb = _WCAG_TABLES
+        return tr[r] + tg[g] + tb[b]
+    # Float (or out of range) components are decoded directly
+    return sum(k * _wcag_decode(c / 255.0) for k, c in zip(_WCAG_COEFFICIENTS, rgb))
+
+def apca_luminance(rgb):
+    """Calculate the APCA screen luminance of a color, soft-clamped near black
+
+    Args:
+        rgb (tuple): RGB color tuple (0-255, 0-255, 0-255; floats allowed)
+
+    Returns:
+        float: Luminance (0-1)
+    """
+    r, g, b = rgb
+    if type(r) is int and type(g) is int and type(b) is int and 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255:
+        tr, tg, tb = _APCA_TABLES
+        y = tr[r] + tg[g] + tb[b]
+    elif all(0 <= c <= 255 for c in rgb):
+        y = sum(k * _apca_decode(c / 255.0) for k, c in zip(_APCA_COEFFICIENTS, rgb))
+    else:
+        raise ValueError(f"RGB components must be between 0 and 255: {tuple(rgb)}")
+    if y < _APCA_BLACK_THRESHOLD:
+        y += (_APCA_BLACK_THRESHOLD - y) ** _APCA_BLACK_CLAMP
+    return y
+
+def _compute_apca_terms(rgb):
+    """Get the luminance of a color and its powers used by APCA as text and as background"""
+    y = apca_luminance(rgb)
+    return (y, y ** _APCA_NORMAL_TEXT, y ** _APCA_REVERSE_TEXT, y ** _APCA_NORMAL_BG, y ** _APCA_REVERSE_BG)
+
+# Cached, as audits check the same few text and background colors many times
+_cached_apca_terms = lru_cache(maxsize=4096)(_compute_apca_terms)
+
+def _apca_terms(rgb):
+    """Get the APCA terms of a color, cached for hashable colors (tuples)"""
+    try:
+        return _cached_apca_terms(rgb)
+    except TypeError:
+        return _compute_apca_terms(rgb)
+
+def _apca_from_terms(text, background):
+    """Calculate Lc from the precomputed terms of a text and a background color"""
+    y_text, normal_text, reverse_text, _, _ = text
+    y_background, _, _, normal_background, reverse_background = background
+
+    if abs(y_background - y_text) < _APCA_DELTA_Y_MIN:
+        return 0.0
+    if y_background > y_text:
+        # Dark text on a light background: positive Lc
+        sapc = (normal_background - normal_text) * _APCA_SCALE
+        return 0.0 if sapc < _APCA_LOW_CLIP else (sapc - _APCA_OFFSET) * 100
+    # Light text on a dark background: negative Lc
+    sapc = (reverse_background - reverse_text) * _APCA_SCALE
+    return 0.0 if sapc > -_APCA_LOW_CLIP else (sapc + _APCA_OFFSET) * 100
+
+def apca_contrast(text, background):
+    """Calculate the APCA lightness contrast (Lc) of text on a background
+
+    APCA is polarity dependent: dark text on a light background gives a
+    positive Lc (up to about 106), light text on a dark background a
+    negative one (down to about -108).
+
+    Args:
+        text (tuple): RGB color tuple of the text
+        background (tuple): RGB color tuple of the background
+
+    Returns:
+        float: Lc value
+    """
+    return _apca_from_terms(_apca_terms(text), _apca_terms(background))
+
+def calculate_contrast(color1, color2, metric="wcag"):
+    """Calculate the contrast between two colors with either metric
+
+    Args:
+        color1 (tuple): RGB color tuple
+        color2 (tuple): RGB color tuple
+        metric (str): 'wcag' for the WCAG 2 ratio, or 'apca' for the smaller
+                      |Lc| of either color as text on the other (so it
+                      holds whichever color is the text)
+
+    Returns:
+        float: Contrast ratio (wcag) or |Lc| (apca)
+    """
+    if metric == "wcag":
+        return calculate_contrast_ratio(color1, color2)
+    elif metric == "apca":
+        terms1, terms2 = _apca_terms(color1), _apca_terms(color2)
+        return min(abs(_apca_from_terms(terms1, terms2)), abs(_apca_from_terms(terms2, terms1)))
+    raise ValueError(f"Unknown contrast metric: {metric}. Valid options are: {', '.join(METRICS)}")
+
+def contrast_matrix(foregrounds, backgrounds, metric="wcag"):
+    """Calculate the contrast of every foreground on every background
+
+    Luminances are looked up once per color, so each of the N x M pairs
+    only costs a few arithmetic operations.
+
+    Args:
+        foregrounds (list): RGB color tuples (text or UI elements)
+        backgrounds (list): RGB color tuples
+        metric (str): 'wcag' (ratios) or 'apca' (signed Lc of the
+                      foreground as text on the background)
+
+    Returns:
+        list: One array('d') row per foreground, one value per background
+    """
+    if metric == "wcag":
+        fg = [relative_luminance(color) + 0.05 for color in foregrounds]
+        bg = [relative_luminance(color) + 0.05 for color in backgrounds]
+        return [array('d', [f / b if f > b else b / f for b in bg]) for f in fg]
+    elif metric == "apca":
+        fg = [_apca_terms(color) for color in foregrounds]
+        bg = [_apca_terms(color) for color in backgrounds]
+        return [array('d', [_apca_from_terms(f, b) for b in bg]) for f in fg]
+    raise ValueError(f"Unknown contrast metric: {metric}. Valid options are: {', '.join(METRICS)}")
+
+def check_pairs(foregrounds, backgrounds, wcag_level="AA", apca_level="content"):
+    """Check every foreground/background pair against both metrics
+
+    Args:
+        foregrounds (list): RGB color tuples (text or UI elements)
+        backgrounds (list): RGB color tuples
+        wcag_level (str): Key of WCAG_LEVELS the ratio must reach
+        apca_level (str): Key of APCA_LEVELS |Lc| must reach
+
+    Yields:
+        dict: One result per pair, row by row, with 'foreground' and
+              'background' indices, 'ratio', 'lc', 'wcag' and 'apca'
+              (whether each metric passes)
+    """
+    wcag_threshold = WCAG_LEVELS[wcag_level]
+    apca_threshold = APCA_LEVELS[apca_level]
+    ratios = contrast_matrix(foregrounds, backgrounds, "wcag")
+    lcs = contrast_matrix(foregrounds, backgrounds, "apca")
+
+    for i, (ratio_row, lc_row) in enumerate(zip(ratios, lcs)):
+        for j, (ratio, lc) in enumerate(zip(ratio_row, lc_row)):
+            yield {
+                "foreground": i,
+                "background": j,
+                "ratio": ratio,
+                "lc": lc,
+                "wcag": ratio >= wcag_threshold,
+                "apca": abs(lc) >= apca_threshold,
+            }
+
+@lru_cache(maxsize=65536)
+def _nearest_compliant(color, background, threshold):
+    """Find the closest color reaching a contrast ratio, with its OKLab distance"""
+    bg = relative_luminance(background) + 0.05
+
+    def passes(rgb):
+        f = relative_luminance(rgb) + 0.05
+        return (f / bg if f > bg else bg / f) >= threshold
+
+    if passes(color):
+        return color, 0.0
+
+    (L, C, h), = color_spaces.rgb_to_oklch([color])
+    origin, = color_spaces.rgb_to_oklab([color])
+    best = None
+    # Darkening and lightening: the ratio grows as the lightness moves away
+    # from the background, so bisect between the color (failing) and black
+    # or white (passing, if anything in that direction does)
+    for end, extreme in ((0.0, (0, 0, 0)), (1.0, (255, 255, 255))):
+        if not passes(extreme):
+            continue
+        low, high, found = L, end, extreme
+        for _ in range(_LIGHTNESS_STEPS):
+            middle = (low + high) / 2
+            rgb, = color_spaces.oklch_to_rgb([(middle, C, h)])
+            if passes(rgb):
+                high, found = middle, rgb
+            else:
+                low = middle
+        distance = math.dist(origin, color_spaces.rgb_to_oklab([found])[0])
+        if best is None or distance < best[1]:
+            best = (found, distance)
+    return best
+
+def nearest_compliant_color(color, background, level="AA"):
+    """Find the closest color that reaches a WCAG level on a background
+
+    Only the OKLCH lightness of the color changes (chroma is reduced only
+    where the sRGB gamut requires it), so the hue is kept. The lightness is
+    found by bisection, darkening or lightening, whichever ends closer to
+    the original color in OKLab.
+
+    Args:
+        color (tuple): RGB color tuple to adjust
+        background (tuple): RGB color tuple it must contrast with
+        level (str): Key of WCAG_LEVELS the ratio must reach
+
+    Returns:
+        tuple: RGB color tuple (the color itself if it already passes), or
+               None if no lightness reaches the level on this background
+    """
+    found = _nearest_compliant(tuple(color), tuple(background), WCAG_LEVELS[level])
+    return found and found[0]
+
+def suggest_fixes(foregrounds, backgrounds, level="AA"):
+    """Suggest the closest passing foreground for every failing pair
+
+    Pairs are checked in one pass with ``contrast_matrix`` and solutions
+    are cached, so token sets with repeated colors are solved once per
+    distinct pair.
+
+    Args:
+        foregrounds (list): RGB color tuples (text or UI elements)
+        backgrounds (list): RGB color tuples
+        level (str): Key of WCAG_LEVELS the ratio must reach
+
+    Yields:
+        dict: One result per failing pair, row by row, with 'foreground'
+              and 'background' indices, 'ratio', 'suggestion' (RGB tuple,
+              None if the level cannot be reached), 'suggestion_ratio' and
+              'difference' (OKLab distance to the original foreground)
+    """
+    threshold = WCAG_LEVELS[level]
+    ratios = contrast_matrix(foregrounds, backgrounds, "wcag")
+
+    for i, row in enumerate(ratios):
+        for j, ratio in enumerate(row):
+            if ratio >= threshold:
+                continue
+            found = _nearest_compliant(tuple(foregrounds[i]), tuple(backgrounds[j]), threshold)
+            suggestion, difference = found or (None, None)
+            yield {
+                "foreground": i,
+                "background": j,
+                "ratio": ratio,
+                "suggestion": suggestion,
+                "suggestion_ratio": suggestion and calculate_contrast_ratio(suggestion, backgrounds[j]),
+                "difference": difference,
+            }
+
 def calculate_contrast_ratio(color1, color2):
     """Calculate WCAG contrast ratio between two colors.
 
@@ -8,24 +306,9 @@ def calculate_contrast_ratio(color1, color2):
     Returns:
         float: Contrast ratio (1:1 to 21:1)
     """
-    # Calculate relative luminance for each color
-    def get_luminance(rgb):
-        # Convert RGB to sRGB
-        srgb = [x / 255.0 for x in rgb]
-
-        # Apply transformations
-        for i in range(3):
-            if srgb[i] <= 0.03928:
-                srgb[i] = srgb[i] / 12.92
-            else:
-                srgb[i] = ((srgb[i] + 0.055) / 1.055) ** 2.4
-
-        # Calculate luminance
-        return 0.2126 * srgb[0] + 0.7152 * srgb[1] + 0.0722 * srgb[2]
-
     # Get luminance values
-    l1 = get_luminance(color1)
-    l2 = get_luminance(color2)
+    l1 = relative_luminance(color1)
+    l2 = relative_luminance(color2)
 
     # Calculate contrast ratio
     if l1 > l2:
@@ -33,37 +316,49 @@ def calculate_contrast_ratio(color1, color2):
     else:
         return (l2 + 0.05) / (l1 + 0.05)
 
-def check_contrast(palette):
+def _color_name(index):
+    """Get the display name of the palette color at index"""
+    if index == 0:
+        return "Primary"
+    elif index == 1:
+        return "Secondary"
+    elif index == 2:
+        return "Accent"
+    return f"Color {index+1}"
+
+def check_contrast(palette, apca_level="content"):
     """Check contrast ratios between colors in the palette
 
     Args:
         palette (list): List of RGB color tuples
+        apca_level (str): Key of APCA_LEVELS the APCA check must reach
 
     Returns:
-        dict: Dictionary with contrast check results
+        dict: Dictionary with contrast check results. Each text check has
+              a 'suggestion': None if it passes AA, otherwise the nearest
+              color (by ``nearest_compliant_color``) on which it does
     """
     results = {}
+    apca_threshold = APCA_LEVELS[apca_level]
 
     # Check contrast with white and black (for text)
     white = (255, 255, 255)
     black = (0, 0, 0)
 
+    # Both metrics from one luminance lookup per color
+    white_ratios, black_ratios = contrast_matrix([white, black], palette, "wcag")
+    white_lcs, black_lcs = contrast_matrix([white, black], palette, "apca")
+
     for i, color in enumerate(palette):
-        color_name = f"Color {i+1}"
-        if i == 0:
-            color_name = "Primary"
-        elif i == 1:
-            color_name = "Secondary"
-        elif i == 2:
-            color_name = "Accent"
+        color_name = _color_name(i)
 
         # Check with white
-        white_ratio = calculate_contrast_ratio(color, white)
+        white_ratio = white_ratios[i]
         white_aa = white_ratio >= 4.5
         white_aaa = white_ratio >= 7.0
 
         # Check with black
-        black_ratio = calculate_contrast_ratio(color, black)
+        black_ratio = black_ratios[i]
         black_aa = black_ratio >= 4.5
         black_aaa = black_ratio >= 7.0
 
@@ -71,17 +366,30 @@ def check_contrast(palette):
             "white_text": {
                 "ratio": round(white_ratio, 2),
                 "AA": white_aa,
-                "AAA": white_aaa
+                "AAA": white_aaa,
+                "lc": round(white_lcs[i], 1),
+                "APCA": abs(white_lcs[i]) >= apca_threshold,
+                "suggestion": None if white_aa else nearest_compliant_color(color, white)
             },
             "black_text": {
                 "ratio": round(black_ratio, 2),
                 "AA": black_aa,
-                "AAA": black_aaa
+                "AAA": black_aaa,
+                "lc": round(black_lcs[i], 1),
+                "APCA": abs(black_lcs[i]) >= apca_threshold,
+                "suggestion": None if black_aa else nearest_compliant_color(color, black)
             }
         }
 
     return results
 
+def _suggestion_note(check, text):
+    """Describe the nearest color on which a failing text color would pass"""
+    suggestion = check.get("suggestion")
+    if not suggestion:
+        return ""
+    return f", or RGB{suggestion} for {text} text"
+
 def display_results(results):
     """Display accessibility check results in the terminal
 
@@ -102,8 +410,10 @@ def display_results(results):
 
         aa_status = click.style("PASS", fg="green") if white_aa else click.style("FAIL", fg="red")
         aaa_status = click.style("PASS", fg="green") if white_aaa else click.style("FAIL", fg="red")
+        apca_status = click.style("PASS", fg="green") if checks["white_text"]["APCA"] else click.style("FAIL", fg="red")
 
-        click.echo(f"  White text - Ratio: {white_ratio}:1  AA: {aa_status}  AAA: {aaa_status}")
+        click.echo(f"  White text - Ratio: {white_ratio}:1  AA: {aa_status}  AAA: {aaa_status}  "
+                   f"APCA Lc {checks['white_text']['lc']}: {apca_status}")
 
         # Black text check
         black_ratio = checks["black_text"]["ratio"]
@@ -112,16 +422,56 @@ def display_results(results):
 
         aa_status = click.style("PASS", fg="green") if black_aa else click.style("FAIL", fg="red")
         aaa_status = click.style("PASS", fg="green") if black_aaa else click.style("FAIL", fg="red")
+        apca_status = click.style("PASS", fg="green") if checks["black_text"]["APCA"] else click.style("FAIL", fg="red")
 
-        click.echo(f"  Black text - Ratio: {black_ratio}:1  AA: {aa_status}  AAA: {aaa_status}")
+        click.echo(f"  Black text - Ratio: {black_ratio}:1  AA: {aa_status}  AAA: {aaa_status}  "
+                   f"APCA Lc {checks['black_text']['lc']}: {apca_status}")
 
     click.echo("\nRecommendation:")
     for color_name, checks in results.items():
         if checks["white_text"]["AA"] and not checks["black_text"]["AA"]:
-            click.echo(f"  {color_name}: Use white text")
+            click.echo(f"  {color_name}: Use white text{_suggestion_note(checks['black_text'], 'black')}")
         elif checks["black_text"]["AA"] and not checks["white_text"]["AA"]:
-            click.echo(f"  {color_name}: Use black text")
+            click.echo(f"  {color_name}: Use black text{_suggestion_note(checks['white_text'], 'white')}")
         elif checks["white_text"]["ratio"] > checks["black_text"]["ratio"]:
             click.echo(f"  {color_name}: White text preferred (higher contrast)")
         else:
             click.echo(f"  {color_name}: Black text preferred (higher contrast)")
+
+def display_near_duplicates(palette, metric="ciede2000"):
+    """Warn about palette colors that are too similar to tell apart
+
+    Args:
+        palette (list): List of RGB color tuples
+        metric (str): Color difference metric ('ciede2000' or 'oklab')
+    """
+    import click
+    from .color_difference import near_duplicates
+
+    pairs = near_duplicates(palette, metric=metric)
+    if not pairs:
+        return
+
+    click.echo("\nNearly identical colors:")
+    for i, j, difference in pairs:
+        click.echo(f"  {_color_name(i)} and {_color_name(j)}: ΔE {difference:.2f}")
+
+def display_color_vision(palette, metric="ciede2000"):
+    """Show how distinguishable the palette colors stay with color vision deficiencies
+
+    Args:
+        palette (list): List of RGB color tuples
+        metric (str): Color difference metric ('ciede2000' or 'oklab')
+    """
+    import click
+    from .cvd import distinguishability
+
+    if len(palette) < 2:
+        return
+
+    click.echo("\nColor Vision Deficiency Check (closest colors after simulation):")
+    for name, result in distinguishability(palette, metric=metric).items():
+        i, j = result["pair"]
+        status = click.style("FAIL", fg="red") if result["confusable"] else click.style("PASS", fg="green")
+        click.echo(f"  {name.capitalize()}: {_color_name(i)} and {_color_name(j)}, "
+                   f"ΔE {result['min_difference']:.2f}  {status}")
@@ -1,3 +1,5 @@
+from . import accessibility
+
 def calculate_contrast_ratio(color1, color2):
     """Calculate the contrast ratio between two colors according to WCAG 2.0
 
@@ -27,16 +29,8 @@ def calculate_relative_luminance(rgb):
     Returns:
         float: Relative luminance (0 to 1)
     """
-    # Normalize RGB values to 0-1 range
-    r, g, b = rgb[0] / 255.0, rgb[1] / 255.0, rgb[2] / 255.0
-
-    # Convert to sRGB
-    r = r / 12.92 if r <= 0.03928 else ((r + 0.055) / 1.055) ** 2.4
-    g = g / 12.92 if g <= 0.03928 else ((g + 0.055) / 1.055) ** 2.4
-    b = b / 12.92 if b <= 0.03928 else ((b + 0.055) / 1.055) ** 2.4
-
-    # Calculate luminance
-    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+    # Shares the per-channel lookup tables of the accessibility module
+    return accessibility.relative_luminance(rgb)
 
 def check_contrast(palette):
     """Check contrast between all color pairs in a palette
@@ -45,7 +39,9 @@ def check_contrast(palette):
         palette (list): List of RGB color tuples
 
     Returns:
-        list: List of dictionaries with contrast information for each pair
+        list: List of dictionaries with contrast information for each pair,
+              with the WCAG 2 ratio and the APCA contrast (the smaller |Lc|
+              of either color as text on the other)
     """
     results = []
 
@@ -56,13 +52,16 @@ def check_contrast(palette):
                 ratio = calculate_contrast_ratio(color1, color2)
                 passes_aa = ratio >= 4.5  # AA standard for normal text
                 passes_aaa = ratio >= 7.0  # AAA standard for normal text
+                lc = accessibility.calculate_contrast(color1, color2, "apca")
 
                 results.append({
                     'color1': color1,
                     'color2': color2,
                     'ratio': round(ratio, 2),
                     'passes_aa': passes_aa,
-                    'passes_aaa': passes_aaa
+                    'passes_aaa': passes_aaa,
+                    'apca': round(lc, 1),
+                    'passes_apca': lc >= accessibility.APCA_LEVELS["content"]
                 })
 
     return results
@@ -87,7 +86,7 @@ def display_results(results):
         status = "✓✓" if passes_aaa else "✓" if passes_aa else "✗"
 
         print(f"Colors: RGB{c1} vs RGB{c2}")
-        print(f"Ratio: {ratio}:1  Status: {status}")
+        print(f"Ratio: {ratio}:1  Status: {status}  APCA: Lc {result['apca']}")
         if not passes_aa:
             print("⚠️ Does not pass WCAG AA standard (4.5:1)")
         elif not passes_aaa:
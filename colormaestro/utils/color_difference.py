@@ -0,0 +1,223 @@
+"""Perceptual color differences (ΔE) between many colors at once
+
+Two metrics are supported: 'ciede2000' (ΔE2000 on CIELAB, where about 1.0
+is a just noticeable difference) and 'oklab' (Euclidean distance in OKLab,
+where about 0.02 is). Colors are converted once per call with the batch
+conversions of ``color_spaces``; distances are returned as compact
+``array('d')`` rows, and pairwise distances can be streamed in chunks so
+memory stays bounded however many colors are compared.
+"""
+import math
+from array import array
+from . import color_spaces
+
+# Differences below which two colors look the same, per metric
+JND = {"ciede2000": 1.0, "oklab": 0.02}
+
+METRICS = list(JND)
+
+# Approximate number of distances per chunk yielded by iter_pdist
+DEFAULT_CHUNK_SIZE = 65536
+
+_POW25_7 = 25.0 ** 7
+
+def _oklab_row(ref, labs):
+    """ΔE-OK from one OKLab color to a list of OKLab colors"""
+    dist = math.dist
+    return array('d', [dist(ref, lab) for lab in labs])
+
+def _ciede2000_row(ref, labs):
+    """ΔE2000 from one CIELAB color to a list of CIELAB colors (Sharma et al. 2005)"""
+    sqrt, hypot, atan2, sin, cos, exp = math.sqrt, math.hypot, math.atan2, math.sin, math.cos, math.exp
+    degrees, radians = math.degrees, math.radians
+    pow25_7 = _POW25_7
+
+    L1, a1, b1 = ref
+    C1 = hypot(a1, b1)
+
+    row = array('d', bytes(8 * len(labs)))
+    for i, (L2, a2, b2) in enumerate(labs):
+        C_mean = (C1 + hypot(a2, b2)) / 2
+        C_mean7 = C_mean ** 7
+        G = 0.5 * (1 - sqrt(C_mean7 / (C_mean7 + pow25_7)))
+        a1p, a2p = (1 + G) * a1, (1 + G) * a2
+        C1p, C2p = hypot(a1p, b1), hypot(a2p, b2)
+        h1p = degrees(atan2(b1, a1p)) % 360 if C1p else 0.0
+        h2p = degrees(atan2(b2, a2p)) % 360 if C2p else 0.0
+
+        dL = L2 - L1
+        dC = C2p - C1p
+        if C1p * C2p == 0:
+            dh = 0.0
+            h_mean = h1p + h2p
+        else:
+            dh = h2p - h1p
+            if dh > 180:
+                dh -= 360
+            elif dh < -180:
+                dh += 360
+            h_sum = h1p + h2p
+            if abs(h1p - h2p) <= 180:
+                h_mean = h_sum / 2
+            elif h_sum < 360:
+                h_mean = (h_sum + 360) / 2
+            else:
+                h_mean = (h_sum - 360) / 2
+        dH = 2 * sqrt(C1p * C2p) * sin(radians(dh) / 2)
+
+        L_mean = (L1 + L2) / 2
+        Cp_mean = (C1p + C2p) / 2
+        T = (1 - 0.17 * cos(radians(h_mean - 30)) + 0.24 * cos(radians(2 * h_mean))
+             + 0.32 * cos(radians(3 * h_mean + 6)) - 0.20 * cos(radians(4 * h_mean - 63)))
+        d_theta = 30 * exp(-((h_mean - 275) / 25) ** 2)
+        Cp_mean7 = Cp_mean ** 7
+        R_C = 2 * sqrt(Cp_mean7 / (Cp_mean7 + pow25_7))
+        L_offset = (L_mean - 50) ** 2
+        S_L = 1 + 0.015 * L_offset / sqrt(20 + L_offset)
+        S_C = 1 + 0.045 * Cp_mean
+        S_H = 1 + 0.015 * Cp_mean * T
+        R_T = -sin(radians(2 * d_theta)) * R_C
+
+        dL, dC, dH = dL / S_L, dC / S_C, dH / S_H
+        row[i] = sqrt(max(0.0, dL * dL + dC * dC + dH * dH + R_T * dC * dH))
+    return row
+
+# Metric name to (conversion from sRGB, one-to-many kernel)
+_KERNELS = {
+    "ciede2000": (color_spaces.rgb_to_lab, _ciede2000_row),
+    "oklab": (color_spaces.rgb_to_oklab, _oklab_row),
+}
+
+def _kernel(metric):
+    try:
+        return _KERNELS[metric]
+    except KeyError:
+        raise ValueError(f"Unknown color difference metric: {metric}. Valid options are: {', '.join(METRICS)}")
+
+def delta_e(color1, color2, metric="ciede2000"):
+    """Calculate the perceptual difference between two colors
+
+    Args:
+        color1 (tuple): RGB color tuple (0-255, 0-255, 0-255)
+        color2 (tuple): RGB color tuple (0-255, 0-255, 0-255)
+        metric (str): 'ciede2000' or 'oklab'
+
+    Returns:
+        float: Color difference (0 for identical colors)
+    """
+    convert, row = _kernel(metric)
+    lab1, lab2 = convert([color1, color2])
+    return row(lab1, [lab2])[0]
+
+def one_to_many(color, colors, metric="ciede2000"):
+    """Calculate the differences between a color and each of a list of colors
+
+    Args:
+        color (tuple): RGB color tuple (0-255, 0-255, 0-255)
+        colors (list): List of RGB color tuples
+        metric (str): 'ciede2000' or 'oklab'
+
+    Returns:
+        array: Differences, in the order of colors
+    """
+    convert, row = _kernel(metric)
+    return row(convert([color])[0], convert(colors))
+
+def iter_cdist(colors_a, colors_b, metric="ciede2000"):
+    """Stream the differences between every color of two lists, row by row
+
+    Args:
+        colors_a (iterable): RGB color tuples (rows)
+        colors_b (list): List of RGB color tuples (columns)
+        metric (str): 'ciede2000' or 'oklab'
+
+    Yields:
+        array: Differences from one color of colors_a to every color of colors_b
+    """
+    convert, row = _kernel(metric)
+    labs_b = convert(colors_b)
+    for lab in convert(colors_a):
+        yield row(lab, labs_b)
+
+def cdist(colors_a, colors_b, metric="ciede2000"):
+    """Calculate the matrix of differences between every color of two lists
+
+    Args:
+        colors_a (list): List of RGB color tuples (rows)
+        colors_b (list): List of RGB color tuples (columns)
+        metric (str): 'ciede2000' or 'oklab'
+
+    Returns:
+        list: One array of differences per color of colors_a
+    """
+    return list(iter_cdist(colors_a, colors_b, metric))
+
+def iter_pdist(colors, metric="ciede2000", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream the condensed pairwise differences of a list of colors
+
+    The condensed form holds the upper triangle of the distance matrix
+    row by row: (0, 1), (0, 2), ... (0, n-1), (1, 2), ... (n-2, n-1).
+
+    Args:
+        colors (list): List of RGB color tuples
+        metric (str): 'ciede2000' or 'oklab'
+        chunk_size (int): Approximate number of differences per chunk
+                          (chunks always hold whole rows)
+
+    Yields:
+        array: Consecutive chunks of the condensed differences
+    """
+    convert, row = _kernel(metric)
+    labs = convert(colors)
+
+    chunk = array('d')
+    for i in range(len(labs) - 1):
+        chunk.extend(row(labs[i], labs[i + 1:]))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = array('d')
+    if chunk:
+        yield chunk
+
+def pdist(colors, metric="ciede2000"):
+    """Calculate the condensed pairwise differences of a list of colors
+
+    Args:
+        colors (list): List of RGB color tuples
+        metric (str): 'ciede2000' or 'oklab'
+
+    Returns:
+        array: n * (n - 1) / 2 differences in condensed order (see ``iter_pdist``)
+    """
+    result = array('d')
+    for chunk in iter_pdist(colors, metric):
+        result.extend(chunk)
+    return result
+
+def near_duplicates(colors, threshold=None, metric="ciede2000"):
+    """Find pairs of colors that are (nearly) indistinguishable
+
+    Args:
+        colors (list): List of RGB color tuples
+        threshold (float): Differences below this are reported (JND of the metric if None)
+        metric (str): 'ciede2000' or 'oklab'
+
+    Returns:
+        list: (i, j, difference) tuples with i < j, in condensed order
+    """
+    _kernel(metric)
+    if threshold is None:
+        threshold = JND[metric]
+
+    pairs = []
+    n = len(colors)
+    i, j = 0, 1
+    for chunk in iter_pdist(colors, metric):
+        for difference in chunk:
+            if difference < threshold:
+                pairs.append((i, j, difference))
+            j += 1
+            if j == n:
+                i += 1
+                j = i + 1
+    return pairs
@@ -0,0 +1,351 @@
+"""Batch conversions between sRGB and the OKLab/OKLCH and CIELAB/LCh spaces
+
+Every conversion takes an (N, 3) sequence of colors (e.g. a list of RGB
+tuples) and returns a list of tuples, so a whole palette or image is
+converted in one call. The sRGB transfer function is never evaluated per
+color: decoding uses a 256-entry table and encoding a binary search over
+the 8-bit decision thresholds, which rounds exactly like encoding and
+rounding would. Matrices are precomputed (with the CIELAB white point
+folded in).
+"""
+import math
+from bisect import bisect
+
+def _srgb_to_linear(c):
+    """Decode an sRGB component (0-1) to linear light"""
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+# Linear light value of each 8-bit sRGB component
+SRGB_TO_LINEAR = tuple(_srgb_to_linear(i / 255) for i in range(256))
+
+# Linear light values halfway between consecutive 8-bit codes: bisecting
+# these gives the correctly rounded 8-bit code of a linear value
+_ENCODE_THRESHOLDS = tuple(_srgb_to_linear((i + 0.5) / 255) for i in range(255))
+
+# Linear sRGB to LMS and LMS' (cube roots) to OKLab, from Ottosson's OKLab definition
+_RGB_TO_LMS = (
+    (0.4122214708, 0.5363325363, 0.0514459929),
+    (0.2119034982, 0.6806995451, 0.1073969566),
+    (0.0883024619, 0.2817188376, 0.6299787005),
+)
+_LMS_TO_OKLAB = (
+    (0.2104542553, 0.7936177850, -0.0040720468),
+    (1.9779984951, -2.4285922050, 0.4505937099),
+    (0.0259040371, 0.7827717662, -0.8086757660),
+)
+_OKLAB_TO_LMS = (
+    (1.0, 0.3963377774, 0.2158037573),
+    (1.0, -0.1055613458, -0.0638541728),
+    (1.0, -0.0894841775, -1.2914855480),
+)
+_LMS_TO_RGB = (
+    (4.0767416621, -3.3077115913, 0.2309699292),
+    (-1.2684380046, 2.6097574011, -0.3413193965),
+    (-0.0041960863, -0.7034186147, 1.7076147010),
+)
+
+# D65 reference white used by CIELAB
+D65_WHITE = (0.95047, 1.0, 1.08883)
+
+# Linear sRGB to XYZ and back, with the reference white folded in (XYZ / white)
+_RGB_TO_XYZN = tuple(tuple(v / w for v in row) for row, w in zip((
+    (0.4124564, 0.3575761, 0.1804375),
+    (0.2126729, 0.7151522, 0.0721750),
+    (0.0193339, 0.1191920, 0.9503041),
+), D65_WHITE))
+_XYZN_TO_RGB = tuple(tuple(v * w for v, w in zip(row, D65_WHITE)) for row in (
+    (3.2404542, -1.5371385, -0.4985314),
+    (-0.9692660, 1.8760108, 0.0415560),
+    (0.0556434, -0.2040259, 1.0572252),
+))
+
+_LAB_EPSILON = (6 / 29) ** 3
+_LAB_KAPPA = 1 / (3 * (6 / 29) ** 2)
+
+# Tolerance when deciding whether a linear value is inside the sRGB gamut
+_GAMUT_EPSILON = 1e-7
+
+# Bisection steps used to reduce chroma into the sRGB gamut
+_GAMUT_STEPS = 16
+
+_cbrt = getattr(math, "cbrt", None) or (lambda x: math.copysign(abs(x) ** (1 / 3), x))
+
+def linear_to_srgb(value):
+    """Encode a linear light value to the nearest 8-bit sRGB component (clipped)"""
+    return bisect(_ENCODE_THRESHOLDS, value)
+
+def rgb_to_oklab(colors):
+    """Convert sRGB colors to OKLab
+
+    Args:
+        colors (sequence): (N, 3) sequence of RGB colors (0-255 integers)
+
+    Returns:
+        list: (L, a, b) tuples, L in 0-1
+    """
+    lut = SRGB_TO_LINEAR
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = _RGB_TO_LMS
+    (n00, n01, n02), (n10, n11, n12), (n20, n21, n22) = _LMS_TO_OKLAB
+    cbrt = _cbrt
+
+    result = []
+    append = result.append
+    for r, g, b in colors:
+        r, g, b = lut[r], lut[g], lut[b]
+        l = cbrt(m00 * r + m01 * g + m02 * b)
+        m = cbrt(m10 * r + m11 * g + m12 * b)
+        s = cbrt(m20 * r + m21 * g + m22 * b)
+        append((n00 * l + n01 * m + n02 * s, n10 * l + n11 * m + n12 * s, n20 * l + n21 * m + n22 * s))
+    return result
+
+def oklab_to_linear(labs):
+    """Convert OKLab colors to linear sRGB (unclipped)
+
+    Args:
+        labs (sequence): (N, 3) sequence of (L, a, b) colors
+
+    Returns:
+        list: (r, g, b) tuples of linear light, outside 0-1 when out of gamut
+    """
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = _OKLAB_TO_LMS
+    (n00, n01, n02), (n10, n11, n12), (n20, n21, n22) = _LMS_TO_RGB
+
+    result = []
+    append = result.append
+    for L, a, b in labs:
+        l = m00 * L + m01 * a + m02 * b
+        m = m10 * L + m11 * a + m12 * b
+        s = m20 * L + m21 * a + m22 * b
+        l, m, s = l * l * l, m * m * m, s * s * s
+        append((n00 * l + n01 * m + n02 * s, n10 * l + n11 * m + n12 * s, n20 * l + n21 * m + n22 * s))
+    return result
+
+def oklab_to_rgb(labs):
+    """Convert OKLab colors to sRGB, clipping out-of-gamut components
+
+    Args:
+        labs (sequence): (N, 3) sequence of (L, a, b) colors
+
+    Returns:
+        list: RGB tuples (0-255 integers)
+    """
+    thresholds = _ENCODE_THRESHOLDS
+    return [(bisect(thresholds, r), bisect(thresholds, g), bisect(thresholds, b))
+            for r, g, b in oklab_to_linear(labs)]
+
+def lab_to_lch(labs):
+    """Convert Lab colors (OKLab or CIELAB) to their cylindrical LCh form
+
+    Args:
+        labs (sequence): (N, 3) sequence of (L, a, b) colors
+
+    Returns:
+        list: (L, C, h) tuples, hue in degrees (0-360)
+    """
+    hypot, atan2, degrees = math.hypot, math.atan2, math.degrees
+    return [(L, hypot(a, b), degrees(atan2(b, a)) % 360.0) for L, a, b in labs]
+
+def lch_to_lab(lchs):
+    """Convert LCh colors to their Lab form (inverse of ``lab_to_lch``)
+
+    Args:
+        lchs (sequence): (N, 3) sequence of (L, C, h) colors, hue in degrees
+
+    Returns:
+        list: (L, a, b) tuples
+    """
+    cos, sin, radians = math.cos, math.sin, math.radians
+    result = []
+    for L, C, h in lchs:
+        h = radians(h)
+        result.append((L, C * cos(h), C * sin(h)))
+    return result
+
+def rgb_to_oklch(colors):
+    """Convert sRGB colors to OKLCH
+
+    Args:
+        colors (sequence): (N, 3) sequence of RGB colors (0-255 integers)
+
+    Returns:
+        list: (L, C, h) tuples, hue in degrees
+    """
+    return lab_to_lch(rgb_to_oklab(colors))
+
+def oklch_to_rgb(lchs, fit_gamut=True):
+    """Convert OKLCH colors to sRGB
+
+    Args:
+        lchs (sequence): (N, 3) sequence of (L, C, h) colors, hue in degrees
+        fit_gamut (bool): Reduce the chroma of out-of-gamut colors until they
+                          fit, keeping lightness and hue; clip components otherwise
+
+    Returns:
+        list: RGB tuples (0-255 integers)
+    """
+    return _lch_to_rgb(lchs, oklab_to_linear, fit_gamut)
+
+def rgb_to_lab(colors):
+    """Convert sRGB colors to CIELAB (D65)
+
+    Args:
+        colors (sequence): (N, 3) sequence of RGB colors (0-255 integers)
+
+    Returns:
+        list: (L, a, b) tuples, L in 0-100
+    """
+    lut = SRGB_TO_LINEAR
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = _RGB_TO_XYZN
+    cbrt, epsilon, kappa, offset = _cbrt, _LAB_EPSILON, _LAB_KAPPA, 4 / 29
+
+    result = []
+    append = result.append
+    for r, g, b in colors:
+        r, g, b = lut[r], lut[g], lut[b]
+        x = m00 * r + m01 * g + m02 * b
+        y = m10 * r + m11 * g + m12 * b
+        z = m20 * r + m21 * g + m22 * b
+        fx = cbrt(x) if x > epsilon else x * kappa + offset
+        fy = cbrt(y) if y > epsilon else y * kappa + offset
+        fz = cbrt(z) if z > epsilon else z * kappa + offset
+        append((116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)))
+    return result
+
+def lab_to_linear(labs):
+    """Convert CIELAB (D65) colors to linear sRGB (unclipped)
+
+    Args:
+        labs (sequence): (N, 3) sequence of (L, a, b) colors
+
+    Returns:
+        list: (r, g, b) tuples of linear light, outside 0-1 when out of gamut
+    """
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = _XYZN_TO_RGB
+    delta, kappa, offset = 6 / 29, _LAB_KAPPA, 4 / 29
+
+    result = []
+    append = result.append
+    for L, a, b in labs:
+        fy = (L + 16) / 116
+        fx = fy + a / 500
+        fz = fy - b / 200
+        x = fx * fx * fx if fx > delta else (fx - offset) / kappa
+        y = fy * fy * fy if fy > delta else (fy - offset) / kappa
+        z = fz * fz * fz if fz > delta else (fz - offset) / kappa
+        append((m00 * x + m01 * y + m02 * z, m10 * x + m11 * y + m12 * z, m20 * x + m21 * y + m22 * z))
+    return result
+
+def lab_to_rgb(labs):
+    """Convert CIELAB (D65) colors to sRGB, clipping out-of-gamut components
+
+    Args:
+        labs (sequence): (N, 3) sequence of (L, a, b) colors
+
+    Returns:
+        list: RGB tuples (0-255 integers)
+    """
+    thresholds = _ENCODE_THRESHOLDS
+    return [(bisect(thresholds, r), bisect(thresholds, g), bisect(thresholds, b))
+            for r, g, b in lab_to_linear(labs)]
+
+def rgb_to_lch(colors):
+    """Convert sRGB colors to CIELCh (D65)
+
+    Args:
+        colors (sequence): (N, 3) sequence of RGB colors (0-255 integers)
+
+    Returns:
+        list: (L, C, h) tuples, hue in degrees
+    """
+    return lab_to_lch(rgb_to_lab(colors))
+
+def lch_to_rgb(lchs, fit_gamut=True):
+    """Convert CIELCh (D65) colors to sRGB
+
+    Args:
+        lchs (sequence): (N, 3) sequence of (L, C, h) colors, hue in degrees
+        fit_gamut (bool): Reduce the chroma of out-of-gamut colors until they
+                          fit, keeping lightness and hue; clip components otherwise
+
+    Returns:
+        list: RGB tuples (0-255 integers)
+    """
+    return _lch_to_rgb(lchs, lab_to_linear, fit_gamut)
+
+def _in_gamut(rgb):
+    low, high = -_GAMUT_EPSILON, 1 + _GAMUT_EPSILON
+    return low <= rgb[0] <= high and low <= rgb[1] <= high and low <= rgb[2] <= high
+
+def _lch_to_rgb(lchs, to_linear, fit_gamut):
+    """Convert LCh colors to sRGB through a Lab-to-linear conversion"""
+    lchs = list(lchs)
+    linear = to_linear(lch_to_lab(lchs))
+
+    if fit_gamut:
+        for i, rgb in enumerate(linear):
+            if _in_gamut(rgb):
+                continue
+
+            # Bisect the largest chroma that still fits, at the same L and h
+            L, C, h = lchs[i]
+            h = math.radians(h)
+            cos_h, sin_h = math.cos(h), math.sin(h)
+            low, high = 0.0, C
+            fitted = to_linear(((L, 0.0, 0.0),))[0]
+            for _ in range(_GAMUT_STEPS):
+                middle = (low + high) / 2
+                candidate = to_linear(((L, middle * cos_h, middle * sin_h),))[0]
+                if _in_gamut(candidate):
+                    low, fitted = middle, candidate
+                else:
+                    high = middle
+            linear[i] = fitted
+
+    thresholds = _ENCODE_THRESHOLDS
+    return [(bisect(thresholds, r), bisect(thresholds, g), bisect(thresholds, b)) for r, g, b in linear]
+
+# Cylindrical spaces generators can work in, with their conversions
+PERCEPTUAL_SPACES = {
+    "oklch": (rgb_to_oklch, oklch_to_rgb),
+    "lch": (rgb_to_lch, lch_to_rgb),
+}
+
+def hsv_variants_to_rgb(base_color, variants, space="hsv"):
+    """Convert HSV variants of a base color to sRGB, optionally perceptually
+
+    Generators describe their colors as HSV variations of the base color.
+    In a perceptual space, the variations are applied to the base color's
+    LCh coordinates instead: hue offsets become hue rotations, and
+    saturation and value ratios scale chroma and lightness. Colors then
+    keep the perceived lightness and colorfulness of the base color across
+    hues, which HSV does not.
+
+    Args:
+        base_color (tuple): RGB color tuple (0-255, 0-255, 0-255)
+        variants (list): (h, s, v) tuples (0-1) describing the colors
+        space (str): 'hsv', or one of PERCEPTUAL_SPACES
+
+    Returns:
+        list: RGB tuples (0-255 integers)
+    """
+    if space == "hsv":
+        from .color_conversion import hsv_to_rgb
+        return [hsv_to_rgb(hsv) for hsv in variants]
+
+    if space not in PERCEPTUAL_SPACES:
+        raise ValueError(f"Unknown color space: {space}. Valid options are: hsv, {', '.join(PERCEPTUAL_SPACES)}")
+
+    from .color_conversion import rgb_to_hsv
+    to_lch, from_lch = PERCEPTUAL_SPACES[space]
+    base_h, base_s, base_v = rgb_to_hsv(base_color)
+    L, C, hue = to_lch([base_color])[0]
+    # Lightness is capped by the space's white (1 for OKLCH, 100 for CIELCh)
+    max_lightness = 1.0 if space == "oklch" else 100.0
+
+    lchs = []
+    for h, s, v in variants:
+        lightness = min(max_lightness, L * v / base_v) if base_v else max_lightness * v
+        chroma = C * s / base_s if base_s else 0.0
+        lchs.append((lightness, chroma, (hue + (h - base_h) * 360.0) % 360.0))
+
+    return from_lch(lchs)
@@ -0,0 +1,79 @@
+import os
+import tempfile
+
+# The umask can only be read by setting it, and it is shared by the whole
+# process: read it once at import rather than from the export threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def write_atomic(path, data):
+    """Write a file atomically via a temporary file and rename
+
+    Readers never observe a partially written file: the content is written
+    to a temporary file in the same directory and moved over the target.
+
+    Args:
+        path (str): Output file path
+        data (str or bytes): Content to write (str is encoded as UTF-8)
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        # mkstemp creates files as 0600; use the permissions open() would have used
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        else:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def is_unchanged(path, data):
+    """Check whether a file already holds exactly the given content
+
+    Args:
+        path (str): File path
+        data (str or bytes): Expected content (str is encoded as UTF-8)
+
+    Returns:
+        bool: True if the file exists with identical content
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    try:
+        # Different sizes can never match, so avoid reading the file at all
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+def write_if_changed(path, data, skip_unchanged=True):
+    """Atomically write a file unless it already holds the same content
+
+    Args:
+        path (str): Output file path
+        data (str or bytes): Content to write (str is encoded as UTF-8)
+        skip_unchanged (bool): Whether to skip writing identical content
+
+    Returns:
+        bool: True if the file was written, False if it was left untouched
+    """
+    if skip_unchanged and is_unchanged(path, data):
+        return False
+
+    write_atomic(path, data)
+    return True
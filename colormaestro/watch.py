@@ -0,0 +1,54 @@
+import os
+import time
+
+# Seconds between checks of the watched files
+DEFAULT_INTERVAL = 0.5
+
+# Seconds the files must stay unchanged before a change is reported
+DEFAULT_DEBOUNCE = 0.3
+
+def signature(path):
+    """Get the (mtime, size) signature of a file (None if it does not exist)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def changes(paths, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE, sleep=time.sleep):
+    """Watch files for changes by polling their modification time and size
+
+    Editors often save in several steps (truncate, write, rename), so once
+    a change is seen the files must stay stable for ``debounce`` seconds
+    before it is reported; a burst of saves is reported once. Missing files
+    are waited for rather than reported.
+
+    Args:
+        paths (list): File paths to watch
+        interval (float): Seconds between polls
+        debounce (float): Seconds the files must stay unchanged after a change
+        sleep (callable): Sleep function (for tests)
+
+    Yields:
+        list: Paths whose signature differs from the last reported state
+    """
+    reported = {path: signature(path) for path in paths}
+
+    while True:
+        sleep(interval)
+        current = {path: signature(path) for path in paths}
+        if current == reported:
+            continue
+
+        # Wait for the burst of writes to settle
+        while True:
+            sleep(debounce)
+            settled = {path: signature(path) for path in paths}
+            if settled == current:
+                break
+            current = settled
+
+        changed = [path for path in paths if current[path] != reported[path] and current[path] is not None]
+        reported = current
+        if changed:
+            yield changed
@@ -0,0 +1,169 @@
+import pytest
+import random
+from click.testing import CliRunner
+
+from colormaestro.cli import cli
+from colormaestro.generators import accessible
+from colormaestro.utils import accessibility, accessibility_utils, color_spaces
+
+# Text, background and Lc from the APCA 0.0.98G reference implementation
+APCA_REFERENCE = [
+    ((0, 0, 0), (255, 255, 255), 106.04067321268862),
+    ((255, 255, 255), (0, 0, 0), -107.88473318309848),
+    ((0x88, 0x88, 0x88), (255, 255, 255), 63.056469930209424),
+    ((255, 255, 255), (0x88, 0x88, 0x88), -68.54146436644962),
+    ((0, 0, 0), (0xaa, 0xaa, 0xaa), 58.146262578561334),
+    ((0x11, 0x22, 0x33), (0xdd, 0xee, 0xff), 91.66830811481631),
+]
+
+def _colors(count, seed=0):
+    rng = random.Random(seed)
+    return [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(count)]
+
+def _wcag_luminance(rgb):
+    """WCAG 2 relative luminance evaluated directly from its definition"""
+    channels = [c / 255 for c in rgb]
+    channels = [c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4 for c in channels]
+    return 0.2126 * channels[0] + 0.7152 * channels[1] + 0.0722 * channels[2]
+
+class TestContrastMetrics:
+    """Tests for the WCAG 2 and APCA contrast metrics"""
+
+    def test_relative_luminance_table(self):
+        """Test that the lookup tables match the WCAG definition"""
+        for color in _colors(200) + [(0, 0, 0), (255, 255, 255), (10, 10, 10)]:
+            assert accessibility.relative_luminance(color) == pytest.approx(_wcag_luminance(color), abs=1e-12)
+            assert accessibility_utils.calculate_relative_luminance(color) == accessibility.relative_luminance(color)
+
+    def test_float_and_out_of_range_components(self):
+        """Test that non-integer colors use the formulas instead of the tables"""
+        for color in [(127.5, 10.2, 200.0), (0.0, 0.0, 0.0), (-1, 0, 0), (256, 300, 255), [58, 134, 255]]:
+            assert accessibility.relative_luminance(color) == pytest.approx(_wcag_luminance(color), abs=1e-12)
+        assert accessibility.relative_luminance((-1, 0, 0)) < 0
+        assert accessibility_utils.calculate_relative_luminance((255.0, 255.0, 255.0)) == pytest.approx(1.0)
+        assert accessibility.calculate_contrast_ratio((0.0, 0.0, 0.0), (255.0, 255.0, 255.0)) == pytest.approx(21.0)
+
+        assert accessibility.apca_contrast([0.0, 0.0, 0.0], [255, 255, 255]) == pytest.approx(APCA_REFERENCE[0][2])
+        with pytest.raises(ValueError):
+            accessibility.apca_contrast((-1, 0, 0), (255, 255, 255))
+
+    def test_apca_reference_values(self):
+        """Test Lc against the reference implementation, in both polarities"""
+        for text, background, expected in APCA_REFERENCE:
+            assert accessibility.apca_contrast(text, background) == pytest.approx(expected, abs=1e-9)
+        assert accessibility.apca_contrast((120, 120, 120), (121, 121, 121)) == 0
+
+    def test_contrast_matrix(self):
+        """Test that matrices agree with the scalar functions"""
+        foregrounds, backgrounds = _colors(20, seed=1), _colors(15, seed=2)
+
+        ratios = accessibility.contrast_matrix(foregrounds, backgrounds, "wcag")
+        lcs = accessibility.contrast_matrix(foregrounds, backgrounds, "apca")
+        assert len(ratios) == 20 and all(len(row) == 15 for row in ratios)
+        for i, fg in enumerate(foregrounds):
+            for j, bg in enumerate(backgrounds):
+                assert ratios[i][j] == pytest.approx(accessibility.calculate_contrast_ratio(fg, bg))
+                assert lcs[i][j] == pytest.approx(accessibility.apca_contrast(fg, bg))
+
+        with pytest.raises(ValueError):
+            accessibility.contrast_matrix(foregrounds, backgrounds, "wcag3")
+
+    def test_check_pairs_levels(self):
+        """Test selectable thresholds for both metrics"""
+        gray, white = (0x76, 0x76, 0x76), (255, 255, 255)
+
+        result, = accessibility.check_pairs([gray], [white])
+        assert result["wcag"] and result["apca"]
+        result, = accessibility.check_pairs([gray], [white], wcag_level="AAA", apca_level="body")
+        assert not result["wcag"] and not result["apca"]
+
+    def test_symmetric_apca_contrast(self):
+        """Test that the APCA score holds whichever color is the text"""
+        blue, white = (58, 134, 255), (255, 255, 255)
+        score = accessibility.calculate_contrast(blue, white, "apca")
+
+        assert score == accessibility.calculate_contrast(white, blue, "apca")
+        assert score == min(abs(accessibility.apca_contrast(blue, white)), abs(accessibility.apca_contrast(white, blue)))
+
+    def test_check_contrast_reports_apca(self):
+        """Test that the palette report carries Lc next to the ratios"""
+        results = accessibility.check_contrast([(0, 0, 0), (255, 255, 255)], apca_level="body")
+
+        assert results["Primary"]["white_text"]["lc"] == pytest.approx(-107.9)
+        assert results["Primary"]["white_text"]["APCA"]
+        assert not results["Secondary"]["white_text"]["APCA"]
+
+    def test_accessible_generator_with_apca(self):
+        """Test that the accessible generator can target APCA contrast"""
+        palette = accessible.generate((255, 204, 0), 4, metric="apca")
+
+        assert len(palette) == 4
+        assert accessibility.calculate_contrast(palette[0], palette[1], "apca") >= accessibility.APCA_LEVELS["content"]
+        with pytest.raises(ValueError):
+            accessible.generate((58, 134, 255), 4, metric="wcag3")
+
+    def test_nearest_compliant_color(self):
+        """Test that suggestions pass, keep the hue and stay as close as possible"""
+        white = (255, 255, 255)
+        assert accessibility.nearest_compliant_color((0, 0, 0), white) == (0, 0, 0)
+        # No gray between #767676 and #777777
+        assert accessibility.nearest_compliant_color((0x77, 0x77, 0x77), white) == (0x76, 0x76, 0x76)
+        # Mid gray has at most about 4.6:1 with anything
+        assert accessibility.nearest_compliant_color((0x77, 0x77, 0x77), (0x77, 0x77, 0x77), "AAA") is None
+
+        for color in _colors(30, seed=3):
+            for background in ((255, 255, 255), (0, 0, 0), (58, 134, 255)):
+                suggestion = accessibility.nearest_compliant_color(color, background, "AAA")
+                if suggestion is None:
+                    continue
+                assert accessibility.calculate_contrast_ratio(suggestion, background) >= 7.0
+                (_, chroma, hue), (_, new_chroma, new_hue) = color_spaces.rgb_to_oklch([color, suggestion])
+                if min(chroma, new_chroma) > 0.05:
+                    assert abs((hue - new_hue + 180) % 360 - 180) < 6
+
+    def test_suggest_fixes(self):
+        """Test batch suggestions over foreground and background token sets"""
+        foregrounds, backgrounds = _colors(40, seed=4), _colors(5, seed=5)
+        failing = [(r["foreground"], r["background"])
+                   for r in accessibility.check_pairs(foregrounds, backgrounds) if not r["wcag"]]
+
+        fixes = list(accessibility.suggest_fixes(foregrounds, backgrounds))
+        assert [(fix["foreground"], fix["background"]) for fix in fixes] == failing
+        for fix in fixes:
+            if fix["suggestion"] is not None:
+                assert fix["suggestion_ratio"] >= 4.5
+                assert fix["suggestion"] == accessibility.nearest_compliant_color(
+                    foregrounds[fix["foreground"]], backgrounds[fix["background"]])
+
+    def test_check_contrast_suggestions(self, capsys):
+        """Test that failing text colors come with the nearest passing color"""
+        results = accessibility.check_contrast([(58, 134, 255)])
+
+        assert results["Primary"]["black_text"]["suggestion"] is None
+        suggestion = results["Primary"]["white_text"]["suggestion"]
+        assert accessibility.calculate_contrast_ratio(suggestion, (255, 255, 255)) >= 4.5
+        accessibility.display_results(results)
+        assert f"Use black text, or RGB{suggestion} for white text" in capsys.readouterr().out
+
+    def test_contrast_command(self, tmp_path):
+        """Test checking foreground and background token sets"""
+        foregrounds = tmp_path / "fg.txt"
+        backgrounds = tmp_path / "bg.txt"
+        foregrounds.write_text("#000000 #767676\n")
+        backgrounds.write_text("#ffffff\n")
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ['contrast', str(foregrounds), str(backgrounds)])
+        assert result.exit_code == 0
+        assert "#000000\t#ffffff\t21.00\t106.0\tpass\tpass\n" in result.output
+        assert "2 of 2 pair(s) pass WCAG AA, 2 pass APCA content" in result.output
+
+        result = runner.invoke(cli, ['contrast', str(foregrounds), str(backgrounds),
+                                     '--apca-level', 'body', '--failing', '--strict'])
+        assert result.exit_code == 1
+        assert result.output.startswith("#767676\t#ffffff\t4.54\t71.6\tpass\tfail\n")
+
+        result = runner.invoke(cli, ['contrast', str(foregrounds), str(backgrounds),
+                                     '--wcag-level', 'AAA', '--suggest'])
+        assert "#000000\t#ffffff\t21.00\t106.0\tpass\tpass\t-\n" in result.output
+        assert "#767676\t#ffffff\t4.54\t71.6\tfail\tpass\t#595959\n" in result.output
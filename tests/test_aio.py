@@ -0,0 +1,130 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from colormaestro import aio
+
+
+class TestAsyncAPI(unittest.TestCase):
+    """Tests for the asyncio library API"""
+
+    def setUp(self):
+        self.palette = [(58, 134, 255), (242, 179, 79), (255, 32, 122)]
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        aio.configure()
+
+    def test_parse_generate_export(self):
+        """Test the async pipeline end to end"""
+        async def main():
+            base_color = await aio.parse("#3a86ff")
+            palette = await aio.generate(base_color, "harmony", num_colors=3)
+            svg_path = os.path.join(self.temp_dir, "palette.svg")
+            results = await aio.export_all(palette, [("css", None), ("svg", svg_path), ("bogus", None)])
+            return palette, results, svg_path
+
+        palette, results, svg_path = asyncio.run(main())
+
+        self.assertEqual(palette[0], (58, 134, 255))
+        self.assertIn("--color-primary: #3a86ff;", results[0]["output"])
+        self.assertTrue(os.path.exists(svg_path))
+        self.assertIsInstance(results[2]["error"], ValueError)
+
+    def test_generate_space(self):
+        """Test that the color space is passed through and validated"""
+        from colormaestro import pipeline
+
+        base_color = (58, 134, 255)
+        palette = asyncio.run(aio.generate(base_color, "harmony", num_colors=3, space="oklch"))
+        self.assertEqual(palette, pipeline.generate_palette(base_color, "harmony", "complementary", 3, False, "oklch"))
+        self.assertNotEqual(palette, pipeline.generate_palette(base_color, "harmony", "complementary", 3))
+
+        with self.assertRaises(ValueError):
+            asyncio.run(aio.generate(base_color, space="cmyk"))
+
+    def test_concurrency_limit(self):
+        """Test that the semaphore caps concurrently running work"""
+        aio.configure(ThreadPoolExecutor(max_workers=8), max_concurrency=2)
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def work():
+            with lock:
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        async def main():
+            await asyncio.gather(*(aio.run_blocking(work) for _ in range(10)))
+
+        asyncio.run(main())
+        self.assertEqual(running[1], 2)
+
+    def test_cancellation(self):
+        """Test that queued work is cancelled with its task"""
+        aio.configure(ThreadPoolExecutor(max_workers=1), max_concurrency=1)
+        started = []
+
+        async def main():
+            first = asyncio.ensure_future(aio.run_blocking(time.sleep, 0.05))
+            second = asyncio.ensure_future(aio.run_blocking(started.append, True))
+            await asyncio.sleep(0.01)
+            second.cancel()
+            await first
+            with self.assertRaises(asyncio.CancelledError):
+                await second
+
+        asyncio.run(main())
+        self.assertEqual(started, [])
+
+    def test_cancelled_work_keeps_its_slot(self):
+        """Test that running work holds its slot until its thread finishes, even when cancelled"""
+        aio.configure(ThreadPoolExecutor(max_workers=4), max_concurrency=1)
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def work():
+            with lock:
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        async def main():
+            first = asyncio.ensure_future(aio.run_blocking(work))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            await asyncio.gather(*(aio.run_blocking(work) for _ in range(2)))
+
+        asyncio.run(main())
+        self.assertEqual(running[1], 1)
+
+    def test_parse_off_the_loop(self):
+        """Test that checking whether an input is a file does not run on the event loop"""
+        threads = []
+        isfile = os.path.isfile
+
+        def tracked_isfile(path):
+            threads.append(threading.current_thread())
+            return isfile(path)
+
+        async def main():
+            with mock.patch("os.path.isfile", tracked_isfile):
+                return await aio.parse("coral"), await aio.parse("#3a86ff")
+
+        self.assertEqual(asyncio.run(main()), ((255, 127, 80), (58, 134, 255)))
+        self.assertTrue(threads)
+        self.assertNotIn(threading.main_thread(), threads)
+
+
+if __name__ == '__main__':
+    unittest.main()
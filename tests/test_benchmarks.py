@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks import memory, runner
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+    """Tests for the benchmark runner"""
+
+    def test_run_and_save(self):
+        """Test selecting benchmarks by pattern and recording the results"""
+        cases = [("generate.a", lambda: sum(range(10))), ("format.b", lambda: None)]
+        results = runner.run(cases, ["generate.*"], repeat=2, min_time=0.001)
+
+        self.assertEqual(list(results), ["generate.a"])
+        self.assertGreater(results["generate.a"]["min"], 0)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "results.json")
+            runner.save(path, results)
+            self.assertEqual(runner.load(path), results)
+
+    def test_compare_thresholds(self):
+        """Test regression detection with per-pattern thresholds"""
+        baseline = {name: {"min": 1.0} for name in ["parse.image.64", "format.css.5", "format.json.5"]}
+        results = {
+            "parse.image.64": {"min": 1.4},
+            "format.css.5": {"min": 1.4},
+            "format.json.5": {"min": 0.5},
+            "format.new.5": {"min": 9.0},
+        }
+
+        comparison = runner.compare(results, baseline, threshold=0.2, overrides=[("parse.*", 0.5)])
+        regressed = {row["name"]: row["regressed"] for row in comparison}
+
+        self.assertEqual(regressed, {"parse.image.64": False, "format.css.5": True, "format.json.5": False})
+
+    def test_compare_calibration(self):
+        """Test that baselines are scaled by the calibration case"""
+        baseline = {runner.CALIBRATION: {"min": 1.0}, "format.css.5": {"min": 1.0}, "format.json.5": {"min": 1.0}}
+        # A machine twice as slow: only the json case got slower relative to it
+        results = {runner.CALIBRATION: {"min": 2.0}, "format.css.5": {"min": 2.2}, "format.json.5": {"min": 3.0}}
+
+        self.assertEqual(runner.speed_factor(results, baseline), 2.0)
+        regressed = {row["name"]: row["regressed"] for row in runner.compare(results, baseline)}
+        self.assertEqual(regressed, {"format.css.5": False, "format.json.5": True})
+
+        absolute = {row["name"]: row["regressed"] for row in runner.compare(results, baseline, normalize=False)}
+        self.assertEqual(absolute, {"format.css.5": True, "format.json.5": True})
+
+        results = runner.run([("generate.a", lambda: None)], ["none"], repeat=2, min_time=0.001, calibrate=True)
+        self.assertEqual(list(results), [runner.CALIBRATION])
+
+
+class TestMemoryBudgets(unittest.TestCase):
+    """Tests for the memory budget check"""
+
+    def test_check_budgets(self):
+        """Test that measurements beyond their budget are reported"""
+        results = {"parse.image.1mp": {"tracemalloc_peak": 2 * memory.MB, "rss_peak": 30 * memory.MB}}
+        budgets = memory.budgets_from(results, headroom=0.5)
+        self.assertEqual(budgets, {"parse.image.1mp": {"tracemalloc_peak_mb": 3.0, "rss_peak_mb": 45.0}})
+        self.assertEqual(memory.check(results, budgets), [])
+
+        results["parse.image.1mp"]["rss_peak"] = 50 * memory.MB
+        failures = memory.check(results, budgets)
+        self.assertEqual(len(failures), 1)
+        self.assertIn("rss_peak", failures[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
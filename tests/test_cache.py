@@ -0,0 +1,60 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from colormaestro import cache, cli
+
+
+class TestResultCache(unittest.TestCase):
+    """Tests for the disk-backed result cache"""
+
+    def test_round_trip(self):
+        """Test storing and reading text and binary contents"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            key = cache.make_key(source={"hex": "#3a86ff"}, formats=["css", "png"])
+            self.assertIsNone(cache.get(key, tmpdir))
+
+            cache.put(key, [(58, 134, 255)], {"css": ":root {}", "png": b"\x89PNG"}, tmpdir)
+            entry = cache.get(key, tmpdir)
+
+            self.assertEqual(entry["palette"], [(58, 134, 255)])
+            self.assertEqual(entry["contents"], {"css": ":root {}", "png": b"\x89PNG"})
+
+    def test_file_digest(self):
+        """Test hashing files read in several chunks"""
+        content = bytes(range(256)) * 1000
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "photo.png")
+            with open(path, "wb") as f:
+                f.write(content)
+
+            with mock.patch.object(cache, "DIGEST_CHUNK_SIZE", 4096):
+                self.assertEqual(cache.file_digest(path), hashlib.sha256(content).hexdigest())
+
+            key = cli._cache_key(path, "image", None, None, "ui", "complementary", 5, False, "hsv", False, ["css"])
+            with open(path, "ab") as f:
+                f.write(b"edit")
+            self.assertNotEqual(
+                cli._cache_key(path, "image", None, None, "ui", "complementary", 5, False, "hsv", False, ["css"]), key)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entries are evicted first"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            keys = [cache.make_key(n=n) for n in range(3)]
+            for i, key in enumerate(keys):
+                cache.put(key, [(0, 0, 0)], {"css": "x" * 1000}, tmpdir)
+                os.utime(os.path.join(tmpdir, key + cache.ENTRY_SUFFIX), (i, i))
+
+            # Reading the oldest entry makes it the most recently used
+            self.assertIsNotNone(cache.get(keys[0], tmpdir))
+
+            entry_size = os.path.getsize(os.path.join(tmpdir, keys[0] + cache.ENTRY_SUFFIX))
+            self.assertEqual(cache.evict(tmpdir, max_size=2 * entry_size), 1)
+            self.assertIsNone(cache.get(keys[1], tmpdir))
+            self.assertIsNotNone(cache.get(keys[2], tmpdir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from click.testing import CliRunner
+
+from colormaestro.cli import cli
+from colormaestro import batch
+from colormaestro.formatters import image_formatter
+
+
+class TestGenerateCommand(unittest.TestCase):
+    """Tests for the default generate command"""
+
+    def setUp(self):
+        self.runner = CliRunner()
+
+    def test_default_command(self):
+        """Test that INPUT works without naming the generate command"""
+        result = self.runner.invoke(cli, ['#3a86ff', '-o', 'css'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("--color-primary: #3a86ff;", result.output)
+
+    def test_unknown_format(self):
+        """Test that a failing format is reported without stopping others"""
+        result = self.runner.invoke(cli, ['generate', '#3a86ff', '-o', 'bogus,css'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Unknown output format: bogus", result.output)
+        self.assertIn("--color-primary: #3a86ff;", result.output)
+
+    def test_profile(self):
+        """Test the per-stage timing report and the cProfile dump"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stats_path = os.path.join(tmpdir, "run.prof")
+            result = self.runner.invoke(cli, ['#3a86ff', '-o', 'css,svg', '--out-dir', tmpdir,
+                                              '--profile-output', stats_path])
+
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertTrue(os.path.getsize(stats_path) > 0)
+
+        for stage in ("parse", "generate", "format css", "format svg", "write svg"):
+            self.assertIn(stage, result.stderr)
+        self.assertNotIn("Profile", result.stdout)
+
+    def test_output_permissions(self):
+        """Test that written files get default permissions without touching the process umask"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch('os.umask', side_effect=AssertionError("umask changed")):
+                result = self.runner.invoke(cli, ['#3a86ff', '-o', 'css,svg', '--out-dir', tmpdir])
+            self.assertEqual(result.exit_code, 0, result.output)
+
+            umask = os.umask(0)
+            os.umask(umask)
+            for name in ("palette.css", "palette.svg"):
+                mode = os.stat(os.path.join(tmpdir, name)).st_mode & 0o777
+                self.assertEqual(mode, 0o666 & ~umask)
+
+    def test_result_cache(self):
+        """Test replaying cached outputs and never caching unseeded random palettes"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = {"COLORMAESTRO_CACHE_DIR": os.path.join(tmpdir, "cache")}
+            args = ['#3A86FF', '-o', 'css,svg', '--out-dir', os.path.join(tmpdir, 'out'), '--cache']
+
+            first = self.runner.invoke(cli, args, env=env)
+            self.assertEqual(first.exit_code, 0, first.output)
+
+            os.remove(os.path.join(tmpdir, 'out', 'palette.svg'))
+            with patch('colormaestro.pipeline.generate_palette', side_effect=AssertionError("not cached")):
+                second = self.runner.invoke(cli, args, env=env)
+            self.assertEqual(second.exit_code, 0, second.output)
+            self.assertEqual(second.output, first.output)
+            self.assertTrue(os.path.exists(os.path.join(tmpdir, 'out', 'palette.svg')))
+
+            self.runner.invoke(cli, ['-o', 'css', '--cache'], env=env)
+            self.assertEqual(len(os.listdir(env["COLORMAESTRO_CACHE_DIR"])), 1)
+
+            result = self.runner.invoke(cli, ['--clear-cache'], env=env)
+            self.assertIn("Removed 1 cached result(s)", result.output)
+
+    @unittest.skipIf(image_formatter.Image is None, "PIL not installed")
+    def test_recolor(self):
+        """Test applying generated and given palettes to an image"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, "photo.png")
+            image_formatter.Image.new('RGB', (16, 16), (200, 40, 40)).save(source)
+
+            result = self.runner.invoke(cli, ['#3a86ff', '-o', 'css', '--recolor', source, '--dither',
+                                              '--out-dir', os.path.join(tmpdir, 'out')])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertTrue(os.path.exists(os.path.join(tmpdir, 'out', 'photo.recolored.png')))
+
+            target = os.path.join(tmpdir, "preview.png")
+            result = self.runner.invoke(cli, ['recolor', source, '#000000, #ff0000', '--out', target])
+            self.assertEqual(result.exit_code, 0, result.output)
+            with image_formatter.Image.open(target) as img:
+                self.assertEqual(img.getpixel((0, 0)), (255, 0, 0))
+
+            result = self.runner.invoke(cli, ['recolor', source, 'nope'])
+            self.assertNotEqual(result.exit_code, 0)
+
+
+class TestBatchCommand(unittest.TestCase):
+    """Tests for the batch command"""
+
+    def setUp(self):
+        self.runner = CliRunner()
+
+    def test_parse_line(self):
+        """Test per-line options overriding the defaults"""
+        options = batch.parse_line("'sky blue' -t harmony -n 3", {"num_colors": 4, "dark": True})
+        self.assertEqual(options["input"], "sky blue")
+        self.assertEqual(options["palette_type"], "harmony")
+        self.assertEqual(options["num_colors"], 3)
+        self.assertTrue(options["dark"])
+
+    def test_run_preserves_order(self):
+        """Test that results stream in input order through the process pool"""
+        lines = [f"#{i:02x}80c0 -n 2\n" for i in range(40)] + ["\n"]
+        results = list(batch.run(lines, output_format="hex", workers=2, chunk_size=3))
+
+        self.assertEqual(len(results), 40)
+        for i, (output, error) in enumerate(results):
+            self.assertIsNone(error)
+            self.assertTrue(output.startswith(f"#{i:02x}80c0 "))
+
+    def test_rerun_reuses_unchanged_lines(self):
+        """Test that watch re-runs only process new or edited lines"""
+        results, previous = batch.rerun(["#3a86ff\n", "red -n 3\n"], {}, output_format="hex", workers=1)
+        self.assertEqual(len(results), 2)
+
+        with patch('colormaestro.batch.process_line', wraps=batch.process_line) as process_line:
+            results, _ = batch.rerun(["#3a86ff\n", "red -n 4\n", "\n"], previous, output_format="hex", workers=1)
+
+        self.assertEqual(process_line.call_count, 1)
+        self.assertEqual([len(output.split()) for output, _ in results], [5, 4])
+
+    def test_batch_stdin(self):
+        """Test the batch command reading stdin with a failing line"""
+        stdin = "#3a86ff\nnot-a-color --bogus\n#ff0000 --help\nred -n 3\n"
+        result = self.runner.invoke(cli, ['batch', '-w', '1'], input=stdin)
+
+        self.assertEqual(result.exit_code, 1)
+        records = [json.loads(line) for line in result.output.splitlines() if line.startswith('{')]
+        self.assertEqual([r["input"] for r in records], ["#3a86ff", "red"])
+        self.assertEqual(len(records[1]["palette"]), 3)
+        errors = [line for line in result.output.splitlines() if "No such option" in line]
+        self.assertEqual(len(errors), 2)
+        self.assertIn("--help", errors[1])
+        self.assertNotIn("Usage:", result.output)
+
+
+class TestStartup(unittest.TestCase):
+    """Tests keeping CLI startup cheap for scripted use"""
+
+    # Modules that only specific inputs, formats or commands may load
+    HEAVY_MODULES = ["PIL", "jinja2", "http.server", "multiprocessing", "concurrent.futures", "sqlite3"]
+
+    # Import time of colormaestro itself, as a multiple of click's import time
+    # (a relative budget keeps the test independent of machine speed)
+    IMPORT_BUDGET = 1.5
+
+    def run_python(self, code, *options):
+        return subprocess.run([sys.executable, *options, "-c", code], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    def test_css_run_skips_heavy_dependencies(self):
+        """Test that a hex-to-css run loads none of the heavy dependencies"""
+        code = (
+            "import sys\n"
+            "from colormaestro.cli import cli\n"
+            "cli(['#3498db', '-o', 'css'], standalone_mode=False)\n"
+            f"print([m for m in {self.HEAVY_MODULES!r} if m in sys.modules])\n"
+        )
+        result = self.run_python(code)
+        self.assertIn("--color-primary: #3498db;", result.stdout)
+        self.assertEqual(result.stdout.splitlines()[-1], "[]")
+
+    def test_import_time_budget(self):
+        """Test the import time of the CLI module against the startup budget"""
+        result = self.run_python("import colormaestro.cli", "-X", "importtime")
+
+        # Lines look like "import time:  self [us] | cumulative | name"
+        cumulative = {}
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[1].strip().isdigit():
+                cumulative[fields[2].strip()] = int(fields[1])
+
+        own_time = cumulative["colormaestro.cli"] - cumulative["click"]
+        self.assertLess(own_time, cumulative["click"] * self.IMPORT_BUDGET,
+                        f"colormaestro.cli took {own_time} us to import on top of click")
+
+
+if __name__ == '__main__':
+    unittest.main()
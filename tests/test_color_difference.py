@@ -0,0 +1,73 @@
+import pytest
+import random
+
+from colormaestro.utils import color_difference, color_spaces
+
+# CIELAB pairs and their ΔE2000 from Sharma, Wu and Dalal's test data
+SHARMA_PAIRS = [
+    ((50.0, 2.6772, -79.7751), (50.0, 0.0, -82.7485), 2.0425),
+    ((50.0, -1.0, 2.0), (50.0, 0.0, 0.0), 2.3669),
+    ((50.0, 2.5, 0.0), (73.0, 25.0, -18.0), 27.1492),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ((22.7233, 20.0904, -46.6940), (23.0331, 14.9730, -42.5619), 2.0373),
+]
+
+def _colors(count, seed=0):
+    rng = random.Random(seed)
+    return [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(count)]
+
+class TestColorDifference:
+    """Tests for the color difference module"""
+
+    def test_ciede2000_reference_values(self):
+        """Test ΔE2000 against the published test data, in both directions"""
+        for lab1, lab2, expected in SHARMA_PAIRS:
+            assert color_difference._ciede2000_row(lab1, [lab2])[0] == pytest.approx(expected, abs=1e-4)
+            assert color_difference._ciede2000_row(lab2, [lab1])[0] == pytest.approx(expected, abs=1e-4)
+
+    def test_delta_e(self):
+        """Test single differences with both metrics"""
+        red, blue = (255, 0, 0), (0, 0, 255)
+        red_lab, blue_lab = color_spaces.rgb_to_oklab([red, blue])
+
+        assert color_difference.delta_e(red, red) == 0
+        assert color_difference.delta_e(red, blue) > 50
+        assert color_difference.delta_e(red, blue, "oklab") == pytest.approx(
+            sum((x - y) ** 2 for x, y in zip(red_lab, blue_lab)) ** 0.5)
+
+        with pytest.raises(ValueError):
+            color_difference.delta_e(red, blue, "cie76")
+
+    def test_matrices(self):
+        """Test that one-to-many, matrix and condensed results agree"""
+        colors = _colors(40)
+        others = _colors(7, seed=1)
+
+        for metric in color_difference.METRICS:
+            matrix = color_difference.cdist(colors, others, metric)
+            assert len(matrix) == 40 and all(len(row) == 7 for row in matrix)
+            assert list(matrix[3]) == list(color_difference.one_to_many(colors[3], others, metric))
+
+            condensed = color_difference.pdist(colors, metric)
+            assert len(condensed) == 40 * 39 // 2
+            square = color_difference.cdist(colors, colors, metric)
+            expected = [square[i][j] for i in range(40) for j in range(i + 1, 40)]
+            assert list(condensed) == pytest.approx(expected)
+
+    def test_pdist_chunks(self):
+        """Test that condensed differences stream in bounded chunks of whole rows"""
+        colors = _colors(100)
+        chunks = list(color_difference.iter_pdist(colors, "oklab", chunk_size=500))
+
+        assert len(chunks) > 1
+        assert all(len(chunk) < 500 + 99 for chunk in chunks)
+        assert [d for chunk in chunks for d in chunk] == list(color_difference.pdist(colors, "oklab"))
+
+    def test_near_duplicates(self):
+        """Test finding nearly identical colors"""
+        palette = [(58, 134, 255), (255, 59, 48), (58, 135, 255), (40, 205, 65), (255, 59, 48)]
+        pairs = color_difference.near_duplicates(palette)
+
+        assert [(i, j) for i, j, _ in pairs] == [(0, 2), (1, 4)]
+        assert pairs[1][2] == 0
+        assert color_difference.near_duplicates(palette, threshold=0) == []
@@ -0,0 +1,68 @@
+import pytest
+import random
+
+from colormaestro.utils import color_spaces
+
+class TestColorSpaces:
+    """Tests for the batch color space conversions"""
+
+    def test_oklab_reference_values(self):
+        """Test OKLab values of white and pure red against the published ones"""
+        white, red = color_spaces.rgb_to_oklab([(255, 255, 255), (255, 0, 0)])
+
+        assert white == pytest.approx((1.0, 0.0, 0.0), abs=1e-4)
+        assert red == pytest.approx((0.62796, 0.22486, 0.12585), abs=1e-4)
+
+    def test_lab_reference_values(self):
+        """Test CIELAB values of white and pure blue against the published ones"""
+        white, blue = color_spaces.rgb_to_lab([(255, 255, 255), (0, 0, 255)])
+
+        assert white == pytest.approx((100.0, 0.0, 0.0), abs=1e-2)
+        assert blue == pytest.approx((32.30, 79.19, -107.86), abs=1e-2)
+
+    def test_round_trips(self):
+        """Test that every conversion round-trips 8-bit colors exactly"""
+        rng = random.Random(0)
+        colors = [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(500)]
+        colors += [(0, 0, 0), (255, 255, 255), (255, 0, 0), (0, 255, 0), (0, 0, 255)]
+
+        assert color_spaces.oklab_to_rgb(color_spaces.rgb_to_oklab(colors)) == colors
+        assert color_spaces.oklch_to_rgb(color_spaces.rgb_to_oklch(colors)) == colors
+        assert color_spaces.lab_to_rgb(color_spaces.rgb_to_lab(colors)) == colors
+        assert color_spaces.lch_to_rgb(color_spaces.rgb_to_lch(colors)) == colors
+
+    def test_linear_to_srgb(self):
+        """Test that encoding matches rounding the sRGB transfer function"""
+        for code, linear in enumerate(color_spaces.SRGB_TO_LINEAR):
+            assert color_spaces.linear_to_srgb(linear) == code
+        assert color_spaces.linear_to_srgb(-0.5) == 0
+        assert color_spaces.linear_to_srgb(1.5) == 255
+
+    def test_gamut_fitting(self):
+        """Test that out-of-gamut colors keep their lightness and hue"""
+        lch = (0.7, 0.4, 150.0)
+        fitted = color_spaces.oklch_to_rgb([lch])[0]
+        clipped = color_spaces.oklch_to_rgb([lch], fit_gamut=False)[0]
+
+        L, C, h = color_spaces.rgb_to_oklch([fitted])[0]
+        assert L == pytest.approx(0.7, abs=0.01)
+        assert h == pytest.approx(150.0, abs=2)
+        assert C < 0.4
+        assert fitted != clipped
+
+    def test_hsv_variants(self):
+        """Test perceptual variants of a base color"""
+        base = (58, 134, 255)
+        h, s, v = (0.6, 0.77, 1.0)
+
+        # HSV variants are plain conversions
+        assert color_spaces.hsv_variants_to_rgb(base, [(0.0, 1.0, 1.0)]) == [(255, 0, 0)]
+
+        # Rotating the hue in OKLCH keeps the lightness of the base color
+        rotated = color_spaces.hsv_variants_to_rgb(base, [((h + i / 6) % 1.0, s, v) for i in range(6)], "oklch")
+        base_lightness = color_spaces.rgb_to_oklch([base])[0][0]
+        for L, _, _ in color_spaces.rgb_to_oklch(rotated):
+            assert L == pytest.approx(base_lightness, abs=0.02)
+
+        with pytest.raises(ValueError):
+            color_spaces.hsv_variants_to_rgb(base, [(h, s, v)], "cmyk")
@@ -0,0 +1,103 @@
+import pytest
+import random
+from click.testing import CliRunner
+
+from colormaestro.cli import cli
+from colormaestro.utils import cvd
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+def _colors(count, seed=0):
+    rng = random.Random(seed)
+    return [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(count)]
+
+class TestColorVisionDeficiency:
+    """Tests for color vision deficiency simulation"""
+
+    def test_matrix(self):
+        """Test severity interpolation and argument validation"""
+        assert cvd.matrix("protan", 0.0) == cvd._IDENTITY
+        for row, expected in zip(cvd.matrix("deutan", 1.0), cvd._MACHADO["deutan"]):
+            assert row == pytest.approx(expected)
+        half = cvd.matrix("tritan", 0.5)
+        assert half[0][0] == pytest.approx((1 + cvd._MACHADO["tritan"][0][0]) / 2)
+
+        with pytest.raises(ValueError):
+            cvd.matrix("achromat")
+        with pytest.raises(ValueError):
+            cvd.matrix("protan", 1.5)
+        with pytest.raises(ValueError):
+            cvd.matrix("tritan", method="vienot")
+
+    def test_simulate(self):
+        """Test that grays are preserved and red and green collapse for dichromats"""
+        grays = [(0, 0, 0), (128, 128, 128), (255, 255, 255)]
+        for deficiency in cvd.DEFICIENCIES:
+            for gray, simulated in zip(grays, cvd.simulate(grays, deficiency)):
+                assert max(abs(a - b) for a, b in zip(gray, simulated)) <= 1
+
+        colors = _colors(50)
+        assert cvd.simulate(colors, "protan", 0.0) == colors
+
+        red, green = cvd.simulate([(255, 0, 0), (0, 255, 0)], "deutan", method="vienot")
+        # Dichromat projections leave red and green on the same yellow-blue axis
+        assert red[0] == red[1] and green[0] == green[1]
+
+    @pytest.mark.skipif(Image is None, reason="Pillow is not installed")
+    def test_simulate_image_matches_palette(self):
+        """Test that the image lookup table stays close to the exact simulation"""
+        colors = _colors(256, seed=1)
+        image = Image.new("RGB", (16, 16))
+        image.putdata(colors)
+
+        for deficiency in cvd.DEFICIENCIES:
+            simulated = cvd.simulate_image(image, deficiency)
+            exact = cvd.simulate(colors, deficiency)
+            errors = [max(abs(a - b) for a, b in zip(pixel, expected))
+                      for pixel, expected in zip(simulated.get_flattened_data(), exact)]
+            # Interpolation errors concentrate on dark colors whose simulation clips
+            assert sum(errors) / len(errors) < 1
+            assert max(errors) <= 16
+
+        transparent = Image.new("RGBA", (2, 2), (255, 0, 0, 100))
+        assert cvd.simulate_image(transparent, "protan").getpixel((0, 0))[3] == 100
+
+    def test_distinguishability(self):
+        """Test that red/green pairs are confusable for deutans only"""
+        report = cvd.distinguishability([(255, 0, 0), (0, 170, 0), (0, 0, 255)])
+
+        assert set(report) == {"normal", "protan", "deutan", "tritan"}
+        assert report["normal"]["confusable"] == []
+        assert [pair[:2] for pair in report["deutan"]["confusable"]] == [(0, 1)]
+        assert report["deutan"]["pair"] == (0, 1)
+        assert report["deutan"]["min_difference"] < report["normal"]["min_difference"]
+
+        single = cvd.distinguishability([(255, 0, 0)], metric="oklab")
+        assert single["protan"] == {"min_difference": None, "pair": None, "confusable": []}
+
+    def test_audit_command(self):
+        """Test auditing a palette collection from the command line"""
+        runner = CliRunner()
+        stdin = "#d55e00 #009e73 #0072b2\n#ff0000 #00aa00\n"
+
+        result = runner.invoke(cli, ['audit'], input=stdin)
+        assert result.exit_code == 1
+        lines = result.output.splitlines()
+        assert lines[0].startswith("1\t") and lines[0].endswith("\tok")
+        assert lines[1].startswith("2\t") and lines[1].endswith("\tconfusable")
+        assert "1 of 2 palette(s) have confusable colors" in result.output
+        assert len(lines[0].split("\t")) == 6
+
+        # The vienot model has no tritan column
+        result = runner.invoke(cli, ['audit', '--method', 'vienot'], input=stdin)
+        assert len(result.output.splitlines()[0].split("\t")) == 5
+
+        result = runner.invoke(cli, ['audit', '--failing'], input=stdin)
+        assert not result.output.startswith("1\t")
+
+        result = runner.invoke(cli, ['simulate', '#ff0000, #ffffff', '-d', 'protan'])
+        assert result.exit_code == 0
+        assert result.output.startswith("protan\t#") and result.output.rstrip().endswith("#ffffff")
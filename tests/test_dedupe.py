@@ -0,0 +1,98 @@
+import itertools
+import random
+import unittest
+from array import array
+from click.testing import CliRunner
+
+from colormaestro import dedupe
+from colormaestro.cli import cli
+from colormaestro.utils import color_difference
+
+
+def _jitter(palette, rng):
+    """Shuffle a palette and move its colors by at most one step per channel"""
+    jittered = [tuple(min(255, max(0, c + rng.choice((-1, 0, 1)))) for c in color) for color in palette]
+    rng.shuffle(jittered)
+    return jittered
+
+
+class TestDeduplicator(unittest.TestCase):
+    """Tests for near-duplicate palette detection"""
+
+    def test_order_and_jitter(self):
+        """Test that shuffled, slightly changed palettes are duplicates"""
+        rng = random.Random(0)
+        palettes = [[tuple(rng.randrange(256) for _ in range(3)) for _ in range(5)] for _ in range(300)]
+        collection = palettes + [_jitter(palette, rng) for palette in palettes]
+
+        assignments = list(dedupe.clusters(collection))
+        self.assertEqual([representative for _, representative in assignments], list(range(300)) * 2)
+        self.assertEqual(list(dedupe.unique(collection)), palettes)
+
+    def test_matches_brute_force(self):
+        """Test that grid hashing finds the same duplicates as comparing every pair"""
+        rng = random.Random(1)
+        base = [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(8)]
+        # Palettes drawn from a few colors, so duplicates sit on cell boundaries too
+        palettes = [[_jitter([rng.choice(base)], rng)[0] for _ in range(3)] for _ in range(400)]
+
+        def duplicates(a, b):
+            if len(a) != len(b):
+                return False
+            return any(all(color_difference.delta_e(color, other, "oklab") <= dedupe.DEFAULT_THRESHOLD
+                           for color, other in zip(a, order)) for order in itertools.permutations(b))
+
+        expected = []
+        for i, palette in enumerate(palettes):
+            expected.append(next((j for j in expected if duplicates(palette, palettes[j])), i))
+
+        self.assertEqual([representative for _, representative in dedupe.clusters(palettes)], expected)
+
+    def test_one_to_one_pairing(self):
+        """Test that a pairing is found when matching the first close color would miss it"""
+        deduplicator = dedupe.Deduplicator(0.02)
+        # a1 is close to b1 and b2, a2 only to b1
+        a = (0.5, 0.0, 0.0, 0.5, 0.015, 0.0)
+        b = array('d', (0.5, 0.01, 0.0, 0.5, -0.015, 0.0))
+        self.assertTrue(deduplicator._matches(a, b, 0))
+        self.assertTrue(deduplicator._matches(tuple(b), array('d', a), 0))
+
+        # a3 is close to b1 only, like a2: no pairing
+        a = (0.5, 0.015, 0.0, 0.5, 0.014, 0.0)
+        self.assertFalse(deduplicator._matches(a, b, 0))
+        self.assertFalse(deduplicator._matches(tuple(b), array('d', a), 0))
+
+    def test_sizes_are_distinct(self):
+        """Test that palettes of different sizes never match"""
+        deduplicator = dedupe.Deduplicator()
+        self.assertEqual(deduplicator.add([(58, 134, 255)]), 0)
+        self.assertEqual(deduplicator.add([(58, 134, 255), (58, 134, 255)]), 1)
+        self.assertEqual(deduplicator.add([(58, 134, 255)]), 0)
+        self.assertEqual(deduplicator.unique, 2)
+
+    def test_parse_line(self):
+        """Test parsing hex lists and JSON records"""
+        self.assertEqual(dedupe.parse_line("#3A86FF, fff\n"), [(58, 134, 255), (255, 255, 255)])
+        self.assertEqual(dedupe.parse_line('{"palette":[{"hex":"#3a86ff"}]}'), [(58, 134, 255)])
+        with self.assertRaises(ValueError):
+            dedupe.parse_line("#3A86FF sky-blue")
+        with self.assertRaises(ValueError):
+            dedupe.parse_line('{"colors":[]}')
+
+    def test_dedupe_command(self):
+        """Test the dedupe command keeping first occurrences and reporting clusters"""
+        runner = CliRunner()
+        stdin = "#3a86ff #ff3b30\n#ff3b30 #3a87ff\n#000000\nnope\n"
+
+        result = runner.invoke(cli, ['dedupe'], input=stdin)
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("#3a86ff #ff3b30\n#000000\n", result.output)
+        self.assertNotIn("#3a87ff", result.output)
+        self.assertIn("Error on line 4", result.output)
+
+        result = runner.invoke(cli, ['dedupe', '--clusters'], input=stdin)
+        self.assertIn("1\t1\n2\t1\n3\t3\n", result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
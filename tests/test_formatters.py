@@ -11,6 +11,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from colormaestro.formatters import css, html, json_formatter, scss, image_formatter, tailwind, terminal
 from colormaestro.utils import color_conversion
+from colormaestro import export
 
 
 class TestCSSFormatter(unittest.TestCase):
@@ -78,6 +79,10 @@ class TestHTMLFormatter(unittest.TestCase):
         mock_env.return_value.get_template.return_value = mock_template
         mock_template.render.return_value = "<html>Test Content</html>"
 
+        # Load the mocked template rather than the cached one, and do not keep it
+        html._default_template.cache_clear()
+        self.addCleanup(html._default_template.cache_clear)
+
         # Run the generate function
         result = html.generate(self.palette, self.output_path)
 
@@ -106,6 +111,20 @@ class TestHTMLFormatter(unittest.TestCase):
         except ImportError:
             self.skipTest("Jinja2 not installed")
 
+    def test_template_loaded_once(self):
+        """Test that renders without a template reuse the default one"""
+        try:
+            html._default_template.cache_clear()
+            with patch.object(html, 'load_template', wraps=html.load_template) as load_template:
+                first = html.render(self.palette)
+                second = html.render(self.palette, show_demo=True)
+
+            self.assertEqual(load_template.call_count, 1)
+            self.assertIn("#3a86ff", first)
+            self.assertNotEqual(first, second)
+        except ImportError:
+            self.skipTest("Jinja2 not installed")
+
 
 class TestJSONFormatter(unittest.TestCase):
     """Test the JSON formatter module"""
@@ -136,6 +155,34 @@ class TestJSONFormatter(unittest.TestCase):
         self.assertIn("palette", data)
         self.assertEqual(len(data["palette"]), 0)
 
+    def test_generate_line_matches_document(self):
+        """Test that NDJSON records match the pretty-printed document"""
+        palette = self.palette + [(0, 0, 0), (255, 255, 255)]
+        line = json_formatter.generate_line(palette)
+
+        self.assertNotIn("\n", line)
+        self.assertEqual(json.loads(line), json.loads(json_formatter.generate(palette)))
+
+    def test_generate_line_without_derived(self):
+        """Test skipping the derived HSV fields"""
+        data = json.loads(json_formatter.generate_line(self.palette, derived=False))
+        self.assertEqual(data["palette"][0]["hex"], "#3a86ff")
+        self.assertNotIn("hsv", data["palette"][0])
+
+    def test_write_lines(self):
+        """Test streaming several palettes as JSON Lines"""
+        palettes = [self.palette, self.palette[:1], []]
+        layout = json_formatter.compile_layout(derived=False)
+        stream = io.StringIO()
+
+        count = json_formatter.write_lines(palettes, stream, layout=layout)
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(count, 3)
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(len(json.loads(lines[0])["palette"]), 3)
+        self.assertEqual(json.loads(lines[2]), {"palette": []})
+
 
 class TestSCSSFormatter(unittest.TestCase):
     """Test the SCSS formatter module"""
@@ -203,6 +250,42 @@ class TestImageFormatter(unittest.TestCase):
         self.assertTrue(os.path.exists(result))
         self.assertTrue(os.path.getsize(result) > 0)
 
+    @unittest.skipIf(image_formatter.Image is None, "PIL not installed")
+    def test_recolor(self):
+        """Test mapping every pixel to its nearest palette color"""
+        Image = image_formatter.Image
+        img = Image.new('RGB', (32, 32))
+        img.putdata([(x * 8, y * 8, 128) for y in range(32) for x in range(32)])
+
+        for dither in (False, True):
+            recolored = image_formatter.recolor(img, self.palette, dither)
+            self.assertEqual(recolored.size, img.size)
+            self.assertLessEqual(set(recolored.get_flattened_data()), set(self.palette))
+
+        # No black padding entries, whatever the palette size
+        black = Image.new('RGB', (2, 2))
+        self.assertEqual(image_formatter.recolor(black, [(255, 255, 255)]).getpixel((0, 0)), (255, 255, 255))
+
+        transparent = Image.new('RGBA', (2, 2), (250, 180, 80, 100))
+        self.assertEqual(image_formatter.recolor(transparent, self.palette).getpixel((0, 0)), (242, 179, 79, 100))
+
+        with self.assertRaises(ValueError):
+            image_formatter.recolor(img, [])
+
+    @unittest.skipIf(image_formatter.Image is None, "PIL not installed")
+    def test_generate_recolored(self):
+        """Test recoloring an image file, in the format of the output extension"""
+        source = os.path.join(self.temp_dir, "photo.png")
+        target = os.path.join(self.temp_dir, "photo.recolored.jpg")
+        image_formatter.Image.new('RGBA', (8, 8), (60, 130, 250, 255)).save(source)
+
+        result = image_formatter.generate_recolored(source, self.palette, target)
+        with image_formatter.Image.open(result) as img:
+            self.assertEqual(img.format, "JPEG")
+            self.assertEqual(img.size, (8, 8))
+        os.remove(source)
+        os.remove(target)
+
 
 class TestTailwindFormatter(unittest.TestCase):
     """Test the Tailwind CSS formatter module"""
@@ -290,6 +373,114 @@ class TestTerminalFormatter(unittest.TestCase):
 
         self.assertTrue(demo_shown)
 
+    def test_detect_color_depth(self):
+        """Test terminal color depth detection from the environment"""
+        self.assertEqual(terminal.detect_color_depth({"COLORTERM": "truecolor"}), 24)
+        self.assertEqual(terminal.detect_color_depth({"TERM": "xterm-256color"}), 256)
+        self.assertEqual(terminal.detect_color_depth({"TERM": "dumb"}), 0)
+        self.assertEqual(terminal.detect_color_depth({"NO_COLOR": "1", "COLORTERM": "truecolor"}), 0)
+
+    def test_rgb_to_xterm256(self):
+        """Test quantization to the xterm-256 palette"""
+        self.assertEqual(terminal.rgb_to_xterm256((255, 0, 0)), 196)
+        self.assertEqual(terminal.rgb_to_xterm256((0, 0, 0)), 16)
+        self.assertEqual(terminal.rgb_to_xterm256((255, 255, 255)), 231)
+        self.assertEqual(terminal.rgb_to_xterm256((30, 30, 30)), 234)
+
+    def test_render(self):
+        """Test rendering the palette frame for each color depth"""
+        truecolor = terminal.render(self.palette, color_depth=24)
+        self.assertIn("\033[38;2;58;134;255m", truecolor)
+        self.assertIn("#ff207a", truecolor)
+
+        xterm = terminal.render(self.palette, color_depth=256)
+        self.assertIn("\033[38;5;", xterm)
+        self.assertNotIn("\033[38;2;", xterm)
+
+        plain = terminal.render(self.palette, show_demo=True, color_depth=0)
+        self.assertNotIn("\033[", plain)
+        self.assertIn("UI demos are available in HTML output format", plain)
+
+    @patch('click.echo')
+    def test_show_single_write(self, mock_echo):
+        """Test that show flushes the whole frame in one write"""
+        terminal.show(self.palette, color_depth=24)
+        self.assertEqual(mock_echo.call_count, 1)
+        self.assertIn("#3a86ff", mock_echo.call_args[0][0])
+
+    @unittest.skipIf(image_formatter.Image is None, "PIL not installed")
+    def test_render_image(self):
+        """Test half-block image preview rendering"""
+        img = image_formatter.Image.new('RGB', (400, 200), color=(255, 0, 0))
+        img.paste((0, 0, 255), (0, 100, 400, 200))
+
+        frame = terminal.render_image(img, max_width=40, color_depth=24)
+        lines = frame.splitlines()
+
+        # 40 columns, two pixels per cell vertically
+        self.assertEqual(len(lines), 10)
+        self.assertEqual(lines[0].count(terminal.HALF_BLOCK), 40)
+        self.assertIn("\033[38;2;255;0;0m\033[48;2;255;0;0m", lines[0])
+        self.assertIn("\033[38;2;0;0;255m\033[48;2;0;0;255m", lines[-1])
+
+    @unittest.skipIf(image_formatter.Image is None, "PIL not installed")
+    def test_render_image_cell_cap(self):
+        """Test that huge images are capped to the cell budget"""
+        img = image_formatter.Image.new('RGB', (4000, 4000), color=(0, 128, 0))
+        frame = terminal.render_image(img, max_width=200, max_cells=100, color_depth=0)
+        self.assertLessEqual(frame.count(terminal.HALF_BLOCK), 100)
+
+
+class TestExport(unittest.TestCase):
+    """Test the concurrent multi-format export stage"""
+
+    def setUp(self):
+        self.palette = [(58, 134, 255), (242, 179, 79), (255, 32, 122)]
+        self.temp_dir = tempfile.mkdtemp()
+
+    def test_plan(self):
+        """Test building export jobs from the requested formats"""
+        jobs = export.plan(["css", " svg", "css"], html_filename="out/preview.html")
+        self.assertEqual(jobs, [("css", None), ("svg", "palette.svg"), ("html", "out/preview.html")])
+
+        jobs = export.plan(["png", "svg"], image_filename="swatches.png")
+        self.assertEqual(jobs, [("png", "swatches.png"), ("svg", "swatches.svg")])
+
+    def test_export_all_preserves_order(self):
+        """Test that results come back in job order with per-format errors"""
+        svg_path = os.path.join(self.temp_dir, "palette.svg")
+        jobs = [("svg", svg_path), ("css", None), ("bogus", None), ("json", None)]
+
+        results = export.export_all(self.palette, jobs, max_workers=4)
+
+        self.assertEqual([r["format"] for r in results], ["svg", "css", "bogus", "json"])
+        self.assertEqual(results[0]["output"], f"Image saved to: {svg_path}\n")
+        self.assertTrue(os.path.exists(svg_path))
+        self.assertIn("--color-primary: #3a86ff;", results[1]["output"])
+        self.assertIsInstance(results[2]["error"], ValueError)
+        self.assertIsNone(results[2]["output"])
+        self.assertIsNone(results[3]["error"])
+
+    def test_skip_unchanged(self):
+        """Test that identical outputs are not rewritten"""
+        jobs = export.plan(["css", "svg"], output_dir=self.temp_dir)
+        css_path = os.path.join(self.temp_dir, "palette.css")
+        self.assertEqual(jobs[0], ("css", css_path))
+
+        first = export.export_all(self.palette, jobs, skip_unchanged=True)
+        self.assertEqual(first[0]["output"], f"CSS saved to: {css_path}\n")
+        os.utime(css_path, (0, 0))
+
+        second = export.export_all(self.palette, jobs, skip_unchanged=True)
+        self.assertEqual(second[0]["output"], f"CSS unchanged: {css_path}\n")
+        self.assertIn("unchanged", second[1]["output"])
+        self.assertEqual(os.path.getmtime(css_path), 0)
+
+        # A different palette is written atomically without leftovers
+        export.export_all(self.palette[::-1], jobs, skip_unchanged=True)
+        self.assertNotEqual(os.path.getmtime(css_path), 0)
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ["palette.css", "palette.svg"])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -6,8 +6,9 @@ from colormaestro.generators import harmony as harmony_generator
 from colormaestro.generators import ui_palette
 from colormaestro.generators import monochromatic
 from colormaestro.generators import accessible
+from colormaestro.generators import cvd_safe
 from colormaestro.generators import mood as mood_generator
-from colormaestro.utils import color_conversion
+from colormaestro.utils import color_conversion, color_spaces, cvd
 
 # Sample RGB colors for testing
 SAMPLE_COLORS = {
@@ -79,6 +80,21 @@ class TestHarmonyGenerator:
         # Check that the palette contains unique colors
         assert len(set(palette)) >= 4
 
+    def test_perceptual_space(self):
+        """Test harmony generation in OKLCH and CIELCh"""
+        base_color = SAMPLE_COLORS['blue']
+        base_lightness = color_spaces.rgb_to_oklch([base_color])[0][0]
+
+        for space in ("oklch", "lch"):
+            palette = harmony_generator.generate(base_color, "triadic", 3, space)
+            assert palette[0] == base_color
+            assert len(set(palette)) == 3
+
+        # Triadic colors share the lightness of the base color in OKLCH
+        palette = harmony_generator.generate(base_color, "triadic", 3, "oklch")
+        for lightness, _, _ in color_spaces.rgb_to_oklch(palette):
+            assert abs(lightness - base_lightness) < 0.02
+
 class TestMonochromaticGenerator:
     """Tests for the monochromatic generator module"""
 
@@ -124,6 +140,18 @@ class TestMonochromaticGenerator:
         # There should be some variation in saturation or value
         assert len(saturations) > 1 or len(values) > 1
 
+    def test_perceptual_space(self):
+        """Test monochromatic generation in OKLCH"""
+        base_color = SAMPLE_COLORS['purple']
+        palette = monochromatic.generate(base_color, 5, "oklch")
+
+        assert len(palette) == 5
+
+        # All colors keep the OKLCH hue of the base color
+        base_hue = color_spaces.rgb_to_oklch([base_color])[0][2]
+        for _, chroma, hue in color_spaces.rgb_to_oklch(palette):
+            assert chroma < 0.02 or abs(hue - base_hue) < 3
+
 class TestAccessibleGenerator:
     """Tests for the accessible color generator module"""
 
@@ -166,6 +194,57 @@ class TestAccessibleGenerator:
                 assert len(color) == 3
                 assert all(0 <= c <= 255 for c in color)
 
+    def test_perceptual_space(self):
+        """Test that candidate colors are computed in the requested color space"""
+        base_color = SAMPLE_COLORS['blue']
+        hsv_palette = accessible.generate(base_color, 5)
+        assert accessible.generate(base_color, 5, space="hsv") == hsv_palette
+
+        for space in ("oklch", "lch"):
+            palette = accessible.generate(base_color, 5, space=space)
+            assert len(palette) == 5
+            assert base_color in palette
+            assert palette != hsv_palette
+
+class TestCVDSafeGenerator:
+    """Tests for the color-blind safe generator module"""
+
+    def test_basic_generation(self):
+        """Test that the base color comes first and colors are distinct"""
+        base_color = SAMPLE_COLORS['blue']
+        palette = cvd_safe.generate(base_color, 6)
+
+        assert len(palette) == 6
+        assert palette[0] == base_color
+        assert len(set(palette)) == 6
+
+    def test_distinguishable_under_deficiencies(self):
+        """Test that no two colors collapse for any simulated deficiency"""
+        palette = cvd_safe.generate(SAMPLE_COLORS['red'], 8)
+        report = cvd.distinguishability(palette)
+
+        for result in report.values():
+            assert result["confusable"] == []
+        assert cvd_safe.min_distance(palette) > 0.1
+
+    def test_beats_random_palettes(self):
+        """Test that the search spreads colors further than random picks"""
+        rng = random.Random(0)
+        palette = cvd_safe.generate(SAMPLE_COLORS['green'], 12)
+        best_random = max(cvd_safe.min_distance([SAMPLE_COLORS['green']] +
+                                                [tuple(rng.randrange(256) for _ in range(3)) for _ in range(11)])
+                          for _ in range(20))
+
+        assert cvd_safe.min_distance(palette) > best_random
+
+    def test_large_palettes(self):
+        """Test categorical palettes of 20+ colors"""
+        palette = cvd_safe.generate(SAMPLE_COLORS['black'], 24)
+
+        assert len(palette) == 24
+        assert len(set(palette)) == 24
+        assert cvd_safe.min_distance(palette) > 0.05
+
 class TestUIGenerator:
     """Tests for the UI palette generator module"""
 
@@ -209,6 +288,18 @@ class TestUIGenerator:
         # There should be at least some pairs with good contrast
         assert any(result['passes_aa'] for result in results)
 
+    def test_perceptual_space(self):
+        """Test that secondary colors are computed in the requested color space"""
+        base_color = SAMPLE_COLORS['blue']
+        hsv_palette = ui_palette.generate(base_color, 5)
+        assert ui_palette.generate(base_color, 5, space="hsv") == hsv_palette
+
+        for space in ("oklch", "lch"):
+            palette = ui_palette.generate(base_color, 5, space=space)
+            assert len(palette) == 5
+            assert palette[0] == base_color
+            assert palette != hsv_palette
+
 class TestMoodGenerator:
     """Tests for the mood-based generator module"""
 
@@ -0,0 +1,63 @@
+import unittest
+from functools import lru_cache
+
+from colormaestro import metrics
+from colormaestro.formatters import css
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests for the metrics registry"""
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_histogram_buckets(self):
+        """Test cumulative bucket counts and the sum"""
+        histogram = self.registry.register(metrics.Histogram("latency", "Latency", ("name",), buckets=(1, 5)))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value, "a")
+
+        sample = self.registry.snapshot()["latency"]["samples"][0]
+        self.assertEqual(sample["labels"], {"name": "a"})
+        self.assertEqual(sample["buckets"], {1: 2, 5: 3, float("inf"): 4})
+        self.assertEqual(sample["count"], 4)
+        self.assertEqual(sample["sum"], 14.5)
+
+    def test_render_prometheus(self):
+        """Test the Prometheus text format, including cache statistics"""
+        counter = self.registry.register(metrics.Counter("errors_total", "Errors", ("stage",)))
+        counter.inc("parse")
+        counter.inc("parse", amount=2)
+
+        @lru_cache()
+        def square(x):
+            return x * x
+
+        square(2)
+        square(2)
+        self.registry.register_cache("square", square)
+        text = metrics.render_prometheus(self.registry.snapshot())
+
+        self.assertIn("# TYPE errors_total counter\n", text)
+        self.assertIn('errors_total{stage="parse"} 3\n', text)
+        self.assertIn('colormaestro_cache_hits_total{cache="square"} 1\n', text)
+        self.assertIn('colormaestro_cache_misses_total{cache="square"} 1\n', text)
+
+    def test_instrument(self):
+        """Test that instrumented library calls report latency and failures"""
+        def count(operation, name):
+            samples = metrics.snapshot()["colormaestro_call_seconds"]["samples"]
+            return sum(s["count"] for s in samples if s["labels"] == {"operation": operation, "name": name})
+
+        before = count("format", "css")
+        css.generate([(58, 134, 255)])
+        self.assertEqual(count("format", "css"), before + 1)
+
+        with self.assertRaises(Exception):
+            css.generate([None])
+        failures = metrics.snapshot()["colormaestro_call_failures_total"]["samples"]
+        self.assertIn({"operation": "format", "name": "css"}, [s["labels"] for s in failures])
+
+
+if __name__ == '__main__':
+    unittest.main()
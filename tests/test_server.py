@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+
+from colormaestro import server
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class TestPaletteServer(unittest.TestCase):
+    """Tests for the HTTP palette service"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = server.PaletteService(workers=1)
+        cls.server = server.make_server(port=0, service=cls.service, quiet=True)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.service.close()
+
+    def get(self, path):
+        try:
+            with urllib.request.urlopen(self.base_url + path) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def test_generate_and_format(self):
+        """Test palette generation and formatting endpoints"""
+        status, body = self.get("/generate?input=3a86ff&type=harmony&colors=3")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["palette"][0], "#3a86ff")
+
+        status, body = self.get("/generate?input=3a86ff&type=harmony&colors=3&space=oklch")
+        self.assertEqual(status, 200)
+        expected = server.pipeline.generate_palette((58, 134, 255), "harmony", "complementary", 3, space="oklch")
+        self.assertEqual(json.loads(body)["palette"], [server.color_conversion.rgb_to_hex(rgb) for rgb in expected])
+
+        status, body = self.get("/format?input=%233a86ff&format=css")
+        self.assertEqual(status, 200)
+        self.assertIn(b"--color-primary: #3a86ff;", body)
+
+    def test_caches_stay_warm(self):
+        """Test that repeated requests are served from the caches"""
+        for _ in range(3):
+            self.get("/format?input=coral&format=svg")
+
+        stats = json.loads(self.get("/stats")[1])
+        self.assertGreaterEqual(stats["format"]["hits"], 2)
+        self.assertGreaterEqual(stats["generate"]["hits"], 2)
+
+    def test_metrics(self):
+        """Test the Prometheus metrics endpoint"""
+        self.get("/generate?input=coral&type=mono")
+        status, body = self.get("/metrics")
+        self.assertEqual(status, 200)
+        self.assertIn(b'colormaestro_call_seconds_count{operation="generate",name="mono"}', body)
+        self.assertIn(b'colormaestro_cache_hits_total{cache="server_generate"}', body)
+
+    def test_errors(self):
+        """Test error responses"""
+        self.assertEqual(self.get("/format?input=red&format=bogus")[0], 400)
+        # Files outside the image root are never read
+        self.assertEqual(self.get("/parse?input=" + os.path.abspath(__file__))[0], 400)
+        self.assertEqual(self.get("/nothing")[0], 404)
+
+        status, body = self.get("/generate?input=red&space=cmyk")
+        self.assertEqual(status, 400)
+        self.assertIn("Unknown color space", json.loads(body)["error"])
+
+        for colors in ("0", "100000", "many"):
+            status, body = self.get("/generate?input=red&colors=" + colors)
+            self.assertEqual(status, 400)
+            self.assertIn("colors must be", json.loads(body)["error"])
+
+    @unittest.skipIf(Image is None, "PIL not installed")
+    def test_image_root(self):
+        """Test that paths outside the image root get one error, existing or not"""
+        with tempfile.TemporaryDirectory() as root:
+            Image.new("RGB", (4, 4), (58, 134, 255)).save(os.path.join(root, "logo.png"))
+            self.service.image_root = os.path.realpath(root)
+            try:
+                self.assertEqual(self.service.parse("logo.png"), (58, 134, 255))
+                errors = set()
+                for path in (os.path.abspath(__file__), "/no/such/file.png", "../logo.png", "missing.png"):
+                    with self.assertRaises(ValueError) as context:
+                        self.service.parse(path)
+                    errors.add(str(context.exception).split(":")[0])
+                self.assertEqual(errors, {"Image not found in the image root"})
+            finally:
+                self.service.image_root = None
+
+        # Without an image root, paths are rejected before any file lookup
+        with mock.patch("os.path.isfile", side_effect=AssertionError("filesystem accessed")):
+            with self.assertRaises(ValueError):
+                self.service.parse(os.path.abspath(__file__))
+            self.assertEqual(self.service.parse("coral"), self.service.parse("#ff7f50"))
+
+
+if __name__ == '__main__':
+    unittest.main()
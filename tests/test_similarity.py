@@ -0,0 +1,130 @@
+import math
+import os
+import random
+import tempfile
+import tracemalloc
+import unittest
+from click.testing import CliRunner
+
+from colormaestro import similarity
+from colormaestro.cli import cli
+from colormaestro.generators import harmony, monochromatic, ui_palette, accessible
+
+
+def _library(count, seed=0):
+    """Generate a reproducible palette library with every generator"""
+    rng = random.Random(seed)
+    palettes = []
+    for i in range(count):
+        base = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        size = rng.randrange(3, 8)
+        kind = i % 4
+        if kind == 0:
+            palettes.append(harmony.generate(base, "triadic", size))
+        elif kind == 1:
+            palettes.append(monochromatic.generate(base, size))
+        elif kind == 2:
+            palettes.append(ui_palette.generate(base, size))
+        else:
+            palettes.append(accessible.generate(base, size))
+    return palettes
+
+
+def _stream(count, seed=0):
+    """Yield reproducible random palettes without keeping them in memory"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield [(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(rng.randrange(3, 8))]
+
+
+class TestSimilarityIndex(unittest.TestCase):
+    """Tests for the palette similarity index"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.palettes = _library(600)
+        cls.index = similarity.build(cls.palettes)
+
+    def test_build_memory(self):
+        """Test that building keeps a compact float32 vector per palette in memory"""
+        def peak(count):
+            tracemalloc.start()
+            try:
+                similarity.build(_stream(count))
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        # Peak growth per palette: about 110 bytes of features, 20 of colors
+        # and 16 of offsets and ids, against over 1 KB for lists of floats
+        per_palette = (peak(3000) - peak(1000)) / 2000
+        self.assertLess(per_palette, 400)
+
+    def test_features(self):
+        """Test that feature vectors have a fixed length and ignore color order"""
+        palette = [(58, 134, 255), (255, 59, 48), (40, 205, 65)]
+        vector = similarity.features(palette)
+
+        self.assertEqual(len(vector), similarity.DIMENSIONS)
+        self.assertEqual(vector, similarity.features(palette[::-1]))
+        self.assertEqual(len(similarity.features([(0, 0, 0)])), similarity.DIMENSIONS)
+        with self.assertRaises(ValueError):
+            similarity.features([])
+
+    def test_query_matches_brute_force(self):
+        """Test that scanning every list gives the exact nearest neighbours"""
+        vectors = [similarity.features(p) for p in self.palettes]
+        lists = len(self.index._centroids)
+
+        for query in self.palettes[:10] + [[(58, 134, 255), (255, 204, 0)]]:
+            target = similarity.features(query)
+            expected = sorted(math.dist(target, v) for v in vectors)[:5]
+            results = self.index.query(query, k=5, nprobe=lists)
+            # Vectors are stored as float32
+            for (_, distance), exact in zip(results, expected):
+                self.assertAlmostEqual(distance, exact, places=6)
+
+    def test_query_finds_itself(self):
+        """Test that indexed palettes are their own nearest neighbour"""
+        for palette_id in (0, 1, 2, 3, 299):
+            results = self.index.query(self.palettes[palette_id], k=3)
+            self.assertAlmostEqual(results[0][1], 0, places=6)
+            self.assertEqual(self.index.palette(results[0][0]), self.palettes[palette_id])
+
+    def test_save_and_load(self):
+        """Test that a memory-mapped index answers like the built one"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "palettes.idx")
+            self.index.save(path)
+
+            with similarity.Index.load(path) as loaded:
+                self.assertEqual(len(loaded), 600)
+                self.assertEqual(loaded.palette(42), self.palettes[42])
+                query = [(120, 40, 200), (250, 250, 240), (20, 20, 30)]
+                self.assertEqual(loaded.query(query, k=4), self.index.query(query, k=4))
+
+            with open(path, "wb") as f:
+                f.write(b"not an index")
+            with self.assertRaises(ValueError):
+                similarity.Index.load(path)
+
+    def test_index_and_similar_commands(self):
+        """Test building an index and querying it from the command line"""
+        runner = CliRunner()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "palettes.idx")
+            stdin = "#3a86ff #ff3b30\n#000000 #ffffff\nnope\n#3a87ff,#ff3b31\n"
+
+            result = runner.invoke(cli, ['index', '-o', path], input=stdin)
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn("Indexed 3 palette(s)", result.output)
+
+            result = runner.invoke(cli, ['similar', path, '#3a86ff #ff3b30', '-k', '2'])
+            self.assertEqual(result.exit_code, 0, result.output)
+            lines = result.output.splitlines()
+            self.assertEqual(lines[0], "0\t0.0000\t#3a86ff #ff3b30")
+            self.assertTrue(lines[1].startswith("2\t"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from click.testing import CliRunner
+
+from colormaestro import store
+from colormaestro.cli import cli
+from colormaestro.utils import accessibility
+
+
+class TestPaletteStore(unittest.TestCase):
+    """Tests for the SQLite palette library"""
+
+    def setUp(self):
+        self.store = store.PaletteStore(":memory:")
+        self.dark = [(0, 0, 0), (51, 51, 51), (26, 26, 128)]
+        self.blue = [(58, 134, 255), (255, 255, 255)]
+        self.store.add(self.dark, "mono", "calm", "#000000")
+        self.store.add(self.blue, "ui", "playful")
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_add_and_get(self):
+        """Test that palettes round-trip with their metadata and indexed values"""
+        record = self.store.get(1)
+        self.assertEqual(record["palette"], self.dark)
+        self.assertEqual((record["palette_type"], record["mood"], record["source"]), ("mono", "calm", "#000000"))
+        self.assertIsNone(record["hue_bucket"])
+        self.assertEqual(record["luminance"], 0)
+        self.assertAlmostEqual(record["min_contrast_white"],
+                               min(accessibility.calculate_contrast_ratio(c, (255, 255, 255)) for c in self.dark))
+        self.assertAlmostEqual(record["min_contrast_black"], 1)
+
+        self.assertEqual(self.store.get(2)["hue_bucket"], 7)
+        self.assertIsNone(self.store.get(3))
+        with self.assertRaises(ValueError):
+            self.store.add([])
+
+    def test_add_many_batches(self):
+        """Test bulk inserts across several transactions"""
+        palettes = [[(i, 255 - i, 128)] * (i % 6 + 1) for i in range(250)]
+        ids = self.store.add_many(palettes, batch_size=100)
+
+        self.assertEqual(ids, list(range(3, 253)))
+        self.assertEqual(self.store.count(), 252)
+        self.assertEqual(self.store.get(3 + 99)["palette"], palettes[99])
+        self.assertEqual(self.store.get(3 + 249)["palette"], palettes[249])
+
+    def test_query_filters(self):
+        """Test that filters combine and match the stored values"""
+        self.assertEqual([r["id"] for r in self.store.query(mood="calm", min_colors=3, min_contrast_white=4.5)], [1])
+        self.assertEqual(list(self.store.query(mood="calm", min_colors=4)), [])
+        self.assertEqual([r["id"] for r in self.store.query(hue=215)], [2])
+        self.assertEqual([r["id"] for r in self.store.query(min_luminance=0.1)], [2])
+        self.assertEqual(self.store.count(palette_type="ui", max_colors=2), 1)
+        self.assertEqual(sorted(r["id"] for r in self.store.query()), [1, 2])
+        self.assertEqual(len(list(self.store.query(limit=1))), 1)
+
+        self.assertTrue(self.store.delete(1))
+        self.assertFalse(self.store.delete(1))
+        self.assertEqual(self.store.count(), 1)
+
+    def test_queries_use_indexes(self):
+        """Test that filtered queries search an index instead of scanning the table"""
+        self.store.add_many([[(i, i, 255 - i)] * 5 for i in range(200)])
+        for filters in (dict(mood="calm", min_colors=5, min_contrast_white=4.5), dict(hue=210),
+                        dict(min_luminance=0.2, max_luminance=0.3), dict(min_contrast_black=7),
+                        dict(palette_type="ui", min_contrast_white=3)):
+            plan = " ".join(self.store.explain(**filters))
+            self.assertIn("USING INDEX", plan, filters)
+
+
+class TestLibraryCommands(unittest.TestCase):
+    """Tests for the library command and generate --save"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "library", "palettes.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_add_query_and_export(self):
+        """Test importing palettes, then listing and exporting matches"""
+        runner = CliRunner()
+        stdin = "#000000 #333333\n#3a86ff #ffffff\nnope\n"
+
+        result = runner.invoke(cli, ['library', '--path', self.path, 'add', '--mood', 'calm'], input=stdin)
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Added 2 palette(s)", result.output)
+
+        result = runner.invoke(cli, ['library', '--path', self.path, 'query', '--mood', 'calm', '--aa-white'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("1\t#000000 #333333\n", result.output)
+        self.assertNotIn("#3a86ff", result.output)
+
+        out_dir = os.path.join(self.tmpdir.name, "themes")
+        result = runner.invoke(cli, ['library', '--path', self.path, 'query', '-f', 'css', '--out-dir', out_dir])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(sorted(os.listdir(out_dir)), ["palette-1.css", "palette-2.css"])
+
+        result = runner.invoke(cli, ['library', '--path', self.path, 'query', '-f', 'png'])
+        self.assertNotEqual(result.exit_code, 0)
+
+    def test_generate_save(self):
+        """Test that generate --save adds the palette with its options"""
+        runner = CliRunner()
+        with mock.patch.dict(os.environ, {"COLORMAESTRO_LIBRARY": self.path}):
+            result = runner.invoke(cli, ['#3A86FF', '-t', 'harmony', '-o', 'css', '--save'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Palette saved to the library with id 1", result.output)
+
+        with store.PaletteStore(self.path) as library:
+            record = library.get(1)
+        self.assertEqual(record["palette"][0], (58, 134, 255))
+        self.assertEqual((record["palette_type"], record["source"]), ("harmony", "#3A86FF"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+from colormaestro import watch
+
+
+class TestWatch(unittest.TestCase):
+    """Tests for polling-based file watching"""
+
+    def test_burst_is_debounced(self):
+        """Test that a burst of saves is reported once, after it settles"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "colors.txt")
+            with open(path, "w") as f:
+                f.write("#3a86ff\n")
+
+            # Each sleep call is one tick; three saves land on consecutive ticks
+            writes = {1: "#ff006e\n", 2: "#ff006e\n#8338ec\n", 3: "#ff006e\n#8338ec\n#fb5607\n"}
+            ticks = []
+
+            def sleep(seconds):
+                ticks.append(seconds)
+                content = writes.get(len(ticks))
+                if content:
+                    with open(path, "w") as f:
+                        f.write(content)
+                    os.utime(path, ns=(len(ticks) * 10**9, len(ticks) * 10**9))
+
+            changes = watch.changes([path], interval=1, debounce=0.5, sleep=sleep)
+            self.assertEqual(next(changes), [path])
+
+            # One poll, then debounce waits until the file stopped changing
+            self.assertEqual(ticks, [1, 0.5, 0.5, 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()